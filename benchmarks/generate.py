@@ -0,0 +1,209 @@
+"""
+Synthetic ledger generator for benchmarks.
+
+Fills a BudgetBee database with made-up but realistic data: accounts with
+opening balances, income and expense categories, monthly budgets with
+allocations and projected items, and any number of transactions spread over
+the budget months. The same seed and scale always produce the same rows.
+
+    python benchmarks/generate.py bench.db                  # small (10k transactions)
+    python benchmarks/generate.py bench.db --scale large    # 1M transactions
+    python benchmarks/generate.py bench.db --transactions 250000 --seed 7
+"""
+import argparse
+import os
+import random
+import sys
+from calendar import monthrange
+from datetime import date, timedelta
+from typing import NamedTuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import ledger
+from database import BALANCE_TRIGGERS, create_balance_triggers, get_connection, repair_balances
+from migrations import migrate
+from rollups import ROLLUP_TRIGGERS, rebuild_rollups
+from search import SEARCH_TRIGGERS, rebuild_search_index
+
+class Scale(NamedTuple):
+    transactions: int
+    accounts: int = 4
+    budgets: int = 24               # consecutive months
+    projected_per_budget: int = 8
+
+SCALES = {
+    "small": Scale(10_000),
+    "medium": Scale(100_000, budgets=36),
+    "large": Scale(1_000_000, accounts=8, budgets=60),
+    "huge": Scale(10_000_000, accounts=12, budgets=120),
+}
+
+FIRST_MONTH = date(2020, 1, 1)
+
+ACCOUNT_TYPES = ("Checking", "Savings", "Benefits")
+OWNERS = ("Alex", "Sam", "Jordan")
+
+# name: (type, smallest, largest amount in cents, relative frequency)
+CATEGORIES = {
+    "Groceries": ("Expense", 500, 25_000, 30),
+    "Dining": ("Expense", 800, 12_000, 15),
+    "Fuel": ("Expense", 2_000, 9_000, 10),
+    "Utilities": ("Expense", 4_000, 30_000, 4),
+    "Rent": ("Expense", 90_000, 200_000, 1),
+    "Insurance": ("Expense", 5_000, 40_000, 1),
+    "Entertainment": ("Expense", 500, 15_000, 8),
+    "Health": ("Expense", 1_500, 60_000, 3),
+    "Clothing": ("Expense", 1_000, 20_000, 4),
+    "Subscriptions": ("Expense", 300, 2_500, 5),
+    "Salary": ("Income", 150_000, 450_000, 2),
+    "Interest": ("Income", 10, 5_000, 1),
+    "Refunds": ("Income", 500, 10_000, 1),
+    "Transfer To": ("Expense", 5_000, 100_000, 2),
+    "Transfer From": ("Income", 5_000, 100_000, 2),
+}
+
+WORDS = ("market", "store", "online", "corner", "city", "north", "weekly",
+         "cafe", "station", "service", "express", "monthly", "shop", "bill")
+
+def month_start(index, first=FIRST_MONTH):
+    """First day of the month `index` months after `first`"""
+    year, month = divmod(first.month - 1 + index, 12)
+    return date(first.year + year, month + 1, 1)
+
+def date_span(scale):
+    """(first, last) dates covered by the generated budgets"""
+    last = month_start(scale.budgets - 1)
+    return FIRST_MONTH, last.replace(day=monthrange(last.year, last.month)[1])
+
+def _transaction_rows(rng, scale, account_ids, category_ids):
+    first, last = date_span(scale)
+    days = (last - first).days + 1
+    names = list(CATEGORIES)
+    weights = [CATEGORIES[name][3] for name in names]
+
+    for _ in range(scale.transactions):
+        name = rng.choices(names, weights)[0]
+        cat_type, low, high, _ = CATEGORIES[name]
+        amount = rng.randint(low, high)
+        yield (
+            rng.choice(account_ids),
+            category_ids[name],
+            -amount if cat_type == "Expense" else amount,
+            (first + timedelta(days=rng.randrange(days))).isoformat(),
+            f"{rng.choice(WORDS)} {rng.choice(WORDS)}",
+            1 if name in ledger.TRANSFER_CATEGORIES else 0,
+        )
+
+def generate(conn, scale, seed=1):
+    """
+    Populate an empty, migrated database. Triggers are dropped while the
+    transactions load and the balances, rollups and search index they
+    maintain are rebuilt in bulk afterwards, which is what makes millions
+    of rows practical.
+    """
+    rng = random.Random(seed)
+    c = conn.cursor()
+    c.execute("SELECT COUNT(*) FROM transactions")
+    if c.fetchone()[0]:
+        raise ValueError("database already has transactions")
+
+    with conn:
+        system_id = ledger.system_category_id(conn)
+
+        category_ids = {}
+        for name, (cat_type, *_) in CATEGORIES.items():
+            c.execute("INSERT OR IGNORE INTO categories (name, type) VALUES (?, ?)", (name, cat_type))
+            c.execute("SELECT id FROM categories WHERE name=?", (name,))
+            category_ids[name] = c.fetchone()[0]
+
+        # Accounts open on the first day with a System transaction for their balance
+        account_ids = []
+        for i in range(scale.accounts):
+            opening = rng.randint(0, 500_000)
+            name = f"{ACCOUNT_TYPES[i % len(ACCOUNT_TYPES)]} {i + 1}"
+            c.execute("""
+                INSERT INTO accounts (type, owner, name, balance, starting_balance, is_active)
+                VALUES (?, ?, ?, 0, ?, 1)
+            """, (ACCOUNT_TYPES[i % len(ACCOUNT_TYPES)], OWNERS[i % len(OWNERS)], name, opening))
+            account_ids.append(c.lastrowid)
+            c.execute("""
+                INSERT INTO transactions (account_id, category_id, amount, description, date)
+                VALUES (?, ?, ?, ?, ?)
+            """, (c.lastrowid, system_id, opening, f"Added {name}", FIRST_MONTH.isoformat()))
+
+        for name in list(BALANCE_TRIGGERS) + list(ROLLUP_TRIGGERS) + list(SEARCH_TRIGGERS):
+            c.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+        c.executemany("""
+            INSERT INTO transactions (account_id, category_id, amount, date, description, is_transfer)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, _transaction_rows(rng, scale, account_ids, category_ids))
+
+        create_balance_triggers(conn)
+        for sql in list(ROLLUP_TRIGGERS.values()) + list(SEARCH_TRIGGERS.values()):
+            c.execute(sql)
+        rebuild_rollups(conn)
+        rebuild_search_index(conn)
+
+        # One budget per month, each with allocations and projected items
+        expenses = [name for name, (cat_type, *_) in CATEGORIES.items()
+                    if cat_type == "Expense" and name not in ledger.TRANSFER_CATEGORIES]
+        for i in range(scale.budgets):
+            start = month_start(i)
+            c.execute("INSERT INTO budgets (name, start_date) VALUES (?, ?)",
+                      (start.strftime("%B %Y"), start.isoformat()))
+            budget_id = c.lastrowid
+
+            c.executemany("""
+                INSERT INTO budgeted_categories (budget_id, category_id, allocated_amount, alloc_desc)
+                VALUES (?, ?, ?, ?)
+            """, [(budget_id, category_ids[name], rng.randint(10, 100) * 1_000, f"{name} budget")
+                  for name in expenses])
+
+            last_day = monthrange(start.year, start.month)[1]
+            for _ in range(scale.projected_per_budget):
+                name = rng.choice(expenses)
+                c.execute("""
+                    INSERT INTO transactions (category_id, amount, description, date, projected, status)
+                    VALUES (?, ?, ?, ?, 1, ?)
+                """, (category_ids[name], rng.randint(1_000, 50_000), f"Planned {name.lower()}",
+                      start.replace(day=rng.randint(1, last_day)).isoformat(),
+                      rng.choice(("Pending", "Pending", "completed", "skipped"))))
+                c.execute("INSERT INTO budget_transactions (budget_id, transaction_id) VALUES (?, ?)",
+                          (budget_id, c.lastrowid))
+
+        ledger.recalc_budget_ranges(conn)
+        c.execute("SELECT id FROM budgets")
+        for (budget_id,) in c.fetchall():
+            ledger.link_existing_transactions(conn, budget_id)
+
+    # Accounts and categories were inserted behind the ledger's back
+    ledger.invalidate_reference_data()
+    repair_balances(conn)
+    # A database in daily use has planner statistics from the app's PRAGMA optimize
+    conn.execute("ANALYZE")
+
+def generate_file(db_name, scale, seed=1):
+    """Create and populate a new database file"""
+    if os.path.exists(db_name):
+        raise FileExistsError(db_name)
+    conn = get_connection(db_name)
+    migrate(conn)
+    generate(conn, scale, seed)
+    return conn
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic BudgetBee database")
+    parser.add_argument("db", help="database file to create")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--transactions", type=int, help="override the scale's transaction count")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    scale = SCALES[args.scale]
+    if args.transactions:
+        scale = scale._replace(transactions=args.transactions)
+    generate_file(args.db, scale, args.seed)
+    print(f"Wrote {args.db}: {scale}")
@@ -0,0 +1,63 @@
+"""
+Cold start benchmark for BudgetBee.
+
+Each sample runs in a fresh interpreter and times three phases:
+importing main.py, BudgetBeeApp.build() (lazy: only the dashboard screen),
+and building every screen up front (what startup used to cost). Like the
+app itself it opens budgetbee.db in the repository directory.
+It also reports whether matplotlib was pulled in during startup.
+
+    python benchmarks/startup.py            # 5 runs
+    python benchmarks/startup.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child interpreter; prints one JSON object
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+app = main.BudgetBeeApp()
+sm = app.build()
+t2 = time.perf_counter()
+matplotlib_at_startup = "matplotlib" in sys.modules
+sm.build_all()
+t3 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "build_ms": (t2 - t1) * 1000,
+    "all_screens_ms": (t3 - t2) * 1000,
+    "matplotlib_at_startup": matplotlib_at_startup,
+}))
+"""
+
+def run_once():
+    env = dict(os.environ, KIVY_NO_ARGS="1", KIVY_NO_CONSOLELOG="1")
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure BudgetBee import and startup time")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = [run_once() for _ in range(args.runs)]
+
+    for field in ("import_ms", "build_ms", "all_screens_ms"):
+        values = [sample[field] for sample in samples]
+        print(f"{field:16} median {statistics.median(values):8.1f}  min {min(values):8.1f}")
+    print(f"{'matplotlib':16} {'imported' if any(s['matplotlib_at_startup'] for s in samples) else 'not imported'} at startup")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Benchmark suite for BudgetBee's database hot paths.
+
+Times the calls the screens make (through ledger and rollups, without Kivy)
+against a generated database: dashboard totals, the transaction list,
+transaction search, adding/editing/deleting a transaction, creating and
+linking a budget, budget summaries, both chart queries and the layout of
+one chart animation frame. Every write is undone before the next run, so a
+database can be reused between runs.
+
+Results are appended to a JSON history and compared with the last entry for
+a database of the same size; any median more than --threshold slower is
+reported and the exit status is 1.
+
+    python benchmarks/suite.py                              # small, temporary database
+    python benchmarks/suite.py --scale large --db bench-large.db --runs 50
+    python benchmarks/suite.py --trace bench-trace.json    # Chrome trace of every call
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import charts
+import ledger
+from database import check_query_plans, get_connection
+from generate import SCALES, generate_file, month_start
+from profiler import Profiler
+from rollups import category_totals
+
+HISTORY = os.path.join(ROOT, "benchmarks", "history.json")
+
+# Medians that move less than this are noise, whatever the percentage
+NOISE_MS = 0.2
+
+trace = None    # Profiler recording every timed call when --trace is given
+
+def timed(fn, *args, **kwargs):
+    """Call fn and return (milliseconds, result)"""
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    t1 = time.perf_counter()
+    if trace is not None:
+        trace.record_span(fn.__name__, "bench", t0, t1, 0)
+    return (t1 - t0) * 1000, result
+
+class Context:
+    """The database under test plus a few rows every benchmark can use"""
+
+    def __init__(self, db_name):
+        self.db_name = db_name
+        self.conn = get_connection(db_name)
+        c = self.conn.cursor()
+
+        c.execute("SELECT MIN(start_date), COUNT(*) FROM budgets")
+        first, budgets = c.fetchone()
+        self.first_month = datetime.strptime(first, "%Y-%m-%d").date()
+        self.budgets = budgets
+        c.execute("SELECT COUNT(*) FROM transactions")
+        self.transactions = c.fetchone()[0]
+
+        # A budget from the middle of the history
+        c.execute("SELECT id FROM budgets ORDER BY start_date LIMIT 1 OFFSET ?", (budgets // 2,))
+        self.budget_id = c.fetchone()[0]
+
+        self.account = ledger.list_active_accounts(self.conn)[0].name
+        self.category = "Groceries"
+        c.execute("SELECT id FROM categories WHERE name=?", (self.category,))
+        self.category_id = c.fetchone()[0]
+
+        # Keyset position halfway down the transaction list
+        c.execute("""
+            SELECT date, id FROM transactions
+            WHERE projected = 0
+            ORDER BY date DESC, id DESC
+            LIMIT 1 OFFSET ?
+        """, (self.transactions // 2,))
+        self.middle_page = tuple(c.fetchone())
+
+    def month(self, offset):
+        """First day of a month counted from the first budget (negative from the last)"""
+        if offset < 0:
+            offset += self.budgets
+        return month_start(offset, self.first_month)
+
+    def chart_range(self):
+        """Six months ending one month before the last budget, with ragged ends"""
+        start = self.month(-7).replace(day=10)
+        end = self.month(-2).replace(day=20)
+        return start.isoformat(), end.isoformat()
+
+# -----------------------------
+# Benchmarks
+# -----------------------------
+# Each takes (ctx, runs) and returns {name: [milliseconds per run]}
+
+def bench_dashboard(ctx, runs):
+    return {"dashboard totals": [timed(ledger.balance_totals, ctx.conn)[0] for _ in range(runs)]}
+
+def bench_transaction_list(ctx, runs):
+    return {
+        "transaction list first page": [timed(ledger.transaction_page, ctx.conn)[0] for _ in range(runs)],
+        "transaction list middle page": [
+            timed(ledger.transaction_page, ctx.conn, ctx.middle_page)[0] for _ in range(runs)
+        ],
+    }
+
+def bench_search(ctx, runs):
+    # Two words as typed (the last one unfinished), then facets alone
+    text = ledger.TransactionSearch(text="market caf")
+    facets = ledger.TransactionSearch(category_id=ctx.category_id, min_amount=1_000,
+                                      start_date=ctx.month(-13).isoformat(), end_date=ctx.month(-1).isoformat())
+    return {
+        "search text": [timed(ledger.search_transactions, ctx.conn, text)[0] for _ in range(runs)],
+        "search facets": [timed(ledger.search_transactions, ctx.conn, facets)[0] for _ in range(runs)],
+    }
+
+def bench_transaction_writes(ctx, runs):
+    add, edit, delete = [], [], []
+    day = ctx.month(ctx.budgets // 2).replace(day=12).isoformat()
+    for _ in range(runs):
+        ms, txn_id = timed(ledger.add_transaction, ctx.conn, ctx.account, ctx.category, 4_250, day, "benchmark")
+        add.append(ms)
+        edit.append(timed(ledger.update_transaction, ctx.conn, txn_id, ctx.account, ctx.category,
+                          5_100, day, "benchmark edited")[0])
+        delete.append(timed(ledger.delete_transaction, ctx.conn, txn_id)[0])
+    return {"add transaction": add, "edit transaction": edit, "delete transaction": delete}
+
+def bench_budget_create(ctx, runs):
+    samples = []
+    start = ctx.month(ctx.budgets // 2).replace(day=15).isoformat()
+    for _ in range(runs):
+        ms, budget_id = timed(ledger.add_budget, ctx.conn, "Benchmark budget", start)
+        samples.append(ms)
+
+        # Undo: drop its links, then the budget (which refits the other ranges)
+        ctx.conn.execute("DELETE FROM budget_transactions WHERE budget_id=?", (budget_id,))
+        ledger.delete_budget(ctx.conn, budget_id)
+    return {"create and link budget": samples}
+
+def bench_summaries(ctx, runs):
+    return {
+        "budget summary": [timed(ledger.get_budget_summary, ctx.conn, ctx.budget_id)[0] for _ in range(runs)],
+        "all budget summaries": [timed(ledger.list_budget_summaries, ctx.conn)[0] for _ in range(runs)],
+    }
+
+def bench_charts(ctx, runs):
+    # Same calls as main.fetch_expense_distribution and main.fetch_budget_vs_spending
+    start, end = ctx.chart_range()
+    excluded = ("System",) + ledger.TRANSFER_CATEGORIES
+
+    def expense_distribution():
+        return (category_totals(ctx.conn, start, end, projected=1, exclude_categories=excluded),
+                category_totals(ctx.conn, start, end, projected=0, exclude_categories=excluded))
+
+    def budget_vs_spending():
+        return (category_totals(ctx.conn, start, end, projected=1, include_transfers=False),
+                category_totals(ctx.conn, start, end, projected=0, include_transfers=False))
+
+    # One animation frame of both screens: blend halfway, then lay out every slice and bar
+    # Same series as the screens build: projected totals as stored, actual ones made positive
+    budget_rows, actual_rows = expense_distribution()
+    projected_rows, spent_rows = budget_vs_spending()
+    budget, actual = charts.series(budget_rows), charts.series(actual_rows, absolute=True)
+    projected, spent = charts.series(projected_rows), charts.series(spent_rows, absolute=True)
+    labels = sorted(set(projected) | set(spent))
+
+    def chart_frame():
+        for values in (budget, actual):
+            halfway = charts.blend({}, values, 0.5)
+            for _, start, end in charts.pie_angles(list(values), halfway):
+                charts.sector_vertices(200, 200, 180, start, end)
+        halfway = [charts.blend({}, projected, 0.5), charts.blend({}, spent, 0.5)]
+        top = charts.nice_ceiling(max(max(projected.values(), default=0), max(spent.values(), default=0)))
+        charts.bar_rects(70, 60, 800, 400, labels, halfway, top)
+
+    return {
+        "expense distribution chart": [timed(expense_distribution)[0] for _ in range(runs)],
+        "budget vs spending chart": [timed(budget_vs_spending)[0] for _ in range(runs)],
+        "chart animation frame": [timed(chart_frame)[0] for _ in range(runs)],
+    }
+
+BENCHMARKS = (
+    bench_dashboard,
+    bench_transaction_list,
+    bench_search,
+    bench_transaction_writes,
+    bench_budget_create,
+    bench_summaries,
+    bench_charts,
+)
+
+def run_suite(ctx, runs):
+    """Run every benchmark once untimed, then `runs` times; returns {name: stats}"""
+    results = {}
+    for bench in BENCHMARKS:
+        bench(ctx, 1)   # warm the page and statement caches
+        for name, samples in bench(ctx, runs).items():
+            samples.sort()
+            results[name] = {
+                "median_ms": round(statistics.median(samples), 3),
+                "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+                "min_ms": round(samples[0], 3),
+            }
+    return results
+
+# -----------------------------
+# History
+# -----------------------------
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+def previous_entry(history, entry):
+    """The most recent entry measured on a database of the same size"""
+    for old in reversed(history):
+        if old["transactions"] == entry["transactions"] and old["budgets"] == entry["budgets"]:
+            return old
+    return None
+
+def regressions(previous, results, threshold):
+    """[(name, old_median, new_median)] for medians that got slower than allowed"""
+    slower = []
+    for name, stats in results.items():
+        old = previous["results"].get(name) if previous else None
+        if old is None:
+            continue
+        if stats["median_ms"] > old["median_ms"] * (1 + threshold) and \
+                stats["median_ms"] - old["median_ms"] > NOISE_MS:
+            slower.append((name, old["median_ms"], stats["median_ms"]))
+    return slower
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BudgetBee's database hot paths")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--transactions", type=int, help="override the scale's transaction count")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--db", help="database to use; generated there first if it does not exist")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--history", default=HISTORY, help="JSON history file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown of a median before it counts as a regression")
+    parser.add_argument("--no-save", action="store_true", help="compare only, do not record this run")
+    parser.add_argument("--trace", help="also write every timed call to this Chrome trace file")
+    args = parser.parse_args()
+
+    global trace
+    if args.trace:
+        trace = Profiler()
+
+    scale = SCALES[args.scale]
+    if args.transactions:
+        scale = scale._replace(transactions=args.transactions)
+
+    workdir = None
+    db_name = args.db
+    if db_name is None:
+        workdir = tempfile.mkdtemp(prefix="budgetbee-bench-")
+        db_name = os.path.join(workdir, "bench.db")
+    try:
+        if not os.path.exists(db_name):
+            print(f"Generating {db_name}: {scale}")
+            seconds, _ = timed(generate_file, db_name, scale, args.seed)
+            print(f"  {seconds / 1000:.1f}s")
+
+        ctx = Context(db_name)
+        plan_failures = [name for name, _, _ in check_query_plans(ctx.conn)]
+        results = run_suite(ctx, args.runs)
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    entry = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "sqlite": sqlite3.sqlite_version,
+        "transactions": ctx.transactions,
+        "budgets": ctx.budgets,
+        "runs": args.runs,
+        "plan_failures": plan_failures,
+        "results": results,
+    }
+
+    history = load_history(args.history)
+    previous = previous_entry(history, entry)
+    slower = regressions(previous, results, args.threshold)
+
+    print(f"{ctx.transactions} transactions, {ctx.budgets} budgets, {args.runs} runs")
+    for name, stats in results.items():
+        old = previous["results"].get(name) if previous else None
+        change = f"{(stats['median_ms'] / old['median_ms'] - 1) * 100:+6.1f}%" if old and old["median_ms"] else ""
+        print(f"  {name:30} median {stats['median_ms']:9.3f}  p95 {stats['p95_ms']:9.3f}  "
+              f"min {stats['min_ms']:9.3f} ms  {change}")
+    for name in plan_failures:
+        print(f"query plan regression: {name} (run: python database.py {db_name})")
+    for name, old, new in slower:
+        print(f"REGRESSION {name}: {old:.3f} -> {new:.3f} ms")
+
+    if trace is not None:
+        trace.export(args.trace)
+
+    if not args.no_save:
+        history.append(entry)
+        with open(args.history, "w") as f:
+            json.dump(history, f, indent=1)
+
+    sys.exit(1 if slower or plan_failures else 0)
+
+if __name__ == "__main__":
+    main()
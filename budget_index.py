@@ -0,0 +1,71 @@
+import threading
+from bisect import bisect_right
+
+from database import connection_serial
+from events import subscribe
+
+# -----------------------------
+# Budget period index
+# -----------------------------
+# Budgets partition the calendar into periods: each one runs from its
+# start_date to its end_date, where a missing end date (NULL or "Current")
+# means the period is still open. The periods are loaded once per connection
+# into a list sorted by start date, so finding the budget for a transaction
+# date is a bisect instead of a query. Writes to budgets are published (see
+# events.py) and drop every cached index, as does invalidate_budget_index().
+# Connections not from database.get_connection are never cached.
+
+OPEN_END = ("", None, "Current")
+
+class BudgetIndex:
+    """Sorted in-memory list of budget periods, searched with bisect"""
+
+    def __init__(self, conn):
+        c = conn.cursor()
+        c.execute("SELECT id, start_date, end_date FROM budgets ORDER BY start_date ASC, id ASC")
+        rows = c.fetchall()
+        self._starts = [start for _, start, _ in rows]     # ascending
+        self._periods = [(budget_id, None if end in OPEN_END else end) for budget_id, _, end in rows]
+
+    def find(self, txn_date):
+        """Return the id of the budget whose period contains txn_date, or None"""
+        # Latest budget that started on or before the date
+        i = bisect_right(self._starts, txn_date) - 1
+        if i < 0:
+            return None
+        budget_id, end_date = self._periods[i]
+        if end_date is not None and txn_date > end_date:
+            return None
+        return budget_id
+
+_indexes = {}       # connection serial -> BudgetIndex
+_generation = 0     # Bumped on every invalidation so in-flight loads are not kept
+_lock = threading.Lock()
+
+def get_budget_index(conn) -> BudgetIndex:
+    """The cached budget periods for a connection, loading them if needed"""
+    serial = connection_serial(conn)
+    with _lock:
+        index = _indexes.get(serial)
+        generation = _generation
+    if index is not None:
+        return index
+
+    index = BudgetIndex(conn)
+    if serial:
+        with _lock:
+            if generation == _generation:
+                _indexes[serial] = index
+    return index
+
+def find_budget(conn, txn_date):
+    return get_budget_index(conn).find(txn_date)
+
+def invalidate_budget_index(_changed=None):
+    """Drop every cached index (subscribed to budget writes)"""
+    global _generation
+    with _lock:
+        _indexes.clear()
+        _generation += 1
+
+subscribe(("budgets",), invalidate_budget_index, implied=False)
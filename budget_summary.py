@@ -0,0 +1,106 @@
+from collections import namedtuple
+
+# -----------------------------
+# Budget summary engine
+# -----------------------------
+# Allocated, spent, projected and remaining for one budget or for all of them,
+# computed by a single grouped query. The three sources are summed per budget,
+# stacked with UNION ALL, tagged by kind, and folded into one row per budget
+# with conditional aggregation, so listing years of budgets costs one query,
+# not one per budget.
+#
+#   allocated  sum of the budget's budgeted_categories
+#   spent      money out (negative, non-projected, non-transfer) dated inside
+#              the budget's period, flipped positive; read from rollup_daily
+#   projected  pending projected transactions linked to the budget
+#   remaining  allocated - spent - projected
+
+BudgetSummary = namedtuple(
+    "BudgetSummary",
+    "budget_id name start_date end_date allocated spent projected remaining",
+)
+
+# Last day of a budget's period; NULL and "Current" both mean still open
+PERIOD_END = "COALESCE(NULLIF({b}.end_date, 'Current'), '9999-12-31')"
+
+SUMMARY_SQL = """
+    SELECT b.id, b.name, b.start_date, b.end_date,
+           COALESCE(SUM(CASE WHEN x.kind = 0 THEN x.amount END), 0) AS allocated,
+           COALESCE(-SUM(CASE WHEN x.kind = 1 THEN x.amount END), 0) AS spent,
+           COALESCE(SUM(CASE WHEN x.kind = 2 THEN x.amount END), 0) AS projected
+    FROM budgets b
+    LEFT JOIN (
+        SELECT 0 AS kind, bc.budget_id, SUM(bc.allocated_amount) AS amount
+        FROM budgeted_categories bc
+        WHERE 1 {allocated_filter}
+        GROUP BY bc.budget_id
+        UNION ALL
+        SELECT 1, pb.id, SUM(r.debit)
+        FROM budgets pb
+        JOIN rollup_daily r
+          ON r.day >= pb.start_date
+         AND r.day <= {period_end}
+        WHERE r.projected = 0 AND r.is_transfer = 0 {spent_filter}
+        GROUP BY pb.id
+        UNION ALL
+        SELECT 2, bt.budget_id, SUM(t.amount)
+        FROM budget_transactions bt
+        JOIN transactions t ON t.id = bt.transaction_id
+        WHERE t.projected = 1 AND t.status = 'Pending' {projected_filter}
+        GROUP BY bt.budget_id
+    ) x ON x.budget_id = b.id
+    WHERE 1 {budget_filter}
+    GROUP BY b.id
+    ORDER BY b.start_date {order}, b.id {order}
+"""
+
+def _summary_rows(c):
+    for budget_id, name, start, end, allocated, spent, projected in c:
+        yield BudgetSummary(budget_id, name, start, end, allocated, spent, projected,
+                            allocated - spent - projected)
+
+def summary_query(budget_id=None, start_date=None, end_date=None, newest_first=True):
+    """Build the summary SQL and its parameters (see summarize_budgets)"""
+    params = {}
+    budget_filter = ""
+    filters = dict.fromkeys(("allocated_filter", "spent_filter", "projected_filter"), "")
+
+    if budget_id is not None:
+        # Filter every branch so each one can use its budget_id index
+        params["budget_id"] = budget_id
+        budget_filter = "AND b.id = :budget_id"
+        filters = {
+            "allocated_filter": "AND bc.budget_id = :budget_id",
+            "spent_filter": "AND pb.id = :budget_id",
+            "projected_filter": "AND bt.budget_id = :budget_id",
+        }
+    if start_date:
+        params["start_date"] = start_date
+        budget_filter += " AND b.start_date >= :start_date"
+    if end_date:
+        params["end_date"] = end_date
+        budget_filter += " AND b.start_date <= :end_date"
+
+    sql = SUMMARY_SQL.format(
+        period_end=PERIOD_END.format(b="pb"),
+        budget_filter=budget_filter,
+        order="DESC" if newest_first else "ASC",
+        **filters,
+    )
+    return sql, params
+
+def summarize_budgets(conn, budget_id=None, start_date=None, end_date=None, newest_first=True):
+    """
+    Yield a BudgetSummary per budget, newest first by default.
+    budget_id limits it to one budget; start_date/end_date filter on the
+    budget's start date. Rows stream from the cursor.
+    """
+    c = conn.cursor()
+    c.execute(*summary_query(budget_id, start_date, end_date, newest_first))
+    return _summary_rows(c)
+
+def summarize_budget(conn, budget_id):
+    """BudgetSummary for one budget (all zeros if it does not exist)"""
+    for summary in summarize_budgets(conn, budget_id=budget_id):
+        return summary
+    return BudgetSummary(budget_id, None, None, None, 0, 0, 0, 0)
@@ -0,0 +1,298 @@
+import math
+from functools import lru_cache
+
+from kivy.animation import Animation
+from kivy.core.text import Label as CoreLabel
+from kivy.core.window import Window
+from kivy.graphics import Color, InstructionGroup, Line, Mesh, Rectangle
+from kivy.properties import ListProperty, NumericProperty, StringProperty
+from kivy.uix.label import Label
+from kivy.uix.widget import Widget
+
+from charts import (
+    Y_TICKS, bar_rects, blend, color, ease_out, merged_labels, nice_ceiling,
+    pie_angles, pie_caption, rect_at, sector_at, sector_vertices,
+)
+from money import format_money
+
+# -----------------------------
+# Native Kivy charts
+# -----------------------------
+# Pie and grouped-bar charts drawn with canvas instructions (see charts.py for
+# the geometry). Each slice or bar keeps its instructions for the life of the
+# widget; a redraw only moves vertices and rectangles, so a transition between
+# datasets is animated frame by frame without rasterizing anything. Text
+# (titles, axis labels) is rasterized once per distinct string and cached.
+
+TRANSITION_SECONDS = 0.4
+TEXT_COLOR = (1, 1, 1, 1)
+AXIS_COLOR = (0.6, 0.6, 0.6, 1)
+GRID_COLOR = (0.35, 0.35, 0.35, 1)
+MIN_LABELLED_SWEEP = 0.35   # Radians; thinner slices are labelled on hover only
+
+@lru_cache(maxsize=512)
+def text_texture(text, font_size=14):
+    label = CoreLabel(text=text, font_size=font_size)
+    label.refresh()
+    return label.texture
+
+class HoverLabel(Label):
+    """Caption shown next to the pointer over a slice or bar"""
+
+    def __init__(self, **kwargs):
+        super().__init__(size_hint=(None, None), font_size="13sp", opacity=0, **kwargs)
+        with self.canvas.before:
+            Color(0, 0, 0, 0.8)
+            self._background = Rectangle()
+        self.bind(pos=self._place_background, size=self._place_background)
+
+    def _place_background(self, *_args):
+        self._background.pos = self.pos
+        self._background.size = self.size
+
+    def show(self, text, x, y, bounds):
+        self.text = text
+        self.texture_update()
+        self.size = (self.texture_size[0] + 12, self.texture_size[1] + 8)
+        # Keep it inside the chart
+        self.x = min(x + 12, bounds.right - self.width)
+        self.y = min(y + 12, bounds.top - self.height)
+        self.opacity = 1
+
+    def hide(self):
+        self.opacity = 0
+
+class Chart(Widget):
+    """
+    Base for the charts: holds the series shown (old and new during a
+    transition), animates `progress` between them and shows hover labels.
+    Subclasses implement draw() and caption_at().
+    """
+    title = StringProperty("")
+    empty_text = StringProperty("No data")
+    progress = NumericProperty(1.0)
+    series_names = ListProperty([])
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._old = []
+        self._new = []
+        self.labels = []
+        with self.canvas:
+            self.shapes = InstructionGroup()
+            self.texts = InstructionGroup()
+        self.hover = HoverLabel()
+        self.add_widget(self.hover)
+
+        self.bind(pos=self.redraw, size=self.redraw, progress=self.redraw, title=self.redraw)
+        Window.bind(mouse_pos=self.on_mouse_pos)
+
+    def set_data(self, *new_series, animate=True):
+        """Show new series ({label: cents} each), moving there from what is shown now"""
+        Animation.cancel_all(self, "progress")
+        self._old = self.current() if self._new else [{} for _ in new_series]
+        self._new = [dict(values) for values in new_series]
+        self.labels = merged_labels(self._old, self._new)
+        self.hover.hide()
+        if animate and self.get_root_window() is not None:
+            self.progress = 0
+            Animation(progress=1, duration=TRANSITION_SECONDS).start(self)
+        else:
+            self.progress = 1
+            self.redraw()
+
+    def current(self):
+        """The series as drawn right now (blended mid-transition)"""
+        t = ease_out(self.progress)
+        return [blend(old, new, t) for old, new in zip(self._old, self._new)]
+
+    def settled(self):
+        return self.progress >= 1
+
+    def redraw(self, *_args):
+        if self.settled():
+            # Labels only present in the old data have shrunk away
+            self.labels = merged_labels([], self._new)
+        self.texts.clear()
+        if self.title:
+            self.add_text(self.title, self.center_x, self.top - 14, font_size=16)
+        if not any(self._new):
+            self.add_text(self.empty_text, self.center_x, self.center_y)
+        self.draw(self.current())
+
+    def draw(self, values):
+        raise NotImplementedError
+
+    def caption_at(self, x, y):
+        """Hover caption for the point (x, y) in widget coordinates, or None"""
+        raise NotImplementedError
+
+    def add_text(self, text, x, y, font_size=14, anchor="center"):
+        """Draw cached text centred (or right/left aligned) on x and centred on y"""
+        texture = text_texture(text, font_size)
+        width, height = texture.size
+        left = {"center": x - width / 2, "right": x - width, "left": x}[anchor]
+        self.texts.add(Color(*TEXT_COLOR))
+        self.texts.add(Rectangle(texture=texture, pos=(left, y - height / 2), size=texture.size))
+
+    def point_hovered(self, x, y):
+        caption = self.caption_at(x, y) if self.settled() and self.collide_point(x, y) else None
+        if caption:
+            self.hover.show(caption, x, y, self)
+        else:
+            self.hover.hide()
+
+    def on_mouse_pos(self, _window, pos):
+        if self.get_root_window() is None:
+            return  # Not on screen
+        self.point_hovered(*self.to_widget(*pos))
+
+    def on_touch_down(self, touch):
+        # No pointer on touch screens: a tap shows the caption
+        if self.collide_point(*touch.pos):
+            self.point_hovered(*touch.pos)
+        return super().on_touch_down(touch)
+
+class PieChart(Chart):
+    """One series as a pie, slices by label, captions with amount and share"""
+
+    def __init__(self, **kwargs):
+        self._slices = {}   # label -> (Color, Mesh)
+        self._angles = []
+        super().__init__(**kwargs)
+
+    def geometry(self):
+        """(cx, cy, radius) leaving room for the title"""
+        radius = max(min(self.width, self.height - 40) / 2 - 10, 0)
+        return self.center_x, self.y + (self.height - 30) / 2, radius
+
+    def draw(self, values):
+        values = values[0] if values else {}
+        cx, cy, radius = self.geometry()
+        self._angles = pie_angles(self.labels, values)
+        drawn = set()
+        for index, (label, start, end) in enumerate(self._angles):
+            if label not in self._slices:
+                slice_color = Color()
+                mesh = Mesh(mode="triangle_fan")
+                self.shapes.add(slice_color)
+                self.shapes.add(mesh)
+                self._slices[label] = (slice_color, mesh)
+            slice_color, mesh = self._slices[label]
+            slice_color.rgb = color(index)
+            mesh.vertices = sector_vertices(cx, cy, radius, start, end)
+            mesh.indices = list(range(len(mesh.vertices) // 4))
+            drawn.add(label)
+
+        for label, (_, mesh) in self._slices.items():
+            if label not in drawn:
+                mesh.vertices, mesh.indices = [], []
+
+        if self.settled():
+            self.draw_slice_labels(cx, cy, radius)
+
+    def draw_slice_labels(self, cx, cy, radius):
+        """Name and share inside every slice big enough to hold them"""
+        for label, start, end in self._angles:
+            if end - start < MIN_LABELLED_SWEEP:
+                continue
+            middle = (start + end) / 2
+            share = 100 * (end - start) / (2 * math.pi)
+            self.add_text(f"{label[:12]} {share:.0f}%", cx + radius * 0.62 * math.cos(middle),
+                          cy + radius * 0.62 * math.sin(middle), font_size=12)
+
+    def caption_at(self, x, y):
+        index = sector_at(*self.geometry(), self._angles, x, y)
+        if index is None:
+            return None
+        values = self.current()[0]
+        label = self._angles[index][0]
+        return pie_caption(label, values.get(label, 0), sum(values.values()))
+
+class BarChart(Chart):
+    """Series side by side per label (e.g. projected vs actual), with a legend"""
+    padding_left = NumericProperty(70)
+    padding_bottom = NumericProperty(60)
+
+    def __init__(self, **kwargs):
+        self._bars = {}     # (series, label) -> (Color, Rectangle)
+        self._rects = []
+        self._top = self._old_top = self._new_top = 1
+        super().__init__(**kwargs)
+        with self.canvas.before:
+            Color(*GRID_COLOR)
+            self._grid = Mesh(mode="lines")
+            Color(*AXIS_COLOR)
+            self._axes = Line(width=1.2)
+
+    def plot_area(self):
+        """(x, y, width, height) of the bars, inside the axes"""
+        x = self.x + self.padding_left
+        y = self.y + self.padding_bottom
+        return x, y, max(self.right - x - 10, 0), max(self.top - y - 60, 0)
+
+    def set_data(self, *new_series, animate=True):
+        # The scale moves from the old nice maximum to the new one with the bars
+        self._old_top = self._top
+        self._new_top = nice_ceiling(max((max(values.values(), default=0) for values in new_series), default=0))
+        super().set_data(*new_series, animate=animate)
+
+    def draw(self, values):
+        x, y, width, height = self.plot_area()
+        self._top = self._old_top + (self._new_top - self._old_top) * ease_out(self.progress)
+        self._rects = bar_rects(x, y, width, height, self.labels, values, self._top)
+
+        drawn = set()
+        for number, bars in enumerate(self._rects):
+            for label, (bx, by, bw, bh) in zip(self.labels, bars):
+                key = (number, label)
+                if key not in self._bars:
+                    bar_color = Color(*color(number))
+                    rect = Rectangle()
+                    self.shapes.add(bar_color)
+                    self.shapes.add(rect)
+                    self._bars[key] = (bar_color, rect)
+                _, rect = self._bars[key]
+                rect.pos = (bx, by)
+                rect.size = (bw, bh)
+                drawn.add(key)
+        for key, (_, rect) in self._bars.items():
+            if key not in drawn:
+                rect.size = (0, 0)
+
+        # Axes and gridlines
+        self._axes.points = [x, y + height, x, y, x + width, y]
+        grid = []
+        for tick in range(1, Y_TICKS + 1):
+            gy = y + height * tick / Y_TICKS
+            grid += [x, gy, 0, 0, x + width, gy, 0, 0]
+        self._grid.vertices = grid
+        self._grid.indices = list(range(len(grid) // 4))
+
+        if self.settled():
+            self.draw_labels(x, y, width, height)
+
+    def draw_labels(self, x, y, width, height):
+        """Tick values, category names and the legend (static text only)"""
+        for tick in range(Y_TICKS + 1):
+            self.add_text(format_money(round(self._top * tick / Y_TICKS)), x - 6, y + height * tick / Y_TICKS,
+                          font_size=12, anchor="right")
+        if self.labels:
+            slot = width / len(self.labels)
+            for index, label in enumerate(self.labels):
+                self.add_text(label[:12], x + slot * (index + 0.5), y - 14, font_size=12)
+        for number, name in enumerate(self.series_names):
+            lx = x + 10 + number * 110
+            ly = self.top - 40
+            self.texts.add(Color(*color(number)))
+            self.texts.add(Rectangle(pos=(lx, ly - 6), size=(12, 12)))
+            self.add_text(name, lx + 18, ly, font_size=12, anchor="left")
+
+    def caption_at(self, x, y):
+        hit = rect_at(self._rects, x, y)
+        if hit is None:
+            return None
+        number, index = hit
+        label = self.labels[index]
+        name = self.series_names[number] if number < len(self.series_names) else ""
+        return f"{label} {name}: {format_money(round(self.current()[number].get(label, 0)))}"
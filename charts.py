@@ -0,0 +1,139 @@
+import math
+
+from money import format_money
+
+# -----------------------------
+# Chart geometry
+# -----------------------------
+# Charts are drawn straight onto the Kivy canvas by chart_widgets.py: a Mesh
+# per pie slice, a Rectangle per bar. Everything here is plain Python with no
+# Kivy dependency (so the benchmark harness can time it): turning query
+# results into series, blending two datasets for the transition between
+# them, the geometry of slices and bars, and hit testing for hover labels.
+#
+# A series is {label: cents}; a chart shows one or more series over the same
+# labels. Values are blended as floats and only formatted for display.
+
+# matplotlib's default ("tab10") colours, so the charts look as they did
+PALETTE = (
+    (0.122, 0.467, 0.706), (1.000, 0.498, 0.055), (0.173, 0.627, 0.173),
+    (0.839, 0.153, 0.157), (0.580, 0.404, 0.741), (0.549, 0.337, 0.294),
+    (0.890, 0.467, 0.761), (0.498, 0.498, 0.498), (0.737, 0.741, 0.133),
+    (0.090, 0.745, 0.812),
+)
+
+ARC_SEGMENTS = 96           # Segments in a full circle; a slice gets its share
+BAR_WIDTH = 0.35            # Of each category's slot, per series
+Y_TICKS = 4                 # Gridlines above the baseline
+
+def color(index):
+    return PALETTE[index % len(PALETTE)]
+
+# -----------------------------
+# Series
+# -----------------------------
+def series(rows, absolute=False):
+    """{category: cents} from category_totals rows; absolute=True for actual spending"""
+    return {name: abs(total) if absolute else total for name, total in rows if total}
+
+def merged_labels(old, new):
+    """Labels of every series in new (in order), then those only in old"""
+    labels = {}
+    for values in (*new, *old):
+        labels.update(dict.fromkeys(values))
+    return list(labels)
+
+def blend(old, new, t):
+    """Series between old (t=0) and new (t=1); labels missing on one side count as 0"""
+    labels = set(old) | set(new)
+    return {label: old.get(label, 0) + (new.get(label, 0) - old.get(label, 0)) * t
+            for label in labels}
+
+def ease_out(t):
+    """Cubic ease-out for transitions"""
+    return 1 - (1 - t) ** 3
+
+# -----------------------------
+# Pie charts
+# -----------------------------
+def pie_angles(labels, values):
+    """
+    [(label, start, end)] in radians, counter-clockwise from 12 o'clock (like
+    matplotlib's startangle=90). Labels with no value get empty slices.
+    """
+    total = sum(values.get(label, 0) for label in labels)
+    angles = []
+    angle = math.pi / 2
+    for label in labels:
+        sweep = 2 * math.pi * values.get(label, 0) / total if total > 0 else 0
+        angles.append((label, angle, angle + sweep))
+        angle += sweep
+    return angles
+
+def sector_vertices(cx, cy, radius, start, end):
+    """Mesh vertices (x, y, u, v) for a triangle fan covering one slice"""
+    if end - start <= 0:
+        return []
+    steps = max(2, math.ceil(ARC_SEGMENTS * (end - start) / (2 * math.pi)))
+    vertices = [cx, cy, 0, 0]
+    for step in range(steps + 1):
+        angle = start + (end - start) * step / steps
+        vertices += [cx + radius * math.cos(angle), cy + radius * math.sin(angle), 0, 0]
+    return vertices
+
+def sector_at(cx, cy, radius, angles, x, y):
+    """Index of the slice under (x, y), or None"""
+    dx, dy = x - cx, y - cy
+    if dx * dx + dy * dy > radius * radius:
+        return None
+    angle = math.atan2(dy, dx)
+    for index, (_, start, end) in enumerate(angles):
+        # Slices run from pi/2 to 5*pi/2; bring the point into that turn
+        turned = angle + 2 * math.pi * math.ceil((start - angle) / (2 * math.pi))
+        if end > start and turned < end:
+            return index
+    return None
+
+def pie_caption(label, cents, total):
+    percent = 100 * cents / total if total else 0
+    return f"{label}: {format_money(round(cents))} ({percent:.1f}%)"
+
+# -----------------------------
+# Bar charts
+# -----------------------------
+def nice_ceiling(value):
+    """Smallest 1, 2, 2.5 or 5 times a power of ten that is >= value"""
+    if value <= 0:
+        return 1
+    power = 10 ** math.floor(math.log10(value))
+    for step in (1, 2, 2.5, 5, 10):
+        if value <= step * power:
+            return step * power
+    return 10 * power
+
+def bar_rects(x, y, width, height, labels, all_values, top):
+    """
+    [[(x, y, w, h) per label] per series] for bars grouped by label, side by
+    side within each label's slot, scaled so that `top` reaches the full height.
+    """
+    if not labels:
+        return [[] for _ in all_values]
+    slot = width / len(labels)
+    bar = slot * BAR_WIDTH
+    first = (slot - bar * len(all_values)) / 2
+    rects = []
+    for number, values in enumerate(all_values):
+        rects.append([
+            (x + slot * index + first + bar * number, y, bar,
+             height * max(values.get(label, 0), 0) / top if top else 0)
+            for index, label in enumerate(labels)
+        ])
+    return rects
+
+def rect_at(rects, x, y):
+    """(series, index) of the bar under (x, y), or None"""
+    for number, bars in enumerate(rects):
+        for index, (bx, by, bw, bh) in enumerate(bars):
+            if bx <= x <= bx + bw and by <= y <= by + max(bh, 2):
+                return number, index
+    return None
@@ -0,0 +1,311 @@
+import sqlite3
+import threading
+
+from budget_summary import summary_query
+from instrument import connection_factory
+from search import TransactionSearch, search_query
+
+# Database file name
+DB_NAME = "budgetbee.db"
+
+# Number of prepared statements each connection keeps around for reuse
+STATEMENT_CACHE_SIZE = 256
+
+# Long-lived connections, one per (thread, database file)
+_local = threading.local()
+_lock = threading.Lock()
+_all_connections = []
+_generation = 0     # Bumped by close_connections() so threads drop stale pools
+_serials = {}       # id(connection) -> serial number, see connection_serial()
+_next_serial = 0
+
+def configure_connection(conn):
+    """Apply the settings every BudgetBee connection should have"""
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA cache_size = -16000")  # ~16 MB page cache
+    return conn
+
+def open_connection(db_name=DB_NAME):
+    """Open a new, fully configured connection (not pooled)"""
+    conn = sqlite3.connect(
+        db_name,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=False,
+        factory=connection_factory(),
+    )
+    return configure_connection(conn)
+
+def get_connection(db_name=DB_NAME):
+    """
+    Return the long-lived connection for the current thread.
+
+    The connection is opened on first use and reused afterwards, so callers
+    should not close it. Used as a context manager it commits on success
+    and rolls back on error, just like a fresh sqlite3 connection.
+    """
+    global _next_serial
+    pool = getattr(_local, "connections", None)
+    if pool is None or _local.generation != _generation:
+        pool = _local.connections = {}
+        _local.generation = _generation
+
+    conn = pool.get(db_name)
+    if conn is None:
+        conn = open_connection(db_name)
+        pool[db_name] = conn
+        with _lock:
+            _all_connections.append(conn)
+            _next_serial += 1
+            _serials[id(conn)] = _next_serial
+    return conn
+
+def connection_serial(conn):
+    """Unique number of a pooled connection (0 for connections not from get_connection)"""
+    return _serials.get(id(conn), 0)
+
+def close_connections():
+    """Close every pooled connection (call on app shutdown)"""
+    global _generation
+    with _lock:
+        for conn in _all_connections:
+            try:
+                # Let SQLite refresh planner statistics it thinks are stale
+                conn.execute("PRAGMA optimize")
+                conn.close()
+            except sqlite3.Error:
+                pass
+        _all_connections.clear()
+        _serials.clear()
+        _generation += 1
+
+# -----------------------------
+# Indexes
+# -----------------------------
+# Secondary indexes BudgetBee relies on for its date-range and lookup queries.
+# Migrations create them from their own frozen DDL; a new index needs a new
+# migration as well as an entry here (tests check a migrated database has them all).
+INDEXES = {
+    "idx_transactions_date":
+        "CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date)",
+    "idx_transactions_account_date":
+        "CREATE INDEX IF NOT EXISTS idx_transactions_account_date ON transactions(account_id, date)",
+    "idx_transactions_category_date":
+        "CREATE INDEX IF NOT EXISTS idx_transactions_category_date ON transactions(category_id, date)",
+    "idx_transactions_projected_status":
+        "CREATE INDEX IF NOT EXISTS idx_transactions_projected_status ON transactions(projected, status)",
+    "idx_budget_transactions_budget_txn":
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_budget_transactions_budget_txn ON budget_transactions(budget_id, transaction_id)",
+}
+
+def explain_query_plan(conn, sql, params=()):
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement"""
+    c = conn.cursor()
+    c.execute("EXPLAIN QUERY PLAN " + sql, params)
+    return [row[3] for row in c.fetchall()]
+
+# Hot queries and the index each one must be planned with.
+# The unary "+" on projected keeps the planner from preferring the low-selectivity
+# (projected, status) index over the date index for date-range scans.
+PLAN_EXPECTATIONS = [
+    (
+        "budget summary",
+        *summary_query(budget_id=1),
+        "PRIMARY KEY (day>? AND day<?)",
+    ),
+    (
+        "budget summary projected",
+        *summary_query(budget_id=1),
+        "idx_budget_transactions_budget_txn",
+    ),
+    (
+        "all budget summaries",
+        *summary_query(),
+        "PRIMARY KEY (day>? AND day<?)",
+    ),
+    (
+        "transaction list page",
+        """
+            SELECT t.id, a.name, c.name, t.amount, t.date, t.description
+            FROM transactions t
+            JOIN accounts a ON t.account_id = a.id
+            JOIN categories c ON t.category_id = c.id
+            WHERE +t.projected = 0 AND c.name != 'System'
+            AND (t.date, t.id) < (?, ?)
+            ORDER BY t.date DESC, t.id DESC
+            LIMIT ?
+        """,
+        ("2024-01-31", 1000, 100),
+        "idx_transactions_date",
+    ),
+    (
+        "transaction search",
+        *search_query(TransactionSearch(text="groceries", start_date="2024-01-01")),
+        "VIRTUAL TABLE INDEX",
+    ),
+    (
+        "transactions by account",
+        *search_query(TransactionSearch(account_id=1), after=("2024-01-31", 1000)),
+        "idx_transactions_account_date",
+    ),
+    (
+        "transactions by category",
+        *search_query(TransactionSearch(category_id=1, min_amount=1000)),
+        "idx_transactions_category_date",
+    ),
+    (
+        "link transactions to budget",
+        """SELECT b.id, t.id FROM budgets b
+           JOIN transactions t
+             ON t.date >= b.start_date
+            AND t.date <= COALESCE(NULLIF(b.end_date, 'Current'), '9999-12-31')
+           WHERE b.id = ?""",
+        (1,),
+        "idx_transactions_date",
+    ),
+    (
+        "account history",
+        "SELECT id, amount FROM transactions WHERE account_id=? AND date >= ?",
+        (1, "2024-01-01"),
+        "idx_transactions_account_date",
+    ),
+    (
+        "category history",
+        "SELECT SUM(amount) FROM transactions WHERE category_id=? AND date BETWEEN ? AND ?",
+        (1, "2024-01-01", "2024-01-31"),
+        "idx_transactions_category_date",
+    ),
+    (
+        "pending projections",
+        "SELECT id FROM transactions WHERE projected=1 AND status='Pending'",
+        (),
+        "idx_transactions_projected_status",
+    ),
+]
+
+def check_query_plans(conn):
+    """
+    Verify every query in PLAN_EXPECTATIONS uses its index.
+    Returns a list of (name, expected_index, plan) for each query that does not.
+    """
+    failures = []
+    for name, sql, params, index in PLAN_EXPECTATIONS:
+        plan = explain_query_plan(conn, sql, params)
+        if not any(index in detail for detail in plan):
+            failures.append((name, index, plan))
+    return failures
+
+# -----------------------------
+# Balance triggers
+# -----------------------------
+# accounts.balance is maintained by SQLite itself: every write to a real
+# (non-projected) transaction adjusts its account in the same statement, so
+# the application never reads a balance, adds to it in Python and writes it back.
+BALANCE_TRIGGERS = {
+    "trg_transactions_balance_insert": """
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_insert
+        AFTER INSERT ON transactions
+        WHEN NEW.account_id IS NOT NULL AND NEW.projected = 0
+        BEGIN
+            UPDATE accounts SET balance = balance + NEW.amount WHERE id = NEW.account_id;
+        END
+    """,
+    "trg_transactions_balance_delete": """
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_delete
+        AFTER DELETE ON transactions
+        WHEN OLD.account_id IS NOT NULL AND OLD.projected = 0
+        BEGIN
+            UPDATE accounts SET balance = balance - OLD.amount WHERE id = OLD.account_id;
+        END
+    """,
+    "trg_transactions_balance_update": """
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_update
+        AFTER UPDATE OF account_id, amount, projected ON transactions
+        BEGIN
+            UPDATE accounts SET balance = balance - OLD.amount
+            WHERE id = OLD.account_id AND OLD.projected = 0;
+            UPDATE accounts SET balance = balance + NEW.amount
+            WHERE id = NEW.account_id AND NEW.projected = 0;
+        END
+    """,
+}
+
+def create_balance_triggers(conn):
+    """Create any missing trigger from BALANCE_TRIGGERS (the caller commits)"""
+    c = conn.cursor()
+    for sql in BALANCE_TRIGGERS.values():
+        c.execute(sql)
+
+def add_new_transactions_to_balances(conn, last_id):
+    """
+    Add every real transaction with id > last_id to its account's balance,
+    for bulk loads made without the insert trigger (the caller commits)
+    """
+    conn.execute("""
+        UPDATE accounts
+        SET balance = balance + (
+            SELECT SUM(t.amount) FROM transactions t
+            WHERE t.id > :last_id AND t.account_id = accounts.id AND t.projected = 0
+        )
+        WHERE id IN (SELECT account_id FROM transactions WHERE id > :last_id AND projected = 0)
+    """, {"last_id": last_id})
+
+# -----------------------------
+# Integrity checks
+# -----------------------------
+# An account's opening balance is itself recorded as its first System
+# transaction, so the ledger alone accounts for the whole balance.
+LEDGER_BALANCES_SQL = """
+    SELECT a.id, a.name, a.balance, COALESCE(SUM(t.amount), 0) AS ledger
+    FROM accounts a
+    LEFT JOIN transactions t ON t.account_id = a.id AND t.projected = 0
+    GROUP BY a.id
+"""
+
+def verify_balances(conn):
+    """
+    Check every account's stored balance against the sum of its transactions.
+    Returns a list of (account_id, name, balance, ledger_sum) for each mismatch.
+    """
+    c = conn.cursor()
+    c.execute(LEDGER_BALANCES_SQL)
+    return [row for row in c.fetchall() if row[2] != row[3]]
+
+def repair_balances(conn):
+    """Reset every drifted balance to its ledger sum; returns the accounts fixed"""
+    mismatches = verify_balances(conn)
+    with conn:
+        conn.executemany(
+            "UPDATE accounts SET balance = ? WHERE id = ?",
+            [(ledger, account_id) for account_id, _, _, ledger in mismatches]
+        )
+    return mismatches
+
+if __name__ == "__main__":
+    # Usage: python database.py [--repair] [db_file]
+    # Exits non-zero if a hot query misses its index or a balance has drifted.
+    # --repair first resets drifted balances to their ledger sums.
+    import sys
+
+    args = sys.argv[1:]
+    repair = "--repair" in args
+    if repair:
+        args.remove("--repair")
+
+    conn = get_connection(args[0] if args else DB_NAME)
+    failures = check_query_plans(conn)
+    for name, index, plan in failures:
+        print(f"{name}: expected {index}, got {plan}")
+
+    if repair:
+        for account_id, name, balance, ledger in repair_balances(conn):
+            print(f"account {account_id} ({name}): balance {balance} reset to ledger {ledger}")
+
+    mismatches = verify_balances(conn)
+    for account_id, name, balance, ledger in mismatches:
+        print(f"account {account_id} ({name}): balance {balance} != ledger {ledger}")
+    if mismatches:
+        print("Reset balances to the ledger with: python database.py --repair")
+
+    sys.exit(1 if failures or mismatches else 0)
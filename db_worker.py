@@ -0,0 +1,74 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from instrument import bind_scope
+
+# -----------------------------
+# Background database worker
+# -----------------------------
+# Queries submitted here run on one dedicated thread, which gets its own pooled
+# connection from database.get_connection(). Results come back as futures, or
+# are delivered to a callback on the Kivy main thread via Clock.schedule_once.
+# A failed job (e.g. "database is locked" while another process writes) is
+# logged and never raised into the Clock, where it would end the app.
+
+_executor = None
+_log = logging.getLogger("budgetbee.db_worker")
+
+def get_executor():
+    """Return the worker thread's executor, starting it on first use"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="budgetbee-db")
+    return _executor
+
+def submit(fn, *args, **kwargs):
+    """Run fn(*args, **kwargs) on the worker thread and return a concurrent.futures.Future"""
+    # With SQL tracing on, the job's queries are reported under the submitting screen
+    return get_executor().submit(bind_scope(fn), *args, **kwargs)
+
+def shutdown(wait=True):
+    """Stop the worker thread (call on app shutdown)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait, cancel_futures=True)
+        _executor = None
+
+class BackgroundTask:
+    """A submitted query whose result can be discarded before it is delivered"""
+
+    def __init__(self, future):
+        self.future = future
+        self.discarded = False
+
+    def discard(self):
+        """Drop the result (e.g. the screen was left or reloaded); cancels if not started"""
+        self.discarded = True
+        self.future.cancel()
+
+    def done(self):
+        return self.future.done()
+
+def run_in_background(fn, *args, on_result=None, on_error=None, **kwargs):
+    """
+    Run fn on the worker thread and hand its result to on_result(result) on the
+    Kivy main thread. Exceptions are logged and then passed to on_error(exc)
+    if given. Returns a BackgroundTask.
+    """
+    from kivy.clock import Clock
+
+    task = BackgroundTask(submit(fn, *args, **kwargs))
+
+    def deliver(_dt):
+        if task.discarded or task.future.cancelled():
+            return
+        error = task.future.exception()
+        if error is not None:
+            _log.error("Background job %s failed", getattr(fn, "__name__", fn), exc_info=error)
+            if on_error is not None:
+                on_error(error)
+        elif on_result is not None:
+            on_result(task.future.result())
+
+    task.future.add_done_callback(lambda _future: Clock.schedule_once(deliver))
+    return task
@@ -0,0 +1,121 @@
+from collections import defaultdict
+
+from database import get_connection
+
+# -----------------------------
+# Change events
+# -----------------------------
+# Code that writes to the database publishes the tables it changed (usually via
+# commit_changes). Each publish bumps a per-table version number and calls the
+# table's subscribers. Screens keep a DataWatcher over the tables they show and
+# skip reloading when none of those versions moved since their last load.
+#
+# Commits from other processes (e.g. importer.py run from a terminal) are
+# noticed through PRAGMA data_version on this process's connection; since we
+# cannot tell which tables they touched, every table is published.
+#
+# Everything here runs on the Kivy main thread.
+
+TABLES = (
+    "accounts",
+    "categories",
+    "transactions",
+    "budgets",
+    "budgeted_categories",
+    "budget_transactions",
+)
+
+# Tables that SQLite triggers update whenever the key table is written
+IMPLIED = {
+    "transactions": ("accounts",),  # balance triggers
+}
+
+_versions = defaultdict(int)
+_subscribers = defaultdict(list)
+_explicit_only = set()      # Callbacks that ignore IMPLIED changes
+_last_data_version = None
+
+def publish(*tables):
+    """Announce that tables changed: bump their versions and notify subscribers"""
+    changed = set(tables)
+    for table in tables:
+        changed.update(IMPLIED.get(table, ()))
+
+    for table in changed:
+        _versions[table] += 1
+
+    notified = set()
+    for table in changed:
+        for callback in list(_subscribers[table]):
+            if callback in notified:
+                continue
+            if table not in tables and callback in _explicit_only:
+                continue
+            notified.add(callback)
+            callback(changed)
+
+def subscribe(tables, callback, implied=True):
+    """
+    Call callback(changed_tables) whenever any of tables is published.
+    With implied=False, changes that only follow from IMPLIED (e.g. balances
+    moved by a transaction write) do not count.
+    """
+    for table in tables:
+        if callback not in _subscribers[table]:
+            _subscribers[table].append(callback)
+    if not implied:
+        _explicit_only.add(callback)
+
+def unsubscribe(callback):
+    for callbacks in _subscribers.values():
+        if callback in callbacks:
+            callbacks.remove(callback)
+    _explicit_only.discard(callback)
+
+def table_versions(tables):
+    return tuple(_versions[table] for table in tables)
+
+def commit_changes(conn, *tables):
+    """Commit and publish the tables the transaction wrote to"""
+    conn.commit()
+    publish(*tables)
+
+def poll_external_changes(conn=None):
+    """
+    Publish every table if another connection committed since the last poll.
+    Returns True if it did.
+    """
+    global _last_data_version
+    conn = conn or get_connection()
+    version = conn.execute("PRAGMA data_version").fetchone()[0]
+    changed = _last_data_version is not None and version != _last_data_version
+    _last_data_version = version
+    if changed:
+        publish(*TABLES)
+    return changed
+
+class DataWatcher:
+    """Remembers which table versions a screen last loaded"""
+
+    def __init__(self, *tables):
+        self.tables = tables
+        self._loaded = None
+
+    def changed(self):
+        """
+        True if the screen must reload (first load, or one of its tables
+        changed since); the current versions are then recorded as loaded.
+        """
+        poll_external_changes()
+        current = table_versions(self.tables)
+        if current == self._loaded:
+            return False
+        self._loaded = current
+        return True
+
+    def mark_current(self):
+        """The screen updated itself in place; treat what it shows as up to date"""
+        self._loaded = table_versions(self.tables)
+
+    def invalidate(self):
+        self._loaded = None
@@ -0,0 +1,147 @@
+import csv
+import gzip
+import sys
+
+from budget_summary import summarize_budgets
+from database import DB_NAME, get_connection
+from ledger.reference import reference_data
+from money import cents_to_text
+
+# -----------------------------
+# Streaming CSV export
+# -----------------------------
+# Rows are written as the cursor steps through them, never collected with
+# fetchall, so memory use stays flat no matter how large the ledger is.
+
+EXPORT_KINDS = ("transactions", "budgets", "summaries")
+
+def _date_filters(column, start_date, end_date):
+    clauses, params = [], []
+    if start_date:
+        clauses.append(f"{column} >= ?")
+        params.append(start_date)
+    if end_date:
+        clauses.append(f"{column} <= ?")
+        params.append(end_date)
+    return clauses, params
+
+def iter_transactions(conn, start_date=None, end_date=None, account_name=None, include_projected=False):
+    """Yield a header row and then one row per transaction, oldest first"""
+    clauses, params = _date_filters("t.date", start_date, end_date)
+
+    if account_name:
+        # Filter on the id so the (account_id, date) index can be used
+        account = reference_data(conn).account(account_name)
+        if account is None:
+            raise ValueError(f"Unknown account: {account_name}")
+        clauses.append("t.account_id = ?")
+        params.append(account.id)
+
+    if not include_projected:
+        clauses.append("t.projected = 0")
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    c = conn.cursor()
+    c.execute(f"""
+        SELECT t.id, t.date, a.name, c.name, c.type, t.amount, t.description,
+               t.projected, t.status, t.is_transfer
+        FROM transactions t
+        LEFT JOIN accounts a ON t.account_id = a.id
+        JOIN categories c ON t.category_id = c.id
+        {where}
+        ORDER BY t.date ASC, t.id ASC
+    """, params)
+
+    yield ("id", "date", "account", "category", "category_type", "amount",
+           "description", "projected", "status", "is_transfer")
+    for txn_id, date, account, category, cat_type, amount, desc, projected, status, is_transfer in c:
+        yield (txn_id, date, account or "", category, cat_type, cents_to_text(amount),
+               desc, projected, status, is_transfer)
+
+def iter_budgets(conn, start_date=None, end_date=None):
+    """Yield a header row and then one row per budgeted category allocation"""
+    clauses, params = _date_filters("b.start_date", start_date, end_date)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    c = conn.cursor()
+    c.execute(f"""
+        SELECT b.id, b.name, b.start_date, b.end_date, c.name, bc.allocated_amount, bc.alloc_desc
+        FROM budgets b
+        JOIN budgeted_categories bc ON bc.budget_id = b.id
+        JOIN categories c ON bc.category_id = c.id
+        {where}
+        ORDER BY b.start_date ASC, c.name ASC
+    """, params)
+
+    yield ("budget_id", "budget", "start_date", "end_date", "category", "allocated", "description")
+    for budget_id, name, start, end, category, allocated, desc in c:
+        yield (budget_id, name, start, end or "Current", category, cents_to_text(allocated), desc or "")
+
+def iter_summaries(conn, start_date=None, end_date=None):
+    """Yield a header row and then allocated/spent/projected/remaining per budget"""
+    yield ("budget_id", "budget", "start_date", "end_date", "allocated", "spent", "projected", "remaining")
+    for b in summarize_budgets(conn, start_date=start_date, end_date=end_date, newest_first=False):
+        yield (b.budget_id, b.name, b.start_date, b.end_date or "Current", cents_to_text(b.allocated),
+               cents_to_text(b.spent), cents_to_text(b.projected), cents_to_text(b.remaining))
+
+EXPORTERS = {
+    "transactions": iter_transactions,
+    "budgets": iter_budgets,
+    "summaries": iter_summaries,
+}
+
+# Kinds that can be limited to one account
+ACCOUNT_KINDS = ("transactions",)
+
+def open_output(path, compress=False):
+    """Open the destination for text writing; '-' is stdout, .gz or compress=True gzips"""
+    if path == "-":
+        return sys.stdout
+    if compress or path.endswith(".gz"):
+        return gzip.open(path, "wt", newline="", encoding="utf-8")
+    return open(path, "w", newline="", encoding="utf-8")
+
+def export_csv(conn, kind, path, start_date=None, end_date=None, account_name=None, compress=False):
+    """Stream one export kind to a CSV file; returns the number of data rows written"""
+    filters = {"start_date": start_date, "end_date": end_date}
+    if account_name:
+        if kind not in ACCOUNT_KINDS:
+            raise ValueError(f"{kind} cannot be filtered by account")
+        filters["account_name"] = account_name
+    rows = EXPORTERS[kind](conn, **filters)
+    # Run the query (and check the account) before the destination is truncated
+    header = next(rows)
+
+    out = open_output(path, compress)
+    try:
+        writer = csv.writer(out)
+        writer.writerow(header)
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return count
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export BudgetBee data to CSV")
+    parser.add_argument("kind", choices=EXPORT_KINDS)
+    parser.add_argument("output", help="output file ('-' for stdout, '.gz' to compress)")
+    parser.add_argument("--start", help="first date to include (YYYY-MM-DD)")
+    parser.add_argument("--end", help="last date to include (YYYY-MM-DD)")
+    parser.add_argument("--account", help="only transactions from this account")
+    parser.add_argument("--gzip", action="store_true", help="gzip the output")
+    parser.add_argument("--db", default=DB_NAME, help="database file")
+    args = parser.parse_args()
+
+    try:
+        count = export_csv(get_connection(args.db), args.kind, args.output,
+                           args.start, args.end, args.account, args.gzip)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Exported {count} {args.kind} rows", file=sys.stderr)
@@ -0,0 +1,229 @@
+import csv
+import re
+from datetime import datetime
+from functools import lru_cache
+
+from budget_summary import PERIOD_END
+from database import BALANCE_TRIGGERS, DB_NAME, add_new_transactions_to_balances, get_connection
+from ledger.categories import TRANSFER_CATEGORIES
+from migrations import migrate
+from money import parse_money
+from rollups import ROLLUP_TRIGGERS, add_new_transactions_to_rollups
+from search import SEARCH_TRIGGERS, index_new_transactions
+
+# -----------------------------
+# Bulk transaction import
+# -----------------------------
+# Statements are streamed row by row straight into a single executemany, so a
+# whole file is one transaction and one commit. Account and category names are
+# resolved through in-memory maps loaded once per import, and budget links are
+# added afterwards with one set-based INSERT ... SELECT over the new ids.
+#
+# The per-row insert triggers (balances, rollups, search index) are dropped
+# for the bulk insert and their work is done afterwards with one set-based
+# statement each, then the triggers are put back, all inside the import's
+# transaction, so other connections never see them missing. Row by row they
+# cost about four times the insert itself.
+#
+# Amounts are taken with the sign the bank uses (negative = money out).
+
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y", "%d.%m.%Y", "%Y/%m/%d", "%Y%m%d")
+
+# Accepted CSV header names for each field (compared case-insensitively)
+CSV_COLUMNS = {
+    "date": ("date", "posted", "posting date", "transaction date"),
+    "description": ("description", "memo", "name", "payee", "details"),
+    "amount": ("amount", "value"),
+    "debit": ("debit", "withdrawal"),
+    "credit": ("credit", "deposit"),
+    "account": ("account", "account name"),
+    "category": ("category",),
+}
+
+@lru_cache(maxsize=4096)
+def normalize_date(text):
+    """Convert a statement date to YYYY-MM-DD (OFX timestamps are cut to the day)"""
+    text = text.strip()
+    if re.fullmatch(r"\d{8}(\d{6})?(\.\d+)?(\[.*\])?", text):
+        text = text[:8]
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date: {text!r}")
+
+# Insert triggers replaced by set-based updates during an import
+BULK_TRIGGERS = {
+    name: triggers[name]
+    for triggers, name in (
+        (BALANCE_TRIGGERS, "trg_transactions_balance_insert"),
+        (ROLLUP_TRIGGERS, "trg_transactions_rollup_insert"),
+        (SEARCH_TRIGGERS, "trg_transactions_fts_insert"),
+    )
+}
+
+def _find_column(fieldnames, field):
+    lowered = {name.strip().lower(): name for name in fieldnames if name}
+    for candidate in CSV_COLUMNS[field]:
+        if candidate in lowered:
+            return lowered[candidate]
+    return None
+
+def read_csv(path):
+    """Yield dicts (date, description, amount, account, category) from a bank CSV"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames or []
+        columns = {field: _find_column(fieldnames, field) for field in CSV_COLUMNS}
+
+        if not columns["date"] or not (columns["amount"] or columns["debit"] or columns["credit"]):
+            raise ValueError("CSV needs a date column and an amount (or debit/credit) column")
+
+        for row in reader:
+            if columns["amount"]:
+                amount = parse_money(row[columns["amount"]])
+            else:
+                debit = row.get(columns["debit"]) if columns["debit"] else ""
+                credit = row.get(columns["credit"]) if columns["credit"] else ""
+                amount = (parse_money(credit) if credit else 0) - (abs(parse_money(debit)) if debit else 0)
+
+            yield {
+                "date": normalize_date(row[columns["date"]]),
+                "description": row.get(columns["description"], "") if columns["description"] else "",
+                "amount": amount,
+                "account": row.get(columns["account"]) if columns["account"] else None,
+                "category": row.get(columns["category"]) if columns["category"] else None,
+            }
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)")
+
+def read_ofx(path):
+    """Yield dicts (date, description, amount) from the STMTTRN blocks of an OFX/QFX file"""
+    current = None
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            for closing, tag, value in _OFX_TAG.findall(line):
+                tag = tag.upper()
+                if tag == "STMTTRN":
+                    if closing and current is not None:
+                        yield _ofx_row(current)
+                        current = None
+                    elif not closing:
+                        current = {}
+                elif current is not None and not closing and value.strip():
+                    current[tag] = value.strip()
+
+def _ofx_row(fields):
+    description = fields.get("NAME", "")
+    memo = fields.get("MEMO", "")
+    if memo and memo != description:
+        description = f"{description} - {memo}" if description else memo
+
+    return {
+        "date": normalize_date(fields["DTPOSTED"]),
+        "description": description,
+        "amount": parse_money(fields["TRNAMT"]),
+        "account": None,
+        "category": None,
+    }
+
+def read_statement(path):
+    """Pick a reader from the file extension"""
+    if path.lower().endswith((".ofx", ".qfx")):
+        return read_ofx(path)
+    return read_csv(path)
+
+def load_name_map(conn, table):
+    """Return {name: id} for every row in accounts or categories"""
+    c = conn.cursor()
+    c.execute(f"SELECT name, id FROM {table}")
+    return dict(c.fetchall())
+
+def link_new_transactions_to_budgets(conn, last_id):
+    """Link every transaction with id > last_id to the budget whose period contains it"""
+    c = conn.cursor()
+    c.execute(f"""
+        INSERT OR IGNORE INTO budget_transactions (budget_id, transaction_id)
+        SELECT b.id, t.id
+        FROM transactions t
+        JOIN budgets b
+          ON t.date >= b.start_date
+         AND t.date <= {PERIOD_END.format(b="b")}
+        WHERE t.id > ?
+    """, (last_id,))
+    return c.rowcount
+
+def import_transactions(conn, rows, default_account=None, default_category=None):
+    """
+    Insert statement rows in one transaction.
+    Rows whose account or category cannot be resolved are skipped.
+    Returns (imported, skipped).
+    """
+    accounts = load_name_map(conn, "accounts")
+    categories = load_name_map(conn, "categories")
+    transfer_ids = {categories[name] for name in TRANSFER_CATEGORIES if name in categories}
+
+    skipped = 0
+
+    def params():
+        nonlocal skipped
+        for row in rows:
+            account_id = accounts.get(row.get("account") or default_account)
+            category_id = categories.get(row.get("category") or default_category)
+            if account_id is None or category_id is None:
+                skipped += 1
+                continue
+
+            yield (
+                account_id,
+                category_id,
+                row["amount"],
+                row["date"],
+                row.get("description") or "No description",
+                1 if category_id in transfer_ids else 0,
+            )
+
+    with conn:
+        # Take the write lock before reading the last id: AUTOINCREMENT ids
+        # handed out after this are all above it and belong to this import
+        conn.execute("BEGIN IMMEDIATE")
+        c = conn.cursor()
+        c.execute("SELECT COALESCE(MAX(id), 0) FROM transactions")
+        last_id = c.fetchone()[0]
+
+        for name in BULK_TRIGGERS:
+            c.execute(f"DROP TRIGGER IF EXISTS {name}")
+        c.executemany("""
+            INSERT INTO transactions (account_id, category_id, amount, date, description, is_transfer)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, params())
+        imported = c.rowcount
+
+        add_new_transactions_to_balances(conn, last_id)
+        add_new_transactions_to_rollups(conn, last_id)
+        index_new_transactions(conn, last_id)
+        for sql in BULK_TRIGGERS.values():
+            c.execute(sql)
+
+        link_new_transactions_to_budgets(conn, last_id)
+
+    return imported, skipped
+
+def import_file(conn, path, default_account=None, default_category=None):
+    """Import a CSV or OFX statement into the database"""
+    migrate(conn)
+    return import_transactions(conn, read_statement(path), default_account, default_category)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import a bank statement (CSV or OFX) into BudgetBee")
+    parser.add_argument("path", help="statement file (.csv, .ofx or .qfx)")
+    parser.add_argument("--account", help="account name for rows that do not name one")
+    parser.add_argument("--category", help="category name for rows that do not name one")
+    parser.add_argument("--db", default=DB_NAME, help="database file")
+    args = parser.parse_args()
+
+    imported, skipped = import_file(get_connection(args.db), args.path, args.account, args.category)
+    print(f"Imported {imported} transactions ({skipped} skipped)")
@@ -0,0 +1,381 @@
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, deque
+from logging.handlers import RotatingFileHandler
+
+# -----------------------------
+# SQL instrumentation (opt-in)
+# -----------------------------
+# Run with BUDGETBEE_SQL_TRACE=1 and every connection from database.py is an
+# InstrumentedConnection. Each statement is recorded with its parameter shape,
+# duration (execute plus fetching), row count, the app code that ran it
+# ("where", e.g. BudgetsScreen.on_pre_enter) and the helper it went through
+# ("via", e.g. ledger/budgets.py:list_allocations).
+#
+# Queries are grouped into scopes: each on_pre_enter/on_enter of a screen, and
+# each job that scope hands to the DB worker. When a scope ends, a statement
+# that ran N_PLUS_ONE_THRESHOLD or more times inside it is reported as a
+# likely N+1 pattern. Everything goes to a rotating log file; the last scopes
+# and slowest statements are also shown in an overlay toggled with F12.
+#
+# With the variable unset nothing here is installed and there is no overhead.
+
+ENABLED = os.environ.get("BUDGETBEE_SQL_TRACE", "") not in ("", "0")
+LOG_FILE = os.environ.get("BUDGETBEE_SQL_LOG", "budgetbee-sql.log")
+LOG_MAX_BYTES = 2_000_000
+LOG_BACKUPS = 3
+
+SLOW_QUERY_MS = float(os.environ.get("BUDGETBEE_SLOW_MS", 20))
+N_PLUS_ONE_THRESHOLD = 5
+
+# Polled every few seconds; counted but not written to the log one by one
+QUIET_STATEMENTS = ("PRAGMA data_version",)
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Source files that are plumbing, never the caller of interest
+_PLUMBING = (os.path.abspath(__file__), os.path.dirname(sqlite3.__file__))
+_DATABASE_FILE = os.path.join(ROOT, "database.py")
+# Source files whose functions count as the app code behind a query
+APP_FILES = ("main.py",)
+
+_logger = None
+_lock = threading.Lock()
+_local = threading.local()
+
+recent_queries = deque(maxlen=200)     # QueryRecord, newest last
+recent_scopes = deque(maxlen=20)       # ScopeReport, newest last
+
+def get_logger():
+    """The budgetbee.sql logger, writing to the rotating LOG_FILE"""
+    global _logger
+    if _logger is None:
+        logger = logging.getLogger("budgetbee.sql")
+        logger.setLevel(logging.DEBUG)
+        handler = RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(threadName)s %(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+        _logger = logger
+    return _logger
+
+# -----------------------------
+# Records
+# -----------------------------
+def normalize_sql(sql):
+    return " ".join(sql.split())
+
+def params_shape(params):
+    """Describe parameters by type only, e.g. (int, str) or {budget_id: int}"""
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in params.items()) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in params) + ")"
+
+def _is_plumbing(filename):
+    return filename.startswith(_PLUMBING) or filename == _DATABASE_FILE
+
+def find_caller():
+    """
+    (where, via): the innermost app function on the stack (Class.method) and
+    the innermost non-plumbing frame as file:function.
+    """
+    frame = sys._getframe(1)
+    via = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not _is_plumbing(filename):
+            if via is None:
+                path = os.path.relpath(filename, ROOT) if filename.startswith(ROOT) else os.path.basename(filename)
+                via = f"{path}:{frame.f_code.co_name}"
+            if os.path.basename(filename) in APP_FILES:
+                # co_qualname is Python 3.11+; older versions get the bare name
+                return getattr(frame.f_code, "co_qualname", frame.f_code.co_name), via
+        frame = frame.f_back
+    return None, via
+
+class QueryRecord:
+    __slots__ = ("sql", "params", "started", "ms", "rows", "where", "via", "scope")
+
+    def __init__(self, sql, params, where, via, scope):
+        self.sql = sql
+        self.params = params
+        self.started = time.time()
+        self.ms = 0.0
+        self.rows = 0
+        self.where = where
+        self.via = via
+        self.scope = scope
+
+    def __str__(self):
+        return (f"{self.ms:8.2f} ms {self.rows:6} rows  {self.where or '-'} via {self.via or '-'}"
+                f"  {self.sql} {self.params}")
+
+class ScopeReport:
+    """Queries run while one screen method (or the worker job it started) was running"""
+
+    def __init__(self, name):
+        self.name = name
+        self.queries = 0
+        self.ms = 0.0
+        self.statements = Counter()
+        self.n_plus_one = []    # (sql, count)
+
+    def add(self, record):
+        self.queries += 1
+        self.ms += record.ms
+        self.statements[record.sql] += 1
+
+    def __str__(self):
+        return f"{self.name}: {self.queries} queries, {self.ms:.2f} ms"
+
+def _finish(record):
+    """A statement is done (results fully read or abandoned): log and aggregate it"""
+    with _lock:
+        recent_queries.append(record)
+    if record.scope is not None:
+        record.scope.add(record)
+
+    logger = get_logger()
+    if record.ms >= SLOW_QUERY_MS:
+        logger.warning("SLOW %s", record)
+    elif record.sql not in QUIET_STATEMENTS:
+        logger.debug("%s", record)
+
+# -----------------------------
+# Scopes
+# -----------------------------
+def current_scope():
+    stack = getattr(_local, "scopes", None)
+    return stack[-1] if stack else None
+
+class scope:
+    """Context manager grouping the queries run on this thread under a name"""
+
+    def __init__(self, name):
+        self.report = ScopeReport(name)
+
+    def __enter__(self):
+        if not hasattr(_local, "scopes"):
+            _local.scopes = []
+        _local.scopes.append(self.report)
+        return self.report
+
+    def __exit__(self, *exc):
+        _local.scopes.pop()
+        report = self.report
+        if not report.queries:
+            return False
+
+        report.n_plus_one = [(sql, count) for sql, count in report.statements.most_common()
+                             if count >= N_PLUS_ONE_THRESHOLD]
+        logger = get_logger()
+        logger.info("SCOPE %s", report)
+        for sql, count in report.n_plus_one:
+            logger.warning("N+1 in %s: %d x %s", report.name, count, sql)
+        with _lock:
+            recent_scopes.append(report)
+        return False
+
+def watch(obj, *method_names):
+    """Run each named method of obj inside a scope called Class.method (no-op when disabled)"""
+    if not ENABLED:
+        return obj
+    for name in method_names:
+        method = getattr(obj, name, None)
+        if method is not None:
+            setattr(obj, name, _scoped(method, f"{type(obj).__name__}.{name}"))
+    return obj
+
+def _scoped(fn, name):
+    def wrapper(*args, **kwargs):
+        with scope(name):
+            return fn(*args, **kwargs)
+    wrapper.__wrapped__ = fn
+    return wrapper
+
+def bind_scope(fn):
+    """
+    Wrap fn so that, run on another thread, its queries are reported under the
+    caller's current scope name (plus fn's name). Returns fn as-is when there
+    is nothing to bind.
+    """
+    parent = current_scope() if ENABLED else None
+    if parent is None:
+        return fn
+    return _scoped(fn, f"{parent.name} > {getattr(fn, '__name__', 'job')}")
+
+# -----------------------------
+# Connection and cursor
+# -----------------------------
+class InstrumentedCursor(sqlite3.Cursor):
+    _record = None
+
+    def _start(self, sql, params):
+        self._flush()
+        where, via = find_caller()
+        self._record = QueryRecord(normalize_sql(sql), params, where, via, current_scope())
+        return self._record
+
+    def _flush(self):
+        record, self._record = self._record, None
+        if record is not None:
+            _finish(record)
+
+    def _timed(self, call, *args):
+        record = self._record
+        t0 = time.perf_counter()
+        try:
+            return call(*args)
+        finally:
+            if record is not None:
+                record.ms += (time.perf_counter() - t0) * 1000
+
+    def execute(self, sql, params=()):
+        record = self._start(sql, params_shape(params))
+        self._timed(super().execute, sql, params)
+        if self.description is None:
+            # Not a query: nothing to fetch, so it is complete now
+            record.rows = max(self.rowcount, 0)
+            self._flush()
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        record = self._start(sql, "")
+        count = 0
+
+        def counted():
+            nonlocal count
+            for params in seq_of_params:
+                if not count:
+                    record.params = f"{params_shape(params)} x many"
+                count += 1
+                yield params
+
+        self._timed(super().executemany, sql, counted())
+        record.params = record.params.replace("many", str(count))
+        record.rows = max(self.rowcount, 0)
+        self._flush()
+        return self
+
+    def executescript(self, script):
+        self._start(script, "")
+        self._timed(super().executescript, script)
+        self._flush()
+        return self
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if self._record is not None:
+            if row is None:
+                self._flush()
+            else:
+                self._record.rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(super().fetchmany, self.arraysize if size is None else size)
+        if self._record is not None:
+            self._record.rows += len(rows)
+            if not rows:
+                self._flush()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        if self._record is not None:
+            self._record.rows += len(rows)
+            self._flush()
+        return rows
+
+    def __next__(self):
+        try:
+            row = self._timed(super().__next__)
+        except StopIteration:
+            self._flush()
+            raise
+        if self._record is not None:
+            self._record.rows += 1
+        return row
+
+    def close(self):
+        self._flush()
+        super().close()
+
+    def __del__(self):
+        self._flush()
+
+class InstrumentedConnection(sqlite3.Connection):
+    """sqlite3 connection whose cursors (including execute shortcuts) are instrumented"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+def connection_factory():
+    """The sqlite3.connect factory to use: instrumented when tracing is on"""
+    return InstrumentedConnection if ENABLED else sqlite3.Connection
+
+# -----------------------------
+# Debug overlay
+# -----------------------------
+def overlay_text(scopes=5, slowest=5):
+    """Plain-text summary of the latest scopes and the slowest recent statements"""
+    with _lock:
+        reports = list(recent_scopes)[-scopes:]
+        queries = sorted(recent_queries, key=lambda record: record.ms, reverse=True)[:slowest]
+
+    lines = ["SQL (F12 to hide)"]
+    for report in reversed(reports):
+        lines.append(str(report))
+        for sql, count in report.n_plus_one:
+            lines.append(f"  N+1 {count}x {sql[:70]}")
+    lines.append("Slowest recent:")
+    for record in queries:
+        lines.append(f"  {record.ms:6.1f} ms {record.where or record.via or '-'}: {record.sql[:60]}")
+    return "\n".join(lines)
+
+def install_overlay(refresh_seconds=1.0):
+    """Add the F12-toggled SQL overlay to the Kivy window (no-op when disabled)"""
+    if not ENABLED:
+        return None
+
+    from kivy.clock import Clock
+    from kivy.core.window import Window
+    from kivy.uix.label import Label
+
+    label = Label(
+        size_hint=(None, None), halign="left", valign="top",
+        font_size="11sp", color=(1, 1, 0.6, 1), opacity=0,
+    )
+
+    def refresh(_dt):
+        if label.opacity:
+            label.text = overlay_text()
+            label.text_size = (Window.width * 0.9, None)
+            label.texture_update()
+            label.size = label.texture_size
+            label.pos = (10, Window.height - label.height - 10)
+
+    def on_key_down(_window, key, *_args):
+        if key == 293:  # F12
+            label.opacity = 0 if label.opacity else 0.9
+            refresh(0)
+            return True
+        return False
+
+    Window.add_widget(label)
+    Window.bind(on_key_down=on_key_down)
+    Clock.schedule_interval(refresh, refresh_seconds)
+    return label
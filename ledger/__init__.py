@@ -0,0 +1,29 @@
+"""
+BudgetBee's ledger: accounts, categories, transactions and budgets, with no
+Kivy dependency. Every function takes an open connection first (usually
+database.get_connection()), validates its input, commits its own writes and
+publishes the tables it changed (see events.py). Money is always integer cents.
+"""
+from ledger.accounts import (
+    Account, list_active_accounts, list_account_names, balance_totals, get_account,
+    add_account, update_account, delete_account,
+)
+from ledger.categories import (
+    Category, SYSTEM_CATEGORY, TRANSFER_CATEGORIES, CATEGORY_TYPES,
+    system_category_id, list_user_categories, list_category_names, get_category,
+    add_category, update_category, deactivate_category,
+)
+from ledger.reference import (
+    AccountRef, CategoryRef, ReferenceData, reference_data, invalidate_reference_data,
+)
+from ledger.transactions import (
+    Transaction, TransactionSearch, transaction_page, search_transactions, get_transaction,
+    add_transaction, update_transaction, delete_transaction,
+)
+from ledger.budgets import (
+    Allocation, ProjectedTransaction, BudgetManager, PROJECTED_STATUSES,
+    recalc_budget_ranges, link_existing_transactions, get_budget, add_budget, update_budget, delete_budget,
+    list_allocations, add_allocation, delete_allocation,
+    list_projected_transactions, add_projected_transaction, set_projected_status,
+    get_budget_summary, list_budget_summaries,
+)
@@ -0,0 +1,188 @@
+from typing import NamedTuple, Optional
+
+from events import commit_changes
+from ledger.categories import system_category_id
+from ledger.reference import reference_data
+
+# -----------------------------
+# Accounts
+# -----------------------------
+# Balances are never written directly: every change goes through a System
+# transaction and the balance triggers apply it to accounts.balance.
+
+class Account(NamedTuple):
+    id: int
+    owner: str
+    name: str
+    balance: int    # cents
+    type: str
+
+def list_active_accounts(conn) -> list[Account]:
+    """Active accounts ordered by owner and name"""
+    c = conn.cursor()
+    c.execute("""
+        SELECT id, owner, name, balance, type
+        FROM accounts
+        WHERE is_active = 1
+        ORDER BY owner ASC, name ASC
+    """)
+    return [Account(*row) for row in c.fetchall()]
+
+def list_account_names(conn, active_only: bool = False) -> list[str]:
+    """Names of every account (or only the active ones), ordered by owner and name"""
+    data = reference_data(conn)
+    accounts = data.active_accounts() if active_only else data.accounts
+    return [account.name for account in accounts]
+
+def balance_totals(conn) -> list[int]:
+    """Active balances in cents: [total, checking, savings, benefits]"""
+    c = conn.cursor()
+    c.execute("""
+        SELECT
+            SUM(balance),
+            SUM(CASE WHEN type = 'Checking' THEN balance END),
+            SUM(CASE WHEN type = 'Savings' THEN balance END),
+            SUM(CASE WHEN type = 'Benefits' THEN balance END)
+        FROM accounts
+        WHERE is_active = 1
+    """)
+    return [total or 0 for total in c.fetchone()]
+
+def get_account(conn, account_id: int) -> Optional[Account]:
+    c = conn.cursor()
+    c.execute("SELECT id, owner, name, balance, type FROM accounts WHERE id=?", (account_id,))
+    row = c.fetchone()
+    return Account(*row) if row else None
+
+def add_account(conn, owner: str, name: str, balance: int = 0, acct_type: str = "Checking") -> Optional[int]:
+    """
+    Add an account with an opening balance (cents), or reactivate a deleted
+    account of the same name and bring it to that balance.
+    Returns the account id, or None if an active account already has the name.
+    """
+    if not owner or not name:
+        return None
+
+    with conn:
+        c = conn.cursor()
+
+        # Check if account exists
+        c.execute("SELECT id, is_active, balance FROM accounts WHERE name = ?", (name,))
+        row = c.fetchone()
+
+        if row:
+            account_id, is_active, current_balance = row
+            if is_active == 1:
+                return None
+
+            # Reactivate the deleted account
+            c.execute("UPDATE accounts SET is_active = 1 WHERE id = ?", (account_id,))
+
+            # Add system transaction that brings the balance to the entered amount
+            c.execute("""
+                INSERT INTO transactions (account_id, category_id, amount, description, date)
+                VALUES (?, ?, ?, ?, DATE('now'))
+                """,
+                (account_id, system_category_id(conn), balance - current_balance, f'Reactivated {name}')
+            )
+        else:
+            # New account (the opening transaction below sets its balance)
+            c.execute("""
+                INSERT INTO accounts (type, owner, name, balance, starting_balance, is_active)
+                VALUES (?, ?, ?, 0, ?, 1)""",
+                (acct_type, owner, name, balance)
+            )
+            account_id = c.lastrowid
+
+            # Add system transaction for new account
+            c.execute("""
+                INSERT INTO transactions (account_id, category_id, amount, description, date)
+                VALUES (?, ?, ?, ?, DATE('now'))
+                """,
+                (account_id, system_category_id(conn), balance, f'Added {name}')
+            )
+
+        commit_changes(conn, "accounts", "transactions")
+        return account_id
+
+def update_account(conn, account_id: int, acct_type: str, owner: str, name: str, balance: int) -> bool:
+    """
+    Change an account's details. A new balance (cents) moves the opening System
+    transaction, or records an adjustment if there is none. Returns False if
+    the account does not exist or a field is empty.
+    """
+    if not acct_type or not owner or not name:
+        return False
+
+    with conn:
+        c = conn.cursor()
+        c.execute("SELECT name, balance, starting_balance FROM accounts WHERE id=?", (account_id,))
+        row = c.fetchone()
+        if not row:
+            return False
+        old_name, old_balance, old_starting_balance = row
+
+        c.execute("""
+            UPDATE accounts
+            SET type=?, owner=?, name=?
+            WHERE id=?
+            """, (acct_type, owner, name, account_id)
+        )
+
+        # If the name changed, update system transactions
+        if old_name != name:
+            c.execute("""
+                UPDATE transactions
+                SET description = REPLACE(description, ?, ?)
+                WHERE account_id=? AND description LIKE ?""",
+                (old_name, name, account_id, f'%{old_name}%')
+            )
+
+        if old_balance != balance:
+            balance_diff = balance - old_balance
+            new_starting_balance = old_starting_balance + balance_diff
+            system_id = system_category_id(conn)
+
+            c.execute("UPDATE accounts SET starting_balance = ? WHERE id=?", (new_starting_balance, account_id))
+
+            # Move the opening system transaction to the new starting balance
+            # (the balance trigger applies the difference to the account)
+            c.execute("""
+                UPDATE transactions
+                SET amount = ?
+                WHERE id = (
+                    SELECT MIN(id) FROM transactions
+                    WHERE account_id=? AND category_id=? AND amount=?
+                )""",
+                (new_starting_balance, account_id, system_id, old_starting_balance)
+            )
+
+            # No opening transaction to move, so record the adjustment instead
+            if c.rowcount == 0:
+                c.execute("""
+                    INSERT INTO transactions (account_id, category_id, amount, description, date)
+                    VALUES (?, ?, ?, ?, DATE('now'))""",
+                    (account_id, system_id, balance_diff, f"Adjusted {name}")
+                )
+
+        commit_changes(conn, "accounts", "transactions")
+        return True
+
+def delete_account(conn, account_id: int) -> bool:
+    """Close out an account's balance with a System transaction and deactivate it"""
+    with conn:
+        c = conn.cursor()
+        c.execute("SELECT name, balance FROM accounts WHERE id=?", (account_id,))
+        row = c.fetchone()
+        if not row:
+            return False
+        name, balance = row
+
+        c.execute("""
+            INSERT INTO transactions (account_id, category_id, amount, date, description)
+            VALUES (?, ?, ?, DATE('now'), ?)
+        """, (account_id, system_category_id(conn), -balance, f"Deleted account {name}"))
+        c.execute("UPDATE accounts SET is_active = 0 WHERE id=?", (account_id,))
+
+        commit_changes(conn, "accounts", "transactions")
+        return True
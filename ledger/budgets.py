@@ -0,0 +1,225 @@
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from budget_index import invalidate_budget_index
+from budget_summary import BudgetSummary, summarize_budget, summarize_budgets
+from database import DB_NAME, get_connection
+from events import commit_changes
+from ledger.reference import reference_data
+
+# -----------------------------
+# Budgets
+# -----------------------------
+# Budgets partition the calendar: each one runs until the day before the next
+# one starts and the last one is "Current". Transactions are linked to the
+# budget whose period contains their date when either side is created.
+
+PROJECTED_STATUSES = ("completed", "skipped")
+
+class Allocation(NamedTuple):
+    id: int
+    category: str
+    amount: int     # cents
+    description: Optional[str]
+
+class ProjectedTransaction(NamedTuple):
+    id: int
+    category: str
+    amount: int     # cents
+    description: str
+    date: str
+    status: str
+
+def recalc_budget_ranges(conn) -> None:
+    """
+    End each budget the day before the next one starts; the last one is "Current".
+    Two UPDATEs for all budgets; the caller commits.
+    """
+    # The day before the next budget (by start date, then id) starts.
+    # A correlated subquery rather than UPDATE ... FROM, which needs SQLite 3.33
+    new_end = """
+        COALESCE(date((
+            SELECT n.start_date FROM budgets n
+            WHERE n.start_date > budgets.start_date
+               OR (n.start_date = budgets.start_date AND n.id > budgets.id)
+            ORDER BY n.start_date, n.id
+            LIMIT 1
+        ), '-1 day'), 'Current')
+    """
+    # end_date is UNIQUE and checked row by row, so a moved budget could
+    # collide with a neighbour's old end date: clear every end date that
+    # changes first, then write the new ones
+    c = conn.cursor()
+    c.execute(f"UPDATE budgets SET end_date = NULL WHERE end_date IS NOT {new_end}")
+    c.execute(f"UPDATE budgets SET end_date = {new_end} WHERE end_date IS NULL")
+    invalidate_budget_index()
+
+def link_existing_transactions(conn, budget_id: int) -> int:
+    """Link every transaction dated inside the budget's period to it; the caller commits"""
+    c = conn.cursor()
+    c.execute("""
+        INSERT OR IGNORE INTO budget_transactions (budget_id, transaction_id)
+        SELECT b.id, t.id
+        FROM budgets b
+        JOIN transactions t
+          ON t.date >= b.start_date
+         AND t.date <= COALESCE(NULLIF(b.end_date, 'Current'), '9999-12-31')
+        WHERE b.id = ?
+    """, (budget_id,))
+    return c.rowcount
+
+def get_budget(conn, budget_id: int) -> Optional[tuple[str, str, Optional[str]]]:
+    """(name, start_date, end_date) of a budget"""
+    c = conn.cursor()
+    c.execute("SELECT name, start_date, end_date FROM budgets WHERE id=?", (budget_id,))
+    return c.fetchone()
+
+def add_budget(conn, name: str, start_date: Optional[str] = None) -> int:
+    """
+    Insert a budget, fit every budget's end date around it and link the
+    transactions in its period, all in one transaction. Returns its id.
+    """
+    if not start_date:
+        start_date = datetime.now().strftime("%Y-%m-%d")
+
+    with conn:
+        c = conn.cursor()
+        c.execute("INSERT INTO budgets (name, start_date) VALUES (?, ?)", (name, start_date))
+        budget_id = c.lastrowid
+
+        recalc_budget_ranges(conn)
+        link_existing_transactions(conn, budget_id)
+        commit_changes(conn, "budgets", "budget_transactions")
+        return budget_id
+
+def update_budget(conn, budget_id: int, name: str, start_date: str) -> None:
+    """Rename a budget or move its start date, then refit all budget ranges"""
+    with conn:
+        c = conn.cursor()
+        c.execute("UPDATE budgets SET name=?, start_date=? WHERE id=?", (name, start_date, budget_id))
+        recalc_budget_ranges(conn)
+        commit_changes(conn, "budgets")
+
+def delete_budget(conn, budget_id: int) -> None:
+    with conn:
+        c = conn.cursor()
+        c.execute("DELETE FROM budgets WHERE id=?", (budget_id,))
+        recalc_budget_ranges(conn)
+        commit_changes(conn, "budgets")
+
+# -----------------------------
+# Allocations
+# -----------------------------
+def list_allocations(conn, budget_id: int) -> list[Allocation]:
+    c = conn.cursor()
+    c.execute("""
+        SELECT bc.id, c.name, bc.allocated_amount, bc.alloc_desc
+        FROM budgeted_categories bc
+        JOIN categories c ON bc.category_id = c.id
+        WHERE bc.budget_id=?
+    """, (budget_id,))
+    return [Allocation(*row) for row in c.fetchall()]
+
+def add_allocation(conn, budget_id: int, category_name: str, amount: int,
+                   description: Optional[str] = None) -> Optional[int]:
+    """Allocate `amount` cents of the budget to a category. Returns the allocation id."""
+    category = reference_data(conn).category(category_name)
+    if category is None:
+        return None
+
+    with conn:
+        c = conn.cursor()
+
+        c.execute("""
+            INSERT INTO budgeted_categories (budget_id, category_id, allocated_amount, alloc_desc)
+            VALUES (?, ?, ?, ?)
+        """, (budget_id, category.id, amount, description or "No Description"))
+        commit_changes(conn, "budgeted_categories")
+        return c.lastrowid
+
+def delete_allocation(conn, allocation_id: int) -> None:
+    with conn:
+        c = conn.cursor()
+        c.execute("DELETE FROM budgeted_categories WHERE id=?", (allocation_id,))
+        commit_changes(conn, "budgeted_categories")
+
+# -----------------------------
+# Projected transactions
+# -----------------------------
+def list_projected_transactions(conn, budget_id: int) -> list[ProjectedTransaction]:
+    c = conn.cursor()
+    c.execute("""
+        SELECT t.id, c.name, t.amount, t.description, t.date, t.status
+        FROM transactions t
+        JOIN categories c ON t.category_id = c.id
+        JOIN budget_transactions bt ON t.id = bt.transaction_id
+        WHERE bt.budget_id=? AND t.projected=1
+        ORDER BY date ASC
+    """, (budget_id,))
+    return [ProjectedTransaction(*row) for row in c.fetchall()]
+
+def add_projected_transaction(conn, budget_id: int, category_name: str, amount: int,
+                              description: Optional[str] = None, date: Optional[str] = None) -> Optional[int]:
+    """Add a pending projected transaction of `amount` cents to a budget. Returns its id."""
+    if not description:
+        description = "No Description"
+    if not date:
+        date = datetime.now().strftime("%Y-%m-%d")
+
+    category = reference_data(conn).category(category_name)
+    if category is None:
+        return None
+
+    with conn:
+        c = conn.cursor()
+
+        c.execute("""
+            INSERT INTO transactions (category_id, amount, description, date, projected, status)
+            VALUES (?, ?, ?, ?, 1, 'Pending')
+        """, (category.id, amount, description, date))
+        txn_id = c.lastrowid
+
+        c.execute("INSERT INTO budget_transactions (budget_id, transaction_id) VALUES (?, ?)",
+                  (budget_id, txn_id))
+        commit_changes(conn, "transactions", "budget_transactions")
+        return txn_id
+
+def set_projected_status(conn, txn_id: int, status: str) -> bool:
+    """Mark a projected transaction as completed or skipped"""
+    if status not in PROJECTED_STATUSES:
+        return False
+    with conn:
+        c = conn.cursor()
+        c.execute("UPDATE transactions SET status=? WHERE id=?", (status, txn_id))
+        commit_changes(conn, "transactions")
+        return True
+
+# -----------------------------
+# Summaries
+# -----------------------------
+def get_budget_summary(conn, budget_id: int) -> BudgetSummary:
+    return summarize_budget(conn, budget_id)
+
+def list_budget_summaries(conn) -> list[BudgetSummary]:
+    """Every budget with its totals, newest first"""
+    return list(summarize_budgets(conn))
+
+class BudgetManager:
+    """The budget API bound to one database file, for callers without a connection"""
+
+    def __init__(self, db_name=DB_NAME):
+        self.db_name = db_name
+
+    def create_budget(self, name, start_date=None):
+        """Create a new budget and return its ID"""
+        return add_budget(get_connection(self.db_name), name, start_date)
+
+    def get_allocated_categories(self, budget_id):
+        return list_allocations(get_connection(self.db_name), budget_id)
+
+    def get_projected_transactions(self, budget_id):
+        return list_projected_transactions(get_connection(self.db_name), budget_id)
+
+    def get_budget_summary(self, budget_id):
+        """Return a BudgetSummary with totals: allocated, spent, projected, remaining"""
+        return get_budget_summary(get_connection(self.db_name), budget_id)
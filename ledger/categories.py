@@ -0,0 +1,92 @@
+from typing import NamedTuple, Optional
+
+from events import commit_changes
+from ledger.reference import reference_data
+
+# -----------------------------
+# Categories
+# -----------------------------
+SYSTEM_CATEGORY = "System"
+TRANSFER_CATEGORIES = ("Transfer To", "Transfer From")
+CATEGORY_TYPES = ("Income", "Expense")
+
+class Category(NamedTuple):
+    id: int
+    name: str
+    type: str
+
+def system_category_id(conn) -> int:
+    """Id of the built-in System category used for balance adjustments"""
+    return reference_data(conn).category(SYSTEM_CATEGORY).id
+
+def list_user_categories(conn) -> list[Category]:
+    """Active categories except the built-in ones, income before expense"""
+    categories = reference_data(conn).active_categories(exclude=(SYSTEM_CATEGORY, *TRANSFER_CATEGORIES))
+    return [Category(category.id, category.name, category.type) for category in categories]
+
+def list_category_names(conn, cat_type: Optional[str] = None) -> list[tuple[str, str]]:
+    """(name, type) of active categories other than System, optionally of one type"""
+    categories = reference_data(conn).active_categories(cat_type, exclude=(SYSTEM_CATEGORY,))
+    return [(category.name, category.type) for category in categories]
+
+def get_category(conn, category_id: int) -> Optional[Category]:
+    c = conn.cursor()
+    c.execute("SELECT id, name, type FROM categories WHERE id=?", (category_id,))
+    row = c.fetchone()
+    return Category(*row) if row else None
+
+def add_category(conn, name: str, cat_type: str) -> Optional[int]:
+    """
+    Add a category, or reactivate a deleted one of the same name with the new type.
+    Returns its id, or None if an active category already has the name.
+    """
+    if not name or not cat_type:
+        return None
+
+    with conn:
+        c = conn.cursor()
+        c.execute("SELECT id, is_active FROM categories WHERE name=?", (name,))
+        row = c.fetchone()
+
+        if row:
+            category_id, is_active = row
+            if is_active != 0:
+                return None
+            c.execute("UPDATE categories SET is_active=1, type=? WHERE id=?", (cat_type, category_id))
+        else:
+            c.execute("INSERT INTO categories (name, type, is_active) VALUES (?, ?, 1)", (name, cat_type))
+            category_id = c.lastrowid
+
+        commit_changes(conn, "categories")
+        return category_id
+
+def update_category(conn, category_id: int, name: str, cat_type: str) -> bool:
+    """
+    Rename a category or change its type. Changing the type flips the sign of
+    every transaction in it (the balance triggers re-apply them to accounts).
+    """
+    if not name or not cat_type:
+        return False
+
+    with conn:
+        c = conn.cursor()
+        c.execute("SELECT type FROM categories WHERE id=?", (category_id,))
+        row = c.fetchone()
+        if not row:
+            return False
+        old_type = row[0]
+
+        c.execute("UPDATE categories SET name=?, type=? WHERE id=?", (name, cat_type, category_id))
+
+        if old_type != cat_type:
+            c.execute("UPDATE transactions SET amount=-amount WHERE category_id=?", (category_id,))
+
+        commit_changes(conn, "categories", "transactions")
+        return True
+
+def deactivate_category(conn, category_id: int) -> None:
+    """Hide a category from pickers; its transactions are kept"""
+    with conn:
+        c = conn.cursor()
+        c.execute("UPDATE categories SET is_active=0 WHERE id=?", (category_id,))
+        commit_changes(conn, "categories")
@@ -0,0 +1,88 @@
+import threading
+from typing import NamedTuple, Optional
+
+from database import connection_serial
+from events import subscribe
+
+# -----------------------------
+# Reference data cache
+# -----------------------------
+# Accounts and categories change rarely but are looked up by name on every
+# transaction write and listed in every picker. They are read once per
+# connection into a ReferenceData and served from memory until an explicit
+# write to accounts or categories is published (see events.py); balance
+# changes implied by transaction writes do not count, since no balances are
+# kept here. Connections not from database.get_connection are never cached.
+
+class AccountRef(NamedTuple):
+    id: int
+    name: str
+    type: str
+    owner: str
+    active: bool
+
+class CategoryRef(NamedTuple):
+    id: int
+    name: str
+    type: str
+    active: bool
+
+class ReferenceData:
+    """Every account and category, with lookups by name"""
+
+    def __init__(self, conn):
+        c = conn.cursor()
+        c.execute("SELECT id, name, type, owner, is_active FROM accounts ORDER BY owner ASC, name ASC")
+        self.accounts = [AccountRef(id, name, acct_type, owner, bool(active))
+                         for id, name, acct_type, owner, active in c.fetchall()]
+        c.execute("SELECT id, name, type, is_active FROM categories ORDER BY type DESC, name ASC")
+        self.categories = [CategoryRef(id, name, cat_type, bool(active))
+                           for id, name, cat_type, active in c.fetchall()]
+
+        self._accounts_by_name = {account.name: account for account in self.accounts}
+        self._categories_by_name = {category.name: category for category in self.categories}
+
+    def account(self, name) -> Optional[AccountRef]:
+        return self._accounts_by_name.get(name)
+
+    def category(self, name) -> Optional[CategoryRef]:
+        return self._categories_by_name.get(name)
+
+    def active_accounts(self) -> list[AccountRef]:
+        """Active accounts ordered by owner and name"""
+        return [account for account in self.accounts if account.active]
+
+    def active_categories(self, cat_type=None, exclude=()) -> list[CategoryRef]:
+        """Active categories (of one type, if given), income before expense"""
+        return [category for category in self.categories
+                if category.active and category.name not in exclude
+                and (cat_type is None or category.type == cat_type)]
+
+_caches = {}        # connection serial -> ReferenceData
+_generation = 0     # Bumped on every invalidation so in-flight loads are not kept
+_lock = threading.Lock()
+
+def reference_data(conn) -> ReferenceData:
+    """The cached accounts and categories for a connection, loading them if needed"""
+    serial = connection_serial(conn)
+    with _lock:
+        data = _caches.get(serial)
+        generation = _generation
+    if data is not None:
+        return data
+
+    data = ReferenceData(conn)
+    if serial:
+        with _lock:
+            if generation == _generation:
+                _caches[serial] = data
+    return data
+
+def invalidate_reference_data(_changed=None):
+    """Drop every cached copy (subscribed to account and category writes)"""
+    global _generation
+    with _lock:
+        _caches.clear()
+        _generation += 1
+
+subscribe(("accounts", "categories"), invalidate_reference_data, implied=False)
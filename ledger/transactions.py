@@ -0,0 +1,133 @@
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from budget_index import find_budget
+from events import commit_changes
+from search import TransactionSearch, search_query
+from ledger.categories import TRANSFER_CATEGORIES
+from ledger.reference import reference_data
+
+# -----------------------------
+# Transactions
+# -----------------------------
+# Amounts are entered as positive cents and signed by the category type:
+# expenses are stored negative. The balance and rollup triggers keep
+# accounts and reports in step with every write.
+
+class Transaction(NamedTuple):
+    id: int
+    account: Optional[str]
+    category: str
+    amount: int     # cents, signed
+    date: str
+    description: str
+
+def signed_amount(amount: int, category_type: str) -> int:
+    return -amount if category_type == "Expense" else amount
+
+def search_transactions(conn, search: Optional[TransactionSearch] = None,
+                        after: Optional[tuple[str, int]] = None, limit: int = 100) -> list[Transaction]:
+    """
+    One page of real transactions matching a TransactionSearch, newest first.
+    `after` is the (date, id) of the last row of the previous page.
+    """
+    c = conn.cursor()
+    c.execute(*search_query(search, after, limit))
+    return [Transaction(*row) for row in c.fetchall()]
+
+def transaction_page(conn, after: Optional[tuple[str, int]] = None, limit: int = 100) -> list[Transaction]:
+    """One page of every real transaction, newest first"""
+    return search_transactions(conn, None, after, limit)
+
+def get_transaction(conn, txn_id: int) -> Optional[Transaction]:
+    c = conn.cursor()
+    c.execute("""
+        SELECT t.id, a.name, c.name, t.amount, t.date, t.description
+        FROM transactions t
+        JOIN accounts a ON t.account_id = a.id
+        JOIN categories c ON t.category_id = c.id
+        WHERE t.id=?
+    """, (txn_id,))
+    row = c.fetchone()
+    return Transaction(*row) if row else None
+
+def _resolve(conn, account_name, category_name):
+    """(account_id, category_id, category_type), or None if either name is unknown"""
+    data = reference_data(conn)
+    account = data.account(account_name)
+    category = data.category(category_name)
+    if account is None or category is None:
+        return None
+    return account.id, category.id, category.type
+
+def add_transaction(conn, account_name: str, category_name: str, amount: int,
+                    date: Optional[str] = None, description: Optional[str] = None) -> int:
+    """
+    Record a transaction of `amount` positive cents (signed by the category
+    type) and link it to the budget whose period contains its date.
+    Returns the new id. Raises ValueError if the account or category is unknown.
+    """
+    if not date:
+        date = datetime.now().strftime("%Y-%m-%d")
+    if not description:
+        description = "No description"
+
+    data = reference_data(conn)
+    account = data.account(account_name)
+    if account is None:
+        raise ValueError(f"Unknown account: {account_name}")
+    category = data.category(category_name)
+    if category is None:
+        raise ValueError(f"Unknown category: {category_name}")
+    account_id, category_id, category_type = account.id, category.id, category.type
+
+    with conn:
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO transactions (account_id, category_id, amount, date, description, is_transfer)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (account_id, category_id, signed_amount(amount, category_type), date, description,
+              1 if category_name in TRANSFER_CATEGORIES else 0))
+        txn_id = c.lastrowid
+
+        # The budget whose period contains the date, from the in-memory index
+        budget_id = find_budget(conn, date)
+        if budget_id is not None:
+            c.execute("""
+                INSERT OR IGNORE INTO budget_transactions (budget_id, transaction_id)
+                VALUES (?, ?)
+            """, (budget_id, txn_id))
+
+        commit_changes(conn, "transactions", "budget_transactions")
+        return txn_id
+
+def update_transaction(conn, txn_id: int, account_name: str, category_name: str, amount: int,
+                       date: str, description: str) -> bool:
+    """Rewrite a transaction in place (amount in positive cents, signed by category type)"""
+    resolved = _resolve(conn, account_name, category_name)
+    if resolved is None:
+        return False
+    account_id, category_id, category_type = resolved
+
+    # The balance trigger moves the amount between accounts as needed
+    with conn:
+        c = conn.cursor()
+        c.execute("""
+            UPDATE transactions
+            SET account_id=?, category_id=?, amount=?, date=?, description=?, is_transfer=?
+            WHERE id=?
+        """, (account_id, category_id, signed_amount(amount, category_type), date, description,
+              1 if category_name in TRANSFER_CATEGORIES else 0, txn_id))
+        if c.rowcount == 0:
+            return False
+
+        commit_changes(conn, "transactions")
+        return True
+
+def delete_transaction(conn, txn_id: int) -> None:
+    """Delete a transaction and its budget links (the balance trigger adjusts its account)"""
+    with conn:
+        c = conn.cursor()
+        c.execute("DELETE FROM transactions WHERE id=?", (txn_id,))
+        c.execute("DELETE FROM budget_transactions WHERE transaction_id=?", (txn_id,))
+        commit_changes(conn, "transactions", "budget_transactions")
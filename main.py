@@ -1,8 +1,6 @@
-import sqlite3
-from datetime import datetime, date, timedelta
+from datetime import datetime, date
 from calendar import month_name, monthrange
-from matplotlib import pyplot as plt
-import io
+from functools import lru_cache
 from kivy.app import App
 from kivy.uix.popup import Popup
 from kivy.uix.textinput import TextInput
@@ -11,158 +9,51 @@ from kivy.uix.gridlayout import GridLayout
 from kivy.uix.button import Button
 from kivy.uix.togglebutton import ToggleButton
 from kivy.uix.label import Label
-from kivy.uix.image import Image
-from kivy.core.image import Image as CoreImage
 from kivy.uix.screenmanager import ScreenManager, Screen
-from kivy.properties import StringProperty, ListProperty, ObjectProperty
+from kivy.properties import StringProperty, ListProperty, ObjectProperty, NumericProperty
 from kivy.lang import Builder
+from kivy.clock import Clock
+
+from database import get_connection, close_connections
+from migrations import migrate
+import ledger
+from money import parse_money, format_money, cents_to_text
+from rollups import category_totals
+from events import DataWatcher, poll_external_changes
+from instrument import install_overlay, watch
+from profiler import profiled, profile_methods, install as install_profiler, save as save_profile
+from db_worker import run_in_background, shutdown as shutdown_db_worker
+from charts import series
+from chart_widgets import BarChart, PieChart
 
 # Load the Kivy KV layout file
 Builder.load_file("budgetbee.kv")
 
-# Database file name
-DB_NAME = "budgetbee.db"
-
-# Database file name
 def init_db():
-    """Initialize the database tables for accounts, categories, and transactions"""
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
-
-        # Accounts table
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS accounts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                type TEXT DEFAULT 'Checking',
-                owner TEXT NOT NULL,
-                name TEXT NOT NULL UNIQUE,
-                balance REAL NOT NULL,
-                starting_balance REAL NOT NULL,
-                is_active INTEGER DEFAULT 1
-            )
-        """)
-
-        # Categories table
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS categories (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE,
-                type TEXT,
-                is_active INTEGER DEFAULT 1
-            )
-        """)
-
-        # Ensure the System category exists (used for internal/account transactions)
-        c.execute("SELECT id FROM categories WHERE name=?", ("System",))
-        if not c.fetchone():
-            c.execute("INSERT INTO categories (name, type) VALUES (?, ?)", ("System", "system"))
-
-        # Transactions table
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS transactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                account_id INTEGER,
-                category_id INTEGER NOT NULL,
-                amount REAL NOT NULL,
-                date TEXT NOT NULL,
-                description TEXT,
-                projected INTEGER DEFAULT 0,
-                fulfilled INTEGER DEFAULT 0,
-                status TEXT DEFAULT "Pending",
-                is_transfer INTEGER DEFAULT 0,
-                FOREIGN KEY(account_id) REFERENCES accounts(id),
-                FOREIGN KEY(category_id) REFERENCES categories(id)
-            )
-        """)
-
-        # Check if "Transfer To" exists
-        c.execute("SELECT id FROM categories WHERE name=?", ("Transfer To",))
-        if not c.fetchone():
-            c.execute("""
-                INSERT INTO categories (name, type, is_active)
-                VALUES (?, ?, 1)
-            """, ("Transfer To", "Expense"))
-        
-        # Check if "Transfer From" exists
-        c.execute("SELECT id FROM categories WHERE name=?", ("Transfer From",))
-        if not c.fetchone():
-            c.execute("""
-                INSERT INTO categories (name, type, is_active)
-                VALUES (?, ?, 1)
-            """, ("Transfer From", "Income"))
-
-        # Budgets table
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS budgets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE,
-                start_date TEXT NOT NULL UNIQUE,
-                end_date TEXT UNIQUE
-            )
-        """)
-
-        # Budgeted categories table
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS budgeted_categories (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                budget_id INTEGER NOT NULL,
-                category_id INTEGER NOT NULL,
-                allocated_amount REAL NOT NULL,
-                alloc_desc TEXT,
-                FOREIGN KEY(budget_id) REFERENCES budgets(id),
-                FOREIGN KEY(category_id) REFERENCES categories(id)
-            )
-        """)
-
-        # Budget transactions table
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS budget_transactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                budget_id INTEGER NOT NULL,
-                transaction_id INTEGER NOT NULL,
-                FOREIGN KEY(budget_id) REFERENCES budgets(id),
-                FOREIGN KEY(transaction_id) REFERENCES transactions(id)
-            )
-        """)
-
-        conn.commit()
+    """Bring the database schema up to date (a no-op when it already is)"""
+    migrate(get_connection())
 
 # -----------------------------
-# Helper functions
+# Calendar Popup
 # -----------------------------
-def get_system_category_id():
-    """Get the ID of the 'System' category, creating it if it doesn't exist"""
-    with sqlite3.connect(DB_NAME) as conn:
-        c = conn.cursor()
-
-        # Try to find the System category
-        c.execute("SELECT id FROM categories WHERE name = 'System'")
-        row = c.fetchone()
-
-        return row[0]
-
-def recalc_budget_ranges(conn):
-    c = conn.cursor()
-    c.execute("SELECT id, start_date FROM budgets ORDER BY start_date ASC")
-    budgets = c.fetchall()
-
-    for i, (budget_id, start_date) in enumerate(budgets):
-        if i < len(budgets) - 1:
-            # End date = day before next budget's start date
-            next_start = budgets[i+1][1]
-            end_date = (datetime.strptime(next_start, "%Y-%m-%d") - timedelta(days=1)).strftime("%Y-%m-%d")
-        else:
-            # Last budget = Current
-            end_date = "Current"
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+CALENDAR_CELLS = 6 * 7  # Enough weeks for any month
 
-        c.execute("UPDATE budgets SET end_date=? WHERE id=?", (end_date, budget_id))
-    conn.commit()
+@lru_cache(maxsize=240)
+def month_layout(year, month):
+    """The CALENDAR_CELLS day numbers of a month's grid, Monday first, 0 for blanks"""
+    first_weekday, num_days = monthrange(year, month)
+    days = [0] * first_weekday + list(range(1, num_days + 1))
+    return tuple(days + [0] * (CALENDAR_CELLS - len(days)))
 
-# -----------------------------
-# Calendar Popup
-# -----------------------------
 class CalendarPopup(Popup):
-    def __init__(self, target_input, year=None, month=None, **kwargs):
+    """
+    Date picker. Its grid is one fixed pool of day buttons whose labels are
+    rewritten from month_layout when paging, so a single instance is shared
+    by every screen (see pick_date).
+    """
+
+    def __init__(self, target_input=None, year=None, month=None, **kwargs):
         super().__init__(**kwargs)
         self.title = "Select Date"
         self.size_hint = (0.9, 0.8)
@@ -175,6 +66,7 @@ class CalendarPopup(Popup):
 
         self.build_calendar()
 
+    @profiled
     def build_calendar(self):
         main_layout = BoxLayout(orientation="vertical", spacing=5, padding=5)
 
@@ -201,35 +93,42 @@ class CalendarPopup(Popup):
         self.year_label = year_label
         main_layout.add_widget(nav_layout)
 
-        # Calendar grid
+        # Calendar grid: weekday headers, then a button for every cell
         self.grid = GridLayout(cols=7, spacing=5, padding=5)
+        for d in WEEKDAYS:
+            self.grid.add_widget(Button(text=d, size_hint_y=None, height=30, disabled=True))
+        self.day_buttons = []
+        for _ in range(CALENDAR_CELLS):
+            btn = Button(size_hint_y=None, height=40)
+            btn.bind(on_release=self.select_date)
+            self.grid.add_widget(btn)
+            self.day_buttons.append(btn)
         main_layout.add_widget(self.grid)
 
         self.refresh_calendar()
         self.content = main_layout
 
+    @profiled
     def refresh_calendar(self):
-        self.grid.clear_widgets()
-
-        # Days of week headers
-        for d in ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]:
-            self.grid.add_widget(Button(text=d, size_hint_y=None, height=30, disabled=True))
-    
-        first_weekday, num_days = monthrange(self.year, self.month)
-
-        # Fill in blanks for first week
-        for _ in range((first_weekday + 7) % 7):
-            self.grid.add_widget(Button(text="", size_hint_y=None, height=30, disabled=True))
+        for btn, day in zip(self.day_buttons, month_layout(self.year, self.month)):
+            btn.text = str(day) if day else ""
+            btn.disabled = not day
+            btn.opacity = 1 if day else 0
 
-        # Add day buttons
-        for day in range(1, num_days + 1):
-            btn = Button(text=str(day), size_hint_y=None, height=40)
-            btn.bind(on_release=self.select_date)
-            self.grid.add_widget(btn)
-        
         self.year_label.text = f"{self.year}"
         self.month_label.text = f"{month_name[self.month]}"
 
+    def show(self, target_input):
+        """Open for target_input, at the month of the date it holds (or this month)"""
+        self.target_input = target_input
+        try:
+            current = datetime.strptime(target_input.text.strip(), "%Y-%m-%d").date()
+        except ValueError:
+            current = date.today()
+        self.year, self.month = current.year, current.month
+        self.refresh_calendar()
+        self.open()
+
     def prev_year(self, instance):
         self.year -= 1
         self.refresh_calendar()
@@ -255,90 +154,198 @@ class CalendarPopup(Popup):
         self.refresh_calendar()
 
     def select_date(self, instance):
+        if not instance.text:
+            return
         selected_day = int(instance.text)
         self.target_input.text = f"{self.year:04d}-{self.month:02d}-{selected_day:02d}"
         self.dismiss()
 
+_calendar_popup = None
+
+def pick_date(target_input):
+    """Open the shared CalendarPopup to fill target_input with a YYYY-MM-DD date"""
+    global _calendar_popup
+    if _calendar_popup is None:
+        _calendar_popup = CalendarPopup()
+    _calendar_popup.show(target_input)
+
+class ListRow(BoxLayout):
+    """
+    One row of a RowPool list: a label, then buttons that act on whatever
+    item the row currently shows. `buttons` is a list of (text, width, action)
+    and each action is called with the row's key.
+    """
+
+    def __init__(self, buttons=(), **kwargs):
+        super().__init__(orientation="horizontal", size_hint_y=None, height=40, **kwargs)
+        self.key = None
+        self.item = None
+
+        self.label = Label(halign="center", valign="middle")
+        self.label.bind(size=self.label.setter("text_size"))
+        self.add_widget(self.label)
+
+        self.buttons = []
+        for text, width, action in buttons:
+            btn = Button(text=text, size_hint_x=None, width=width)
+            btn.bind(on_release=lambda btn, action=action: action(self.key))
+            self.add_widget(btn)
+            self.buttons.append(btn)
+
+class RowPool:
+    """
+    Keeps a list layout in step with a list of items, one ListRow per item.
+
+    show() diffs the new items against the rows on screen by key: unchanged
+    rows are left alone, changed ones are re-rendered in place, rows for items
+    that are gone are taken off and kept for reuse, and only rows that moved
+    are re-inserted. Deleting one item of a long list touches one row.
+    """
+
+    def __init__(self, layout, buttons, render, key=lambda item: item[0]):
+        self.layout = layout
+        self.buttons = buttons
+        self.render = render    # render(row, item): set the label (and buttons) for an item
+        self.key = key
+        self.rows = {}          # key -> ListRow on screen
+        self.free = []          # ListRows off screen, ready for reuse
+        self._placeholder = None
+        layout.bind(minimum_height=layout.setter("height"))
+
+    def loading(self, text="Loading..."):
+        """Show a placeholder while the first load runs (existing rows stay up)"""
+        if not self.rows and self._placeholder is None:
+            self._placeholder = Label(text=text, size_hint_y=None, height=40)
+            self.layout.add_widget(self._placeholder)
+
+    def failed(self, text):
+        """Replace the loading placeholder with an error (existing rows stay up)"""
+        if self._placeholder is not None:
+            self._placeholder.text = text
+        elif not self.rows:
+            self._placeholder = Label(text=text, size_hint_y=None, height=40)
+            self.layout.add_widget(self._placeholder)
+
+    def show(self, items):
+        if self._placeholder is not None:
+            self.layout.remove_widget(self._placeholder)
+            self._placeholder = None
+
+        old_rows, self.rows = self.rows, {}
+        wanted = []
+        for item in items:
+            key = self.key(item)
+            row = old_rows.pop(key, None)
+            if row is None:
+                row = self.free.pop() if self.free else ListRow(self.buttons)
+                row.key = key
+            if row.item != item:
+                self.render(row, item)
+                row.item = item
+            self.rows[key] = row
+            wanted.append(row)
+
+        for row in old_rows.values():
+            self.layout.remove_widget(row)
+            row.item = None
+            self.free.append(row)
+
+        # Put rows in order; layout.children runs bottom to top
+        for position, row in enumerate(wanted):
+            children = self.layout.children
+            index = len(children) - 1 - position
+            if index >= 0 and children[index] is row:
+                continue
+            if row.parent is self.layout:
+                self.layout.remove_widget(row)
+            self.layout.add_widget(row, index=len(self.layout.children) - position)
+
+def replace_task(old_task, new_task):
+    """Discard a screen's previous background load in favour of a new one"""
+    if old_task is not None:
+        old_task.discard()
+    return new_task
+
+def load_failed(watch, rows=None):
+    """on_error for a screen's background load: show the error and load again on the next visit"""
+    def on_error(error):
+        watch.invalidate()
+        if rows is not None:
+            rows.failed(f"Could not load: {error}")
+    return on_error
+
 # -----------------------------
 # Screens
 # -----------------------------
+def fetch_dashboard_totals():
+    """Active account balances: total and per account type (runs on the DB worker)"""
+    return ledger.balance_totals(get_connection())
+
 class DashboardScreen(Screen):
     total_balance = StringProperty("0.00")
     checking_balance = StringProperty("0.00")
     savings_balance = StringProperty("0.00")
     benefits_balance = StringProperty("0.00")
+    _task = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._watch = DataWatcher("accounts")
 
     def on_pre_enter(self):
         """Update total balance before entering the dashboard"""
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-
-            c.execute("SELECT SUM(balance) FROM accounts WHERE is_active = 1")
-            total = c.fetchone()[0] or 0.0
-            self.total_balance = f"{total:.2f}"
-
-            c.execute("SELECT SUM(balance) FROM accounts WHERE type = 'Checking' AND is_active = 1")
-            total_checking = c.fetchone()[0] or 0.0
-            self.checking_balance = f"{total_checking:.2f}"
-
-            c.execute("SELECT SUM(balance) FROM accounts WHERE type = 'Savings' AND is_active = 1")
-            total_savings = c.fetchone()[0] or 0.0
-            self.savings_balance = f"{total_savings:.2f}"
-
-            c.execute("SELECT SUM(balance) FROM accounts WHERE type = 'Benefits' AND is_active = 1")
-            total_benefits = c.fetchone()[0] or 0.0
-            self.benefits_balance = f"{total_benefits:.2f}"
+        if not self._watch.changed():
+            return  # Balances unchanged since the last visit
+        self._task = replace_task(self._task, run_in_background(
+            fetch_dashboard_totals, on_result=self.show_totals, on_error=load_failed(self._watch)
+        ))
+
+    def show_totals(self, totals):
+        total, total_checking, total_savings, total_benefits = totals
+        self.total_balance = cents_to_text(total)
+        self.checking_balance = cents_to_text(total_checking)
+        self.savings_balance = cents_to_text(total_savings)
+        self.benefits_balance = cents_to_text(total_benefits)
 
 # -----------------------------
 # Accounts screens
 # -----------------------------
+def fetch_active_accounts():
+    """Active accounts (runs on the DB worker)"""
+    return ledger.list_active_accounts(get_connection())
+
 class AccountsScreen(Screen):
     accounts = ListProperty([])     # List of active accounts
+    _task = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._watch = DataWatcher("accounts")
+        self._rows = RowPool(self.ids.accts_list, [
+            ("Edit", 100, self.edit_account),
+            ("X", 40, self.delete_account),
+        ], self.render_account)
 
     def on_pre_enter(self):
-        """Fetch active accounts and populate the UI"""
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("""
-                SELECT id, owner, name, balance, type
-                FROM accounts
-                WHERE is_active = 1
-                ORDER BY owner ASC, name ASC
-            """)
-            self.accounts = c.fetchall()
-            if self.accounts:
-                self.acct_id = self.accounts[0][0]
+        """Fetch active accounts in the background and populate the UI"""
+        if not self._watch.changed():
+            return  # Keep the list from the last visit
+        self._rows.loading()
+        self._task = replace_task(self._task, run_in_background(
+            fetch_active_accounts, on_result=self.show_accounts, on_error=load_failed(self._watch, self._rows)
+        ))
+
+    @profiled
+    def show_accounts(self, accounts):
+        self.accounts = accounts
+        if self.accounts:
+            self.acct_id = self.accounts[0][0]
 
         # Update the UI list
-        self.ids.accts_list.clear_widgets()
-        for acct in self.accounts:
-            box = BoxLayout(orientation="horizontal", size_hint_y=None, height=40)
+        self._rows.show(self.accounts)
 
-            if acct[3] >= 0:
-                amount_display = f"${acct[3]:.2f}"
-            else:
-                amount_display = f"-${-acct[3]:.2f}"
-
-            # Display account info
-            label = Label(text=f"{acct[1]} | {acct[2]} | {amount_display} | {acct[4]}", halign="center", valign="middle")
-            label.bind(size=label.setter("text_size"))
-
-            # Edit button
-            edit_btn = Button(text="Edit", size_hint_x=None)
-            edit_btn.bind(on_release=lambda btn, acct_id=acct[0]: self.edit_account(acct_id))
-
-            # Delete button
-            delete_btn = Button(text="X", size_hint_x=None, width=40)
-            delete_btn.bind(on_release=lambda btn, acct_id=acct[0]: self.delete_account(acct_id))
-
-            box.add_widget(label)
-            box.add_widget(edit_btn)
-            box.add_widget(delete_btn)
-
-            self.ids.accts_list.add_widget(box)
-        
-        # Make list height adjust to number of items
-        self.ids.accts_list.bind(minimum_height=self.ids.accts_list.setter('height'))
+    def render_account(self, row, acct):
+        row.label.text = f"{acct[1]} | {acct[2]} | {format_money(acct[3])} | {acct[4]}"
 
     def edit_account(self, acct_id):
         edit_screen = self.manager.get_screen("edit_account")
@@ -346,27 +353,7 @@ class AccountsScreen(Screen):
         self.manager.current = "edit_account"
 
     def delete_account(self, acct_id):
-        # Make list height adjust to number of items
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-
-            # Get account info
-            c.execute("SELECT name, balance FROM accounts WHERE id=?", (acct_id,))
-            row = c.fetchone()
-            if not row:
-                return
-            acct_name, acct_balance = row
-
-            # Add system transaction for account deletion
-            c.execute("""
-                INSERT INTO transactions (account_id, category_id, amount, date, description)
-                VALUES (?, ?, ?, DATE('now'), ?)
-            """, (acct_id, get_system_category_id(), acct_balance, f"Deleted account {acct_name}"))
-
-            # Mark account as inactive
-            c = conn.cursor()
-            c.execute("UPDATE accounts SET is_active = 0 WHERE id=?", (acct_id,))
-            conn.commit()
+        ledger.delete_account(get_connection(), acct_id)
 
         # Refresh the accounts list
         self.on_pre_enter()
@@ -385,141 +372,44 @@ class AddAccountScreen(Screen):
         if not owner or not name:
             return  # Validate input
 
-        # Convert balance to float
+        # Convert balance to cents
         if not balance:
-            balance = 0.00
+            balance = 0
         else:
             try:
-                balance = float(balance)
-            except:
+                balance = parse_money(balance)
+            except ValueError:
                 return
 
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-
-            # Check if account exists
-            c.execute("SELECT id, is_active FROM accounts WHERE name = ?", (name,))
-            row = c.fetchone()
-
-            if row:
-                account_id, is_active = row
-
-                if is_active == 1:
-                    # Account already active → don't add
-                    return False, "Account already exists."
-                else:
-                    # Reactivate the deleted account
-                    c.execute(
-                        "UPDATE accounts SET is_active = 1, balance = ? WHERE id = ?",
-                        (balance, account_id)
-                    )
-                    conn.commit()
-
-                    # Add system transaction for account reactivation
-                    c.execute(
-                        """
-                        INSERT INTO transactions (account_id, category_id, amount, description, date)
-                        VALUES (?, ?, ?, ?, DATE('now'))
-                        """,
-                        (account_id, get_system_category_id(),
-                        balance, f'Reactivated {name}')
-                    )
-                    conn.commit()
-            else:
-                # New account
-                c.execute("""
-                    INSERT INTO accounts (type, owner, name, balance, starting_balance, is_active)
-                    VALUES (?, ?, ?, ?, ?, 1)""",
-                    (acct_type, owner, name, balance, balance)
-                )
-                account_id = c.lastrowid
-
-                # Add system transaction for new account
-                c.execute(
-                    """
-                    INSERT INTO transactions (account_id, category_id, amount, description, date)
-                    VALUES (?, ?, ?, ?, DATE('now'))
-                    """,
-                    (account_id, get_system_category_id(), balance, f'Added {name}')
-                )
-                conn.commit()
-    
+        if ledger.add_account(get_connection(), owner, name, balance, acct_type) is None:
+            return False, "Account already exists."
+
         self.manager.current = "accounts"
 
 class EditAccountScreen(Screen):
     def load_account(self, acct_id):
         self.acct_id = acct_id
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("SELECT type, owner, name, balance FROM accounts WHERE id=?", (acct_id,))
-            row = c.fetchone()
-            if row:
-                self.ids.type_spinner.text = row[0]
-                self.ids.owner.text = row[1]
-                self.ids.name.text = row[2]
-                self.ids.balance.text = str(row[3])
+        account = ledger.get_account(get_connection(), acct_id)
+        if account:
+            self.ids.type_spinner.text = account.type
+            self.ids.owner.text = account.owner
+            self.ids.name.text = account.name
+            self.ids.balance.text = cents_to_text(account.balance)
 
     def save_account(self):
         new_type = self.ids.type_spinner.text
         new_owner = self.ids.owner.text
         new_name = self.ids.name.text
-        try:
-            new_balance = float(self.ids.balance.text)
-        except:
-            if not self.ids.balance.text:
-                new_balance = 0
-
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-
-            # Get old account name
-            c.execute("SELECT type, name, balance, starting_balance FROM accounts WHERE id=?", (self.acct_id,))
-
-            row = c.fetchone()
-            
-            old_type = row[0]
-            old_name = row[1]
-            old_balance = row[2]
-            old_starting_balance = row[3]
-
-            if not new_type or not new_owner or not new_name:
+        if not self.ids.balance.text:
+            new_balance = 0
+        else:
+            try:
+                new_balance = parse_money(self.ids.balance.text)
+            except ValueError:
                 return
-            
-            c.execute("""
-                UPDATE accounts
-                SET type=?, owner=?, name=?, balance=?
-                WHERE id=?
-                """, (new_type, new_owner, new_name, new_balance, self.acct_id)
-            )
-
-            # If the name changed, update system transactions
-            if old_name != new_name:
-                c.execute("""
-                    UPDATE transactions
-                    SET description = REPLACE(description, ?, ?)
-                    WHERE account_id=? AND description LIKE ?""",
-                    (old_name, new_name, self.acct_id, f'%{old_name}%')
-                )
-
-            if old_balance != new_balance:
-                balance_diff = new_balance - old_balance
-                new_starting_balance = old_starting_balance + balance_diff
-                
-                c.execute("""
-                    UPDATE accounts
-                    SET balance = ?, starting_balance = ?
-                    WHERE id=?""",
-                    (new_balance, new_starting_balance, self.acct_id)
-                )
-
-                c.execute("""
-                    UPDATE transactions
-                    SET amount = REPLACE(amount, ?, ?)
-                    WHERE account_id=? AND amount LIKE ?""",
-                    (old_starting_balance, new_starting_balance, self.acct_id, f"%{old_starting_balance}%")
-                )
-                
-            conn.commit()
+
+        if not ledger.update_account(get_connection(), self.acct_id, new_type, new_owner, new_name, new_balance):
+            return
 
         # Go back to summary view
         summary_screen = self.manager.get_screen("accounts")
@@ -529,46 +419,43 @@ class EditAccountScreen(Screen):
 # -----------------------------
 # Categories screens
 # -----------------------------
+def fetch_user_categories():
+    """Active categories except the built-in ones (runs on the DB worker)"""
+    return ledger.list_user_categories(get_connection())
+
 class CategoriesScreen(Screen):
     categories = ListProperty([])
+    _task = None
 
-    def on_pre_enter(self):
-        """Fetch categories and populate the UI, excluding System"""
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("""
-                SELECT id, name, type
-                FROM categories
-                WHERE name != 'System' AND name != 'Transfer To' AND name != 'Transfer From' AND is_active = 1
-                ORDER BY type DESC, name ASC""")
-            self.categories = c.fetchall()
-
-        # Update the UI
-        self.ids.cats_list.clear_widgets()
-        for cat in self.categories:
-            self.category_id = cat[0]
-
-            box = BoxLayout(orientation="horizontal", size_hint_y=None, height=40)
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._watch = DataWatcher("categories")
+        self._rows = RowPool(self.ids.cats_list, [
+            ("Edit", 100, self.edit_category),
+            ("X", 40, self.delete_category),
+        ], self.render_category)
 
-            label = Label(text=f"{cat[1]} | {cat[2]}", halign="center", valign="middle")
-            label.bind(size=label.setter("text_size"))
+    def on_pre_enter(self):
+        """Fetch categories in the background and populate the UI, excluding System"""
+        if not self._watch.changed():
+            return  # Keep the list from the last visit
+        self._rows.loading()
+        self._task = replace_task(self._task, run_in_background(
+            fetch_user_categories, on_result=self.show_categories, on_error=load_failed(self._watch, self._rows)
+        ))
 
-            # Edit button
-            edit_btn = Button(text="Edit", size_hint_x=None)
-            edit_btn.bind(on_release=lambda btn, cat_id=cat[0]: self.edit_category(cat_id))
+    @profiled
+    def show_categories(self, categories):
+        self.categories = categories
 
-            # Delete button
-            delete_btn = Button(text="X", size_hint_x=None,width=40)
-            delete_btn.bind(on_release=lambda btn, cat_id=cat[0]: self.delete_category(cat_id))
+        if self.categories:
+            self.category_id = self.categories[-1][0]
 
-            box.add_widget(label)
-            box.add_widget(edit_btn)
-            box.add_widget(delete_btn)
+        # Update the UI
+        self._rows.show(self.categories)
 
-            self.ids.cats_list.add_widget(box)
-        
-        # **Bind height to children**
-        self.ids.cats_list.bind(minimum_height=self.ids.cats_list.setter('height'))
+    def render_category(self, row, cat):
+        row.label.text = f"{cat[1]} | {cat[2]}"
 
     def edit_category(self, category_id):
         edit_screen = self.manager.get_screen("edit_category")
@@ -576,11 +463,8 @@ class CategoriesScreen(Screen):
         self.manager.current = "edit_category"
 
     def delete_category(self, cat_id):
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("UPDATE categories SET is_active=0 WHERE id=?", (cat_id,))
-            conn.commit()
-            self.on_pre_enter()
+        ledger.deactivate_category(get_connection(), cat_id)
+        self.on_pre_enter()
 
 class AddCategoryScreen(Screen):
     def on_pre_enter(self):
@@ -594,48 +478,25 @@ class AddCategoryScreen(Screen):
     def add_category(self, name, type):
         if not name or not type:
             return
-        
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            # Check if category exists
-            c.execute("SELECT id, is_active FROM categories WHERE name=?", (name,))
-            row = c.fetchone()
-
-            if row:
-                cat_id, is_active = row
-                if is_active == 0:
-                    # Reactivate
-                    c.execute("UPDATE categories SET is_active=1, type=? WHERE id=?", 
-                            (type, cat_id))
-                    conn.commit()
-                    self.manager.current = "categories"
-                    return cat_id
-                else:
-                    # Already exists and active
-                    return None  
-            else:
-                # Create new
-                c.execute("INSERT INTO categories (name, type, is_active) VALUES (?, ?, 1)", 
-                        (name, type))
-                conn.commit()
-                self.manager.current = "categories"
-                return c.lastrowid
+
+        cat_id = ledger.add_category(get_connection(), name, type)
+        if cat_id is None:
+            return None     # Already exists and active
+        self.manager.current = "categories"
+        return cat_id
 
 class EditCategoryScreen(Screen):
     def load_category(self, category_id):
         self.category_id = category_id
-        with sqlite3.connect(DB_NAME)as conn:
-            c = conn.cursor()
-            c.execute("SELECT name, type FROM categories WHERE id=?", (self.category_id,))
-            row = c.fetchone()
-            if row:
-                self.ids.name.text = row[0]
-                if row[1] == "Income":
-                    self.ids.income_btn.state = "down"
-                    self.ids.expense_btn.state = "normal"
-                else:
-                    self.ids.income_btn.state = "normal"
-                    self.ids.expense_btn.state = "down"
+        category = ledger.get_category(get_connection(), category_id)
+        if category:
+            self.ids.name.text = category.name
+            if category.type == "Income":
+                self.ids.income_btn.state = "down"
+                self.ids.expense_btn.state = "normal"
+            else:
+                self.ids.income_btn.state = "normal"
+                self.ids.expense_btn.state = "down"
     
     def save_category(self):
         new_name = self.ids.name.text
@@ -647,56 +508,8 @@ class EditCategoryScreen(Screen):
         if not new_name or not new_type:
             return
 
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-
-            # Get old category
-            c.execute("SELECT name, type FROM categories WHERE id=?", (self.category_id,))
-            row = c.fetchone()
-
-            old_name = row[0]
-            old_type = row[1]
-
-            if not new_name or not new_type:
-                return
-            
-            c.execute("""
-                UPDATE categories
-                SET name=?, type=?
-                WHERE id=?""",
-                (new_name, new_type, self.category_id))
-            
-            c.execute("""
-                UPDATE categories
-                SET name=?, type=?
-                WHERE id=?""",
-                (new_name, new_type, self.category_id)
-            )
-
-            if old_type != new_type:
-                c.execute("""
-                    UPDATE transactions
-                    SET amount=-amount
-                    WHERE category_id=?""",
-                    (self.category_id,))
-
-                # Recalculate account balances
-                c.execute("SELECT DISTINCT account_id FROM transactions WHERE category_id=?", (self.category_id,))
-                account_ids = [row[0] for row in c.fetchall()]
-
-                for acct_id in account_ids:
-                    # Recalculate balance as starting_balance + sum(transactions)
-                    c.execute("SELECT starting_balance FROM accounts WHERE id=?", (acct_id,))
-                    starting_balance = c.fetchone()[0]
-
-                    c.execute("SELECT COALESCE(SUM(amount), 0) FROM transactions WHERE account_id=?", (acct_id,))
-                    total_transactions = c.fetchone()[0]
-
-                    new_balance = starting_balance + total_transactions
-
-                    c.execute("UPDATE accounts SET balance=? WHERE id=?", (new_balance, acct_id))
-
-            conn.commit()
+        if not ledger.update_category(get_connection(), self.category_id, new_name, new_type):
+            return
         
         categories_screen = self.manager.get_screen("categories")
         categories_screen.category_id = self.category_id
@@ -705,55 +518,141 @@ class EditCategoryScreen(Screen):
 # -----------------------------
 # Transactions screens
 # -----------------------------
-class TransactionsScreen(Screen):
-    transactions = ListProperty([])
+class TransactionRow(BoxLayout):
+    """One recycled row of the transactions list (see <TransactionRow> in the kv file)"""
+    txn_id = NumericProperty(0)
+    text = StringProperty("")
+
+def fetch_transaction_page(search=None, after=None, limit=100):
+    """
+    One page of real transactions matching a TransactionSearch, newest first
+    (runs on the DB worker). `after` is the (date, id) of the last row of the
+    previous page.
+    """
+    return ledger.search_transactions(get_connection(), search, after, limit)
 
-    def on_pre_enter(self):
-        """Fetch transactions and populate UI"""
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("""
-                SELECT t.id, a.name, c.name, t.amount, t.date, t.description
-                FROM transactions t
-                JOIN accounts a ON t.account_id = a.id
-                JOIN categories c ON t.category_id = c.id
-                WHERE projected = 0 AND c.name != 'System'
-                ORDER BY t.date DESC
-            """)
-            self.transactions = c.fetchall()
+class TransactionsScreen(Screen):
+    PAGE_SIZE = 100         # Rows fetched per page
+    LOAD_THRESHOLD = 0.1    # Fetch the next page when scrolled this close to the bottom
+    SEARCH_DELAY = 0.3      # Seconds of no typing before a search runs
+    ALL_ACCOUNTS = "All accounts"
+    ALL_CATEGORIES = "All categories"
 
-        # Update the UI
-        self.ids.txns_list.clear_widgets()
-        for txn in self.transactions:
-            box = BoxLayout(orientation="horizontal", size_hint_y=None, height=40)
+    status_text = StringProperty("")
+    _task = None
 
-            # Format amount display
-            amount_display = f"${txn[3]:.2f}" if txn[3] >= 0 else f"-${-txn[3]:.2f}"
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._watch = DataWatcher("transactions", "accounts", "categories")
+        self._search = ledger.TransactionSearch()
+        self._account_ids = {}
+        self._category_ids = {}
+        self._search_trigger = Clock.create_trigger(self.apply_search, self.SEARCH_DELAY)
 
-            label = Label(
-                text=f"{txn[1]} | {txn[2]} | {amount_display} | {txn[4]} | {txn[5]}",
-                halign="center",
-                valign="middle"
-            )
-            label.bind(size=label.setter("text_size"))
+    def on_pre_enter(self):
+        """Reset the list and load the first page of transactions"""
+        if not self._watch.changed():
+            return  # Keep the loaded pages and scroll position
+        self.refresh_facets()
+        self.reload()
+
+    def refresh_facets(self):
+        """Fill the account and category filters"""
+        conn = get_connection()
+        self._account_ids = {account.name: account.id for account in ledger.reference_data(conn).active_accounts()}
+        self._category_ids = {category.name: category.id for category in ledger.list_user_categories(conn)}
+        self.ids.search_account.values = [self.ALL_ACCOUNTS, *self._account_ids]
+        self.ids.search_category.values = [self.ALL_CATEGORIES, *self._category_ids]
+
+    def on_search_changed(self):
+        """Any search field changed: search once typing pauses for SEARCH_DELAY"""
+        self._search_trigger.cancel()
+        self._search_trigger()
+
+    def read_search(self):
+        """TransactionSearch from the search bar and filters (unparsable amounts are ignored)"""
+        amounts = []
+        for field in (self.ids.search_min, self.ids.search_max):
+            try:
+                amounts.append(parse_money(field.text) if field.text.strip() else None)
+            except ValueError:
+                amounts.append(None)
+
+        return ledger.TransactionSearch(
+            text=self.ids.search_text.text.strip(),
+            account_id=self._account_ids.get(self.ids.search_account.text),
+            category_id=self._category_ids.get(self.ids.search_category.text),
+            min_amount=amounts[0],
+            max_amount=amounts[1],
+            start_date=self.ids.search_start.text or None,
+            end_date=self.ids.search_end.text or None,
+        )
+
+    def apply_search(self, _dt=None):
+        search = self.read_search()
+        if search != self._search:
+            self._search = search
+            self.reload()
+
+    def clear_search(self):
+        self._search_trigger.cancel()
+        for field in (self.ids.search_text, self.ids.search_min, self.ids.search_max,
+                      self.ids.search_start, self.ids.search_end):
+            field.text = ""
+        self.ids.search_account.text = self.ALL_ACCOUNTS
+        self.ids.search_category.text = self.ALL_CATEGORIES
+        self.apply_search()
 
-            box.add_widget(label)
+    def open_calendar(self, target_input):
+        pick_date(target_input)
+
+    def reload(self):
+        """Drop the loaded pages and stream in the results for the current search"""
+        self._page_cursor = None       # (date, id) of the last row loaded
+        self._exhausted = False
+        self._task = replace_task(self._task, None)
+        self.ids.txns_list.data = []
+        self.ids.txns_list.scroll_y = 1
+        self.status_text = "Loading..."
+        self.load_next_page()
+
+    def load_next_page(self):
+        """Request the next page, newest first, using keyset pagination on (date, id)"""
+        if self._exhausted or (self._task is not None and not self._task.done()):
+            return
 
-            # Add delete button for non-system transactions
-            if txn[2] != "System":
-                edit_btn = Button(text="Edit", size_hint_x=None)
-                edit_btn.bind(on_release=lambda btn, txn_id=txn[0]: self.edit_transaction(txn_id))
+        self._task = run_in_background(
+            fetch_transaction_page, self._search, self._page_cursor, self.PAGE_SIZE,
+            on_result=self.append_page, on_error=self.page_failed
+        )
+
+    def page_failed(self, error):
+        # The next scroll asks for the same page again
+        self.status_text = f"Could not load transactions: {error}"
+
+    @profiled
+    def append_page(self, rows):
+        self.status_text = "" if rows or self._page_cursor else "No matching transactions"
+        if len(rows) < self.PAGE_SIZE:
+            self._exhausted = True
+        if not rows:
+            return
 
-                delete_btn = Button(text="X", size_hint_x=None, width=40)
-                delete_btn.bind(on_release=lambda btn, txn_id=txn[0]: self.delete_transaction(txn_id))
-                
-                box.add_widget(edit_btn)
-                box.add_widget(delete_btn)
+        last = rows[-1]
+        self._page_cursor = (last[4], last[0])
 
-            self.ids.txns_list.add_widget(box)
+        self.ids.txns_list.data.extend(
+            {
+                "txn_id": txn[0],
+                "text": f"{txn[1]} | {txn[2]} | {format_money(txn[3])} | {txn[4]} | {txn[5]}",
+            }
+            for txn in rows
+        )
 
-        # **Bind height to children**
-        self.ids.txns_list.bind(minimum_height=self.ids.txns_list.setter('height'))
+    def on_list_scroll(self, scroll_y):
+        """Load more rows as the user nears the end of what is loaded"""
+        if scroll_y <= self.LOAD_THRESHOLD:
+            self.load_next_page()
 
     def edit_transaction(self, transaction_id):
         edit_screen = self.manager.get_screen("edit_transaction")
@@ -761,31 +660,12 @@ class TransactionsScreen(Screen):
         self.manager.current = "edit_transaction"
 
     def delete_transaction(self, txn_id):
-        """Delete a transaction and adjust account balance"""
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            # Get transaction details
-            c.execute("""
-                SELECT account_id, category_id, amount
-                FROM transactions
-                WHERE id=?
-            """, (txn_id,))
-            txn = c.fetchone()
-            if txn:
-                account_id, category_id, amount = txn
-
-                # Update account balance
-                c.execute(
-                    "UPDATE accounts SET balance = balance - ? WHERE id=?",
-                    (amount, account_id)
-                )
-
-                # Delete the transaction
-                c.execute("DELETE FROM transactions WHERE id=?", (txn_id,))
-            conn.commit()
-
-        # Refresh the screen
-        self.on_pre_enter()
+        """Delete a transaction (the balance trigger adjusts its account)"""
+        ledger.delete_transaction(get_connection(), txn_id)
+
+        # Drop the row from the loaded pages instead of reloading them
+        self.ids.txns_list.data = [row for row in self.ids.txns_list.data if row["txn_id"] != txn_id]
+        self._watch.mark_current()
 
 class AddTransactionScreen(Screen):
     account_spinner = ObjectProperty(None)
@@ -801,493 +681,140 @@ class AddTransactionScreen(Screen):
         self.ids.date.text = datetime.now().strftime('%Y-%m-%d')
     
     def open_calendar(self, target_input):
-        popup = CalendarPopup(target_input=target_input)
-        popup.open()
+        pick_date(target_input)
 
     def refresh_spinners(self):
         """Update spinner dropdown values"""
-        conn = sqlite3.connect("budgetbee.db")
-
-        c = conn.cursor()
-        c.execute("""
-            SELECT name
-            FROM accounts
-            WHERE is_active = 1
-            ORDER BY owner ASC, name ASC
-        """)
-        accounts = [row[0] for row in c.fetchall()]
-        c.execute("""
-            SELECT name, type
-            FROM categories
-            WHERE name != 'System' AND is_active = 1
-            ORDER BY type desc, name ASC
-        """)
-        categories = [f"{row[0]} - ({row[1]})" for row in c.fetchall()]
-
-        conn.close()
+        conn = get_connection()
+        accounts = ledger.list_account_names(conn, active_only=True)
+        categories = [f"{name} - ({cat_type})" for name, cat_type in ledger.list_category_names(conn)]
 
         # Update spinner values
         self.account_spinner.values = accounts
         self.category_spinner.values = categories
         
     def add_transaction(self, account_name, category_display, amount, date, description):
-        """Add a new transaction and update account balance"""
+        """Add a new transaction (the balance trigger updates its account)"""
         if not account_name or not category_display or not amount:
             return  # simple validation
         
         # Extract category name from display text
         category_name = category_display.split(" -")[0]
 
-        if not date:
-            date = datetime.now().strftime("%Y-%m-%d")
-        
-        if not description:
-            description = "No description"
-
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-
-            # Get account ID and current balance
-            c.execute("SELECT id, balance FROM accounts WHERE name=?", (account_name,))
-            account = c.fetchone()
-            if not account:
-                return
-            account_id, current_balance = account
-
-            # Get category ID and type
-            c.execute("SELECT id, type FROM categories WHERE name=?", (category_name,))
-            category = c.fetchone()
-            if not category:
-                return
-            category_id, category_type = category
-
-            # Adjust amount based on category type 
-            if category_type == "Income":
-                amount = float(amount)
-            elif category_type == "Expense":
-                amount = -float(amount)
-
-            if category_name in ["Transfer To", "Transfer From"]:
-                is_transfer = 1
-            else:
-                is_transfer = 0
-
-            # Insert the transaction
-            c.execute("""
-                INSERT INTO transactions (account_id, category_id, amount, date, description, is_transfer)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (account_id, category_id, float(amount), date, description, is_transfer))
-        
-            # Get the ID of the transaction we just added
-            transaction_id = c.lastrowid
-
-            # Update the account balance based on category type
-            new_balance = current_balance + float(amount)
-            
-            c.execute("UPDATE accounts SET balance = ? WHERE id=?", (new_balance, account_id))
+        try:
+            amount = parse_money(amount)
+        except ValueError:
+            return
 
-            conn.commit()
-        
-        self.link_transaction_to_budgets(transaction_id, date)
+        # Also links it to the budget whose period contains its date
+        try:
+            ledger.add_transaction(get_connection(), account_name, category_name, amount, date, description)
+        except ValueError:
+            return
 
         # Go back to transactions screen
         self.manager.current = "transactions"
 
-    def link_transaction_to_budgets(self, txn_id, txn_date):
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            # Find the most recent budget that started before txn_date
-            c.execute("""
-                SELECT id, start_date, end_date FROM budgets
-                WHERE start_date <= ?
-                ORDER BY start_date DESC
-                LIMIT 1
-            """, (txn_date,))
-            row = c.fetchone()
-            if row:
-                budget_id, start_date, end_date = row
-                # Only link if txn_date <= end_date or end_date is None
-                if end_date is None or txn_date <= end_date:
-                    c.execute("""
-                        INSERT OR IGNORE INTO budget_transactions (budget_id, transaction_id)
-                        VALUES (?, ?)
-                    """, (budget_id, txn_id))
-            conn.commit()
-
 class EditTransactionScreen(Screen):
     def open_calendar(self, target_input):
-        popup = CalendarPopup(target_input=target_input)
-        popup.open()
+        pick_date(target_input)
 
     def load_transaction(self, transaction_id):
         self.transaction_id = transaction_id
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("""
-                SELECT a.name, c.name, t.amount, t.date, t.description
-                FROM transactions t
-                JOIN accounts a ON t.account_id = a.id
-                JOIN categories c ON t.category_id = c.id
-                WHERE t.id=?
-            """, (transaction_id,))
-            row = c.fetchone()
-
-        if row:
-            account_name, category_name, amount, date, description = row
+        conn = get_connection()
+        txn = ledger.get_transaction(conn, transaction_id)
 
+        if txn:
             # Populate account spinner
             self.ids.account_spinner.values = self.get_account_names()
-            self.ids.account_spinner.text = account_name
+            self.ids.account_spinner.text = txn.account
 
             # Populate category spinner, filter out 'System'
-            c.execute("""
-                SELECT name, type
-                FROM categories
-                WHERE name != 'System' AND is_active = 1
-                ORDER BY type desc, name ASC
-            """)
-            rows = c.fetchall()
-
             categories = []
-            for row in rows:
-                name = str(row[0]) if row[0] else "Unnamed"
-                cat_type = str(row[1]) if row[1] else "Unknown"
+            for name, cat_type in ledger.list_category_names(conn):
+                name = str(name) if name else "Unnamed"
+                cat_type = str(cat_type) if cat_type else "Unknown"
                 categories.append(f"{name} - ({cat_type})")
                 
             self.ids.category_spinner.values = categories
-            if category_name:
-                self.ids.category_spinner.text = category_name
+            if txn.category:
+                self.ids.category_spinner.text = txn.category
             else:
                 self.ids.category_spinner.text = "Select Category"
 
-            if amount >= 0:
-                self.ids.amount.text = str(amount)
-            else:
-                self.ids.amount.text = str(amount)[1:]
-            self.ids.date.text = date
-            self.ids.description.text = description
+            self.ids.amount.text = cents_to_text(abs(txn.amount))
+            self.ids.date.text = txn.date
+            self.ids.description.text = txn.description
 
     def get_account_names(self):
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("SELECT name FROM accounts")
-            return [row[0] for row in c.fetchall()]
+        return ledger.list_account_names(get_connection())
         
     def save_transaction(self):
         new_account = self.ids.account_spinner.text
         new_category = self.ids.category_spinner.text.split(" -")[0]
-        new_amount = float(self.ids.amount.text)
+        try:
+            new_amount = parse_money(self.ids.amount.text)
+        except ValueError:
+            return
         new_date = self.ids.date.text
         new_description = self.ids.description.text
 
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-
-            c.execute("SELECT id FROM accounts WHERE name = ?", (new_account,))
-            row = c.fetchone()
-            new_account_id = row[0]
-
-            c.execute("SELECT id, type FROM categories WHERE name = ?", (new_category,))
-            row = c.fetchone()
-            if row:
-                new_category_id = row[0]
-                new_category_name = new_category
-                new_category_type = row[1]
-            else:
-                return
-            
-            if new_category_type == "Expense":
-                new_amount = -new_amount
-
-            if new_category_name in ["Transfer To", "Transfer From"]:
-                is_transfer = 1
-            else:
-                is_transfer = 0
-
-            # Get old transaction
-            c.execute("SELECT account_id, category_id, amount, date, description FROM transactions WHERE id=?", (self.transaction_id,))
-            row = c.fetchone()
-
-            if not row:
-                return
-
-            old_account_id, old_category_id, old_amount, old_date, old_description = row
-
-            # --- Update transaction row ---
-            c.execute("""
-                INSERT INTO transactions
-                (account_id, category_id, amount, date, description, is_transfer)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (new_account_id, new_category_id, new_amount, new_date, new_description, is_transfer))
-
-            c.execute("""
-                DELETE FROM transactions WHERE id=?""",
-                (self.transaction_id,)
-            )
-
-            # --- If account changed, adjust both old and new balances ---
-            if old_account_id != new_account_id:
-                # Subtract from old account
-                c.execute("UPDATE accounts SET balance = balance - ? WHERE id=?", (old_amount, old_account_id))
-                # Add to new account
-                c.execute("UPDATE accounts SET balance = balance + ? WHERE id=?", (new_amount, new_account_id))
-
-            # --- If account is the same, but amount changed ---
-            elif old_amount != new_amount:
-                amount_diff = new_amount - old_amount
-                c.execute("UPDATE accounts SET balance = balance + ? WHERE id=?", (amount_diff, old_account_id))
-
-            conn.commit()
+        if not ledger.update_transaction(get_connection(), self.transaction_id, new_account, new_category,
+                                         new_amount, new_date, new_description):
+            return
 
         # Go back to transactions screen
         transactions_screen = self.manager.get_screen("transactions")
         transactions_screen.transaction_id = self.transaction_id
         self.manager.current = "transactions"
 
-class BudgetManager:
-    def __init__(self, db_name=DB_NAME):
-        self.db_name = db_name
-
-    # -----------------------------
-    # Budget Creation
-    # -----------------------------
-    def create_budget(self, name, start_date, end_date=None):
-        """Create a new budget and return its ID"""
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("""
-                INSERT INTO budgets (name, start_date, end_date)
-                VALUES (?, ?, ?)
-            """, (name, start_date, end_date))
-            conn.commit()
-            return c.lastrowid
-
-    # -----------------------------
-    # Allocated Categories
-    # -----------------------------
-    def add_budgeted_category(self, category_name, amount):
-        if not category_name or not amount:
-            return
-
-        try:
-            amount = float(amount)
-        except ValueError:
-            return
-
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            # Get category ID
-            c.execute("SELECT id FROM categories WHERE name=?", (category_name,))
-            row = c.fetchone()
-            if not row:
-                return
-            category_id = row[0]
-
-            # Check if allocation exists
-            c.execute("""
-                SELECT id FROM budgeted_categories
-                WHERE budget_id=? AND category_id=?
-            """, (self.budget_id, category_id))
-            existing = c.fetchone()
-
-            if existing:
-                # Update existing allocation
-                c.execute("""
-                    UPDATE budgeted_categories
-                    SET allocated_amount=allocated_amount + ?
-                    WHERE id=?
-                """, (amount, existing[0]))
-            else:
-                # Insert new
-                c.execute("""
-                    INSERT INTO budgeted_categories (budget_id, category_id, allocated_amount)
-                    VALUES (?, ?, ?)
-                """, (self.budget_id, category_id, amount))
-            conn.commit()
-
-        self.load_allocated_categories()
-        self.update_summary_labels()
-
-    def get_allocated_categories(self, budget_id):
-        """Return list of tuples (id, category_name, amount)"""
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("""
-                SELECT bc.id, c.name, bc.allocated_amount
-                FROM budgeted_categories bc
-                JOIN categories c ON bc.category_id = c.id
-                WHERE bc.budget_id=?
-            """, (budget_id,))
-            return c.fetchall()
-
-    # -----------------------------
-    # Projected Transactions
-    # -----------------------------
-    def add_projected_transaction(self, category_name, amount, description, date):
-        if not category_name or not amount:
-            return
-
-        try:
-            amount = float(amount)
-        except ValueError:
-            return
-
-        if not description:
-            description = "No Description"
-
-        if not date:
-            date = datetime.now().strftime("%Y-%m-%d")
-
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            # Get category ID
-            c.execute("SELECT id FROM categories WHERE name=?", (category_name,))
-            row = c.fetchone()
-            if not row:
-                return
-            category_id = row[0]
-
-            # Insert projected transaction
-            c.execute("""
-                INSERT INTO transactions (category_id, amount, description, date, projected)
-                VALUES (?, ?, ?, ?, 1)
-            """, (category_id, amount, description, date))
-            txn_id = c.lastrowid
-
-            # Link to budget
-            c.execute("INSERT INTO budget_transactions (budget_id, transaction_id) VALUES (?, ?)",
-                    (self.budget_id, txn_id))
-            conn.commit()
-
-        self.load_projected_transactions()
-        self.update_summary_labels()
-
-    def get_projected_transactions(self, budget_id):
-        """Return list of projected transactions for a budget"""
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("""
-                SELECT t.id, a.name, c.name, t.amount, t.date
-                FROM transactions t
-                JOIN accounts a ON t.account_id = a.id
-                JOIN categories c ON t.category_id = c.id
-                JOIN budget_transactions bt ON t.id = bt.transaction_id
-                WHERE bt.budget_id=? AND t.projected=1
-            """, (budget_id,))
-            return c.fetchall()
-
-    # -----------------------------
-    # Budget Summary
-    # -----------------------------
-    def get_budget_summary(self, budget_id):
-        """Return a dict with totals: allocated, spent, projected, remaining"""
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-
-            # Total allocated
-            c.execute("SELECT SUM(allocated_amount) FROM budgeted_categories WHERE budget_id=?", (budget_id,))
-            allocated = c.fetchone()[0] or 0
-
-            # Get budget start & end
-            c.execute("SELECT start_date, end_date FROM budgets WHERE id=?", (budget_id,))
-            row = c.fetchone()
-            if not row:
-                # no such budget
-                return {
-                    "allocated": 0,
-                    "spent": 0,
-                    "projected": 0,
-                    "remaining": 0
-                }
-
-            start_date, end_date = row
-
-            # Total spent (transactions with amount < 0 in date range)
-            if end_date:
-                c.execute("""
-                    SELECT SUM(amount) 
-                    FROM transactions
-                    WHERE projected=0 AND amount<0
-                    AND date BETWEEN ? AND ?
-                    AND is_transfer = 0
-                """, (start_date, end_date))
-            else:
-                c.execute("""
-                    SELECT SUM(amount) 
-                    FROM transactions
-                    WHERE projected=0 AND amount<0
-                    AND date >= ?
-                    AND is_transfer = 0
-                """, (start_date,))
-            
-            spent = c.fetchone()[0] or 0
-            spent = -spent  # flip to positive
-
-            # Total projected (only pending, linked transactions)
-            c.execute("""
-                SELECT SUM(t.amount) 
-                FROM transactions t
-                JOIN budget_transactions bt ON t.id = bt.transaction_id
-                WHERE bt.budget_id=? AND t.projected=1 AND t.status='Pending'
-            """, (budget_id,))
-            projected = c.fetchone()[0] or 0
-
-        remaining = allocated - spent - projected
-        return {
-            "allocated": allocated,
-            "spent": spent,
-            "projected": projected,
-            "remaining": remaining
-        }
-
 # -----------------------------
 # Budget Screens
 # -----------------------------
+def fetch_budgets():
+    """BudgetSummary rows for all budgets, newest first (runs on the DB worker)"""
+    return ledger.list_budget_summaries(get_connection())
+
 class BudgetsScreen(Screen):
     budgets = ListProperty([])
+    _task = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._watch = DataWatcher("budgets", "budgeted_categories", "budget_transactions", "transactions")
+        self._rows = RowPool(self.ids.budgets_list, [
+            ("View", 80, self.view_budget),
+            ("X", 40, self.delete_budget),
+        ], self.render_budget, key=lambda b: b.budget_id)
 
     def on_pre_enter(self):
-        """Load all budgets from DB"""
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("SELECT id, name, start_date, end_date FROM budgets ORDER BY start_date DESC")
-            self.budgets = c.fetchall()
+        """Load all budgets with their totals in the background"""
+        if not self._watch.changed():
+            return  # Totals unchanged since the last visit
+        self._rows.loading()
+        self._task = replace_task(self._task, run_in_background(
+            fetch_budgets, on_result=self.show_budgets, on_error=load_failed(self._watch, self._rows)
+        ))
+
+    @profiled
+    def show_budgets(self, budgets):
+        self.budgets = budgets
 
         # Update UI list
-        self.ids.budgets_list.clear_widgets()
-        for b in self.budgets:
-            box = BoxLayout(orientation="horizontal", size_hint_y=None, height=40)
-            label = Label(
-                text=f"{b[1]} | {b[2]} - {b[3] or 'Current'}",
-                halign="center",
-                valign="middle"
-            )
-            label.bind(size=label.setter("text_size"))
-
-            view_btn = Button(text="View", size_hint_x=None, width=80)
-            view_btn.bind(on_release=lambda btn, budget_id=b[0]: self.view_budget(budget_id))
-            delete_btn = Button(text="X", size_hint_x=None, width=40)
-            delete_btn.bind(on_release=lambda btn, bid=b[0]: self.delete_budget(bid))
-
-            box.add_widget(label)
-            box.add_widget(view_btn)
-            box.add_widget(delete_btn)
-            self.ids.budgets_list.add_widget(box)
-
-        self.ids.budgets_list.bind(minimum_height=self.ids.budgets_list.setter('height'))
+        self._rows.show(self.budgets)
+
+    def render_budget(self, row, b):
+        row.label.text = (f"{b.name} | {b.start_date} - {b.end_date or 'Current'} | "
+                          f"Spent {format_money(b.spent)} of {format_money(b.allocated)}, "
+                          f"{format_money(b.remaining)} left")
 
     def view_budget(self, budget_id):
         self.manager.current = "budget_summary"
         self.manager.get_screen("budget_summary").load_budget(budget_id)
 
     def delete_budget(self, budget_id):
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("DELETE FROM budgets WHERE id=?", (budget_id,))
-
-            # Recalculate  budget ranges and refresh the budgets list
-            recalc_budget_ranges(conn)
-            self.on_pre_enter()
+        ledger.delete_budget(get_connection(), budget_id)
+        self.on_pre_enter()
 
 class AddBudgetScreen(Screen):
     def on_pre_enter(self):
@@ -1295,157 +822,47 @@ class AddBudgetScreen(Screen):
         self.ids.budget_name.text = ""
     
     def open_calendar(self, target_input):
-        popup = CalendarPopup(target_input=target_input)
-        popup.open()
+        pick_date(target_input)
 
     def add_budget(self, name, start_date):
-        if not start_date:
-            start_date = datetime.now().strftime("%Y-%m-%d")
-
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-
-            # Step 1: Insert the new budget
-            c.execute("""
-                INSERT INTO budgets (name, start_date)
-                VALUES (?, ?)
-            """, (name, start_date))
-            new_id = c.lastrowid
-
-            # Step 2: Find overlapping budgets
-            c.execute("""
-                SELECT id, start_date, end_date FROM budgets
-                WHERE id != ?
-            """, (new_id,))
-            overlaps = c.fetchall()
-
-            for bid, s, e in overlaps:
-                s = datetime.strptime(s, "%Y-%m-%d")
-                e = datetime.strptime(e, "%Y-%m-%d") if e else None
-
-                # Case A: existing budget starts before new and ends after new starts → cut it
-                if s <= start and (e is None or e >= start):
-                    new_end = start - timedelta(days=1)
-                    c.execute("UPDATE budgets SET end_date=? WHERE id=?", (new_end.strftime("%Y-%m-%d"), bid))
-
-                # Case B: existing budget starts after new budget → cut new one
-                if s >= start:
-                    new_end = s - timedelta(days=1)
-                    c.execute("UPDATE budgets SET end_date=? WHERE id=?", (new_end.strftime("%Y-%m-%d"), new_id))
-
-            conn.commit()
-
-            self.link_existing_transactions_to_budget(new_id)
-
-            # Now navigate to the summary screen
-            self.manager.current = "budget_summary"
-            self.manager.get_screen("budget_summary").load_budget(new_id)
-
-    def link_existing_transactions_to_budget(self, budget_id):
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("SELECT start_date, end_date FROM budgets WHERE id=?", (budget_id,))
-            start_date, end_date = c.fetchone()
-
-            if end_date:
-                c.execute("""
-                    SELECT id FROM transactions
-                    WHERE date BETWEEN ? AND ? 
-                """, (start_date, end_date))
-            else:
-                c.execute("""
-                    SELECT id FROM transactions
-                    WHERE date >= ?
-                """, (start_date,))
-            
-            txn_ids = [row[0] for row in c.fetchall()]
-
-            # Insert links
-            for txn_id in txn_ids:
-                c.execute("""
-                    INSERT OR IGNORE INTO budget_transactions (budget_id, transaction_id)
-                    VALUES (?, ?)
-                """, (budget_id, txn_id))
-
-            conn.commit()
+        # Fits every budget's end date around the new one and links its transactions
+        new_id = ledger.add_budget(get_connection(), name, start_date)
+
+        # Now navigate to the summary screen
+        self.manager.current = "budget_summary"
+        self.manager.get_screen("budget_summary").load_budget(new_id)
 
 class BudgetSummaryScreen(Screen):
     budget_id = None
+    _summary_task = None
     allocated_categories = ListProperty([])
     projected_transactions = ListProperty([])
 
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._allocation_rows = RowPool(self.ids.allocated_list, [
+            ("X", 40, self.delete_allocated_category),
+        ], self.render_allocation)
+        self._projected_rows = RowPool(self.ids.projected_list, [
+            ("Completed", 100, lambda txn_id: self.update_projected_status(txn_id, "completed")),
+            ("Skipped", 100, lambda txn_id: self.update_projected_status(txn_id, "skipped")),
+            ("X", 40, self.delete_projected_transaction),
+        ], self.render_projected)
+
     def on_pre_enter(self):
-        # Clear old widgets
-        self.ids.allocated_list.clear_widgets()
-        self.ids.projected_list.clear_widgets()
-
-        budget_manager = BudgetManager()
-        budget_manager.get_budget_summary(self.budget_id)
-
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-
-            # Allocated categories
-            c.execute("""
-                SELECT bc.id, cat.name, bc.allocated_amount
-                FROM budgeted_categories bc
-                JOIN categories cat ON bc.category_id = cat.id
-                WHERE bc.budget_id=?
-            """, (self.budget_id,))
-            allocated = c.fetchall()
-
-            for ac in allocated:
-                row = BoxLayout(orientation="horizontal", size_hint_y=None, height=40)
-                row.add_widget(Label(
-                    text=f"{ac[1]} - Allocated: ${ac[2]:.2f}",
-                    halign="center", valign="middle"
-                ))
-                self.ids.allocated_list.add_widget(row)
-
-            # Projected transactions (transactions table with projected=1)
-            c.execute("""
-                SELECT t.id, cat.name, t.description, t.amount, t.status
-                FROM transactions t
-                JOIN categories cat ON t.category_id = cat.id
-                JOIN budget_transactions bt ON t.id = bt.transaction_id
-                WHERE bt.budget_id=? AND t.projected=1
-            """, (self.budget_id,))
-            projected = c.fetchall()
-
-            for proj in projected:
-                proj_id, cat_name, desc, amt, status = proj
-                row = BoxLayout(orientation="horizontal", size_hint_y=None, height=40)
-
-                row.add_widget(Label(text=f"{desc} (${amt:.2f})", size_hint_x=0.5))
-
-                completed_btn = Button(text="Completed", size_hint_x=0.2)
-                completed_btn.bind(on_release=lambda btn, pid=proj_id: self.update_projected_status(pid, "Completed"))
-                row.add_widget(completed_btn)
-
-                skipped_btn = Button(text="Skipped", size_hint_x=0.2)
-                skipped_btn.bind(on_release=lambda btn, pid=proj_id: self.update_projected_status(pid, "Skipped"))
-                row.add_widget(skipped_btn)
-
-                delete_btn = Button(text="X", size_hint_x=0.1, width=40)
-                delete_btn.bind(on_release=lambda btn, pid=proj_id: self.delete_projected_transaction(pid))
-                row.add_widget(delete_btn)
-
-                self.ids.projected_list.add_widget(row)
+        if self.budget_id is None:
+            return
+        self.load_allocated_categories()
+        self.load_projected_transactions()
 
     def open_calendar(self, target_input):
-        popup = CalendarPopup(target_input=target_input)
-        popup.open()
+        pick_date(target_input)
 
     def load_budget(self, budget_id):
         self.budget_id = budget_id
+        conn = get_connection()
 
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("SELECT name, start_date, end_date FROM budgets WHERE id=?", (budget_id,))
-            row = c.fetchone()
-
+        row = ledger.get_budget(conn, budget_id)
         if row:
             name, start_date, end_date = row
             end = end_date if end_date else "Current"
@@ -1456,147 +873,44 @@ class BudgetSummaryScreen(Screen):
         self.update_summary_labels()
 
         # Populate spinners
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("""
-                SELECT name
-                FROM categories
-                WHERE type = 'Income' AND name != 'System' AND is_active=1
-                ORDER BY type desc, name ASC
-            """)
-            self.ids.alloc_category_spinner.values = [row[0] for row in c.fetchall()]
-
-            c.execute("""
-                SELECT name
-                FROM categories
-                WHERE type = 'Expense' AND name != 'System' AND is_active=1
-                ORDER BY type DESC, name ASC""")
-            self.ids.proj_category_spinner.values = [row[0] for row in c.fetchall()]
+        self.ids.alloc_category_spinner.values = [name for name, _ in ledger.list_category_names(conn, "Income")]
+        self.ids.proj_category_spinner.values = [name for name, _ in ledger.list_category_names(conn, "Expense")]
 
+    @profiled
     def load_allocated_categories(self):
         """Load budgeted categories"""
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("""
-                SELECT bc.id, c.name, bc.allocated_amount, bc.alloc_desc
-                FROM budgeted_categories bc
-                JOIN categories c ON bc.category_id = c.id
-                WHERE bc.budget_id=?
-            """, (self.budget_id,))
-            self.allocated_categories = c.fetchall()
-
-        self.ids.allocated_list.clear_widgets()
-        for bc in self.allocated_categories:
-            box = BoxLayout(orientation="horizontal", size_hint_y=None, height=40)
-            label = Label(text=f"{bc[1]} | ${bc[2]:.2f} | {bc[3]}", halign="center", valign="middle")
-            label.bind(size=label.setter("text_size"))
-
-            delete_btn = Button(text="X", size_hint_x=None, width=40)
-            delete_btn.bind(on_release=lambda btn, bc_id=bc[0]: self.delete_allocated_category(bc_id))
-
-            box.add_widget(label)
-            box.add_widget(delete_btn)
-            self.ids.allocated_list.add_widget(box)
-
-        self.ids.allocated_list.bind(minimum_height=self.ids.allocated_list.setter('height'))
+        self.allocated_categories = ledger.list_allocations(get_connection(), self.budget_id)
+        self._allocation_rows.show(self.allocated_categories)
 
+    @profiled
     def load_projected_transactions(self):
         """Load projected transactions for this budget"""
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("""
-                SELECT t.id, c.name, t.amount, t.description, t.date, t.status
-                FROM transactions t
-                JOIN categories c ON t.category_id = c.id
-                JOIN budget_transactions bt ON t.id = bt.transaction_id
-                WHERE bt.budget_id=? AND t.projected=1
-                ORDER BY date ASC
-            """, (self.budget_id,))
-            self.projected_transactions = c.fetchall()
-
-        self.ids.projected_list.clear_widgets()
-        for txn in self.projected_transactions:
-            box = BoxLayout(orientation="horizontal", size_hint_y=None, height=40)
-
-            # Transaction label
-            label = Label(
-                text=f"{txn[1]} | ${txn[2]:.2f} | {txn[3]} | {txn[4]}",
-                halign="center",
-                valign="middle"
-            )
-            label.bind(size=label.setter("text_size"))
-
-            # Completed button
-            complete_btn = Button(
-                text="Completed",
-                size_hint_x=None,
-                width=100,
-                height=40,
-                font_size=14
-            )
-            complete_btn.bind(on_release=lambda btn, txn_id=txn[0]: self.update_projected_status(txn_id, 'completed'))
-
-            # Skipped button
-            skip_btn = Button(
-                text="Skipped",
-                size_hint_x=None,
-                width=100,
-                height=40,
-                font_size=14
-            )
-            skip_btn.bind(on_release=lambda btn, txn_id=txn[0]: self.update_projected_status(txn_id, 'skipped'))
-
-            # Delete button
-            delete_btn = Button(
-                text="X",
-                size_hint_x=None,
-                width=40,
-                height=40,
-                font_size=16
-            )
-            delete_btn.bind(on_release=lambda btn, txn_id=txn[0]: self.delete_projected_transaction(txn_id))
-
-            # Disable buttons if already completed/skipped
-            if txn[5] in ['completed', 'skipped']:
-                complete_btn.disabled = True
-                skip_btn.disabled = True
-                complete_btn.background_color = (0.7, 0.7, 0.7, 1)
-                skip_btn.background_color = (0.7, 0.7, 0.7, 1)
-                
-            box.add_widget(label)
-            box.add_widget(complete_btn)
-            box.add_widget(skip_btn)
-            box.add_widget(delete_btn)
+        self.projected_transactions = ledger.list_projected_transactions(get_connection(), self.budget_id)
+        self._projected_rows.show(self.projected_transactions)
+
+    def render_allocation(self, row, bc):
+        row.label.text = f"{bc[1]} | {format_money(bc[2])} | {bc[3]}"
 
-            self.ids.projected_list.add_widget(box)
+    def render_projected(self, row, txn):
+        row.label.text = f"{txn[1]} | {format_money(txn[2])} | {txn[3]} | {txn[4]}"
 
-        self.ids.projected_list.bind(minimum_height=self.ids.projected_list.setter('height'))
+        # Disable the status buttons once completed/skipped
+        done = txn[5] in ledger.PROJECTED_STATUSES
+        for btn in row.buttons[:2]:
+            btn.disabled = done
+            btn.background_color = (0.7, 0.7, 0.7, 1) if done else (1, 1, 1, 1)
 
     def add_budgeted_category(self, category_name, amount, desc):
         if not category_name or not amount:
             return
 
         try:
-            amount = float(amount)
+            amount = parse_money(amount)
         except ValueError:
             return
         
-        if not desc:
-            desc = "No Description"
-
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("SELECT id FROM categories WHERE name=?", (category_name,))
-            row = c.fetchone()
-            if not row:
-                return
-            category_id = row[0]
-
-            c.execute("""
-                INSERT INTO budgeted_categories (budget_id, category_id, allocated_amount, alloc_desc)
-                VALUES (?, ?, ?, ?)
-            """, (self.budget_id, category_id, amount, desc))
-            conn.commit()
+        if ledger.add_allocation(get_connection(), self.budget_id, category_name, amount, desc) is None:
+            return
 
         self.ids.alloc_category_spinner.text = "Select Category"
         self.ids.alloc_amount.text = ""
@@ -1609,35 +923,13 @@ class BudgetSummaryScreen(Screen):
             return
 
         try:
-            amount = float(amount)
+            amount = parse_money(amount)
         except ValueError:
             return
         
-        if not description:
-            description = "No Description"
-
-        if not date:
-            date = datetime.now().strftime("%Y-%m-%d")
-
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            # Get category ID
-            c.execute("SELECT id FROM categories WHERE name=?", (category_name,))
-            row = c.fetchone()
-            if not row:
-                return
-            category_id = row[0]
-
-            # Insert projected transaction
-            c.execute("""
-                INSERT INTO transactions (category_id, amount, description, date, projected, status)
-                VALUES (?, ?, ?, ?, 1, 'Pending')
-            """, (category_id, amount, description, date))
-            txn_id = c.lastrowid
-
-            c.execute("INSERT INTO budget_transactions (budget_id, transaction_id) VALUES (?, ?)",
-                      (self.budget_id, txn_id))
-            conn.commit()
+        if ledger.add_projected_transaction(get_connection(), self.budget_id, category_name, amount,
+                                            description, date) is None:
+            return
 
         self.ids.proj_category_spinner.text = "Select Category"
         self.ids.proj_amount.text = ""
@@ -1646,25 +938,11 @@ class BudgetSummaryScreen(Screen):
         self.load_projected_transactions()
         self.update_summary_labels()
 
-    def update_spent(self):
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("""
-                
-            """)
-
     def update_projected_status(self, txn_id, new_status):
         """Mark a projected transaction as completed or skipped"""
-        if new_status not in ['completed', 'skipped']:
+        if not ledger.set_projected_status(get_connection(), txn_id, new_status):
             return
 
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("UPDATE transactions SET status=? WHERE id=?", (new_status, txn_id))
-            conn.commit()
-        
-        self.on_pre_enter()
-
         # Reload list and summary
         self.load_projected_transactions()
         self.update_summary_labels()
@@ -1672,96 +950,102 @@ class BudgetSummaryScreen(Screen):
     def edit_budget(self):
         budget_id = self.budget_id
 
-        with sqlite3.connect(DB_NAME) as conn:
-            # Get current values
-            c = conn.cursor()
-            c.execute("SELECT name, start_date FROM budgets WHERE id=?", (budget_id,))
-            name, start_date = c.fetchone()
+        # Get current values
+        name, start_date, _ = ledger.get_budget(get_connection(), budget_id)
 
-            layout = BoxLayout(orientation="vertical", spacing=10, padding=10)
-
-            name_input = TextInput(text=name, multiline=False)
+        layout = BoxLayout(orientation="vertical", spacing=10, padding=10)
 
-            # Wrap start_input and "Pick Date" button together
-            start_row = BoxLayout(orientation="horizontal", spacing=5, size_hint_y=None, height=40)
-            start_input = TextInput(text=start_date, multiline=False, readonly=True)
-            pick_date_btn = Button(text="Pick Date", size_hint_x=None, width=100)
-            pick_date_btn.bind(on_release=lambda instance: self.open_calendar(start_input))
-            start_row.add_widget(start_input)
-            start_row.add_widget(pick_date_btn)
+        name_input = TextInput(text=name, multiline=False)
 
-            save_btn = Button(text="Save", size_hint_y=None, height=40)
+        # Wrap start_input and "Pick Date" button together
+        start_row = BoxLayout(orientation="horizontal", spacing=5, size_hint_y=None, height=40)
+        start_input = TextInput(text=start_date, multiline=False, readonly=True)
+        pick_date_btn = Button(text="Pick Date", size_hint_x=None, width=100)
+        pick_date_btn.bind(on_release=lambda instance: self.open_calendar(start_input))
+        start_row.add_widget(start_input)
+        start_row.add_widget(pick_date_btn)
 
-            def save_changes(instance):
-                new_name = name_input.text.strip()
-                new_start = start_input.text.strip()
+        save_btn = Button(text="Save", size_hint_y=None, height=40)
 
-                # Update the budget
-                c.execute("UPDATE budgets SET name=?, start_date=? WHERE id=?",
-                            (new_name, new_start, budget_id))
-                conn.commit()
+        def save_changes(instance):
+            new_name = name_input.text.strip()
+            new_start = start_input.text.strip()
 
-                # --- Recalculate all budget ranges ---
-                recalc_budget_ranges(conn)
+            # Update the budget and recalculate all budget ranges
+            ledger.update_budget(get_connection(), budget_id, new_name, new_start)
 
-                popup.dismiss()
-                self.load_budget(budget_id)  # refresh header + data
+            popup.dismiss()
+            self.load_budget(budget_id)  # refresh header + data
 
-            save_btn.bind(on_release=save_changes)
+        save_btn.bind(on_release=save_changes)
 
-            layout.add_widget(Label(text="Name:"))
-            layout.add_widget(name_input)
-            layout.add_widget(Label(text="Start Date (yyyy-mm-dd):"))
-            layout.add_widget(start_row)   # instead of adding start_input directly
-            layout.add_widget(save_btn)
+        layout.add_widget(Label(text="Name:"))
+        layout.add_widget(name_input)
+        layout.add_widget(Label(text="Start Date (yyyy-mm-dd):"))
+        layout.add_widget(start_row)   # instead of adding start_input directly
+        layout.add_widget(save_btn)
 
-            popup = Popup(title="Edit Budget", content=layout,
-                        size_hint=(0.8, 0.6), auto_dismiss=True)
-            popup.open()
+        popup = Popup(title="Edit Budget", content=layout,
+                    size_hint=(0.8, 0.6), auto_dismiss=True)
+        popup.open()
 
     def delete_allocated_category(self, bc_id):
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("DELETE FROM budgeted_categories WHERE id=?", (bc_id,))
-            conn.commit()
+        ledger.delete_allocation(get_connection(), bc_id)
         self.load_allocated_categories()
         self.update_summary_labels()
         
     def delete_projected_transaction(self, txn_id):
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-            c.execute("DELETE FROM transactions WHERE id=?", (txn_id,))
-            c.execute("DELETE FROM budget_transactions WHERE transaction_id=?", (txn_id,))
-            conn.commit()
+        ledger.delete_transaction(get_connection(), txn_id)
         self.load_projected_transactions()
         self.update_summary_labels()
 
     def update_summary_labels(self):
-        """Calculate totals for display"""
-        manager = BudgetManager()
-        summary = manager.get_budget_summary(self.budget_id)
-
-        self.ids.allocated_label.text = ""
-        self.ids.projected_label.text = ""
-        self.ids.spent_label.text = ""
-        self.ids.remaining_label.text = ""
-
+        """Calculate totals for display in the background"""
+        self.ids.allocated_label.text = "Allocated: ..."
+        self.ids.projected_label.text = "Projected: ..."
+        self.ids.spent_label.text = "Spent: ..."
+        self.ids.remaining_label.text = "Remaining: ..."
+
+        manager = ledger.BudgetManager()
+        self._summary_task = replace_task(
+            self._summary_task,
+            run_in_background(manager.get_budget_summary, self.budget_id,
+                              on_result=self.show_summary, on_error=self.summary_failed)
+        )
+
+    def summary_failed(self, _error):
+        for label, name in ((self.ids.allocated_label, "Allocated"), (self.ids.projected_label, "Projected"),
+                            (self.ids.spent_label, "Spent"), (self.ids.remaining_label, "Remaining")):
+            label.text = f"{name}: unavailable"
+
+    def show_summary(self, summary):
         # Update with new values
-        self.ids.allocated_label.text = f"Allocated: ${summary['allocated']:.2f}"
-        self.ids.projected_label.text = f"Projected: ${summary['projected']:.2f}"
-        self.ids.spent_label.text = f"Spent: ${summary['spent']:.2f}"
-        self.ids.remaining_label.text = f"Remaining: ${summary['remaining']:.2f}"
+        self.ids.allocated_label.text = f"Allocated: {format_money(summary.allocated)}"
+        self.ids.projected_label.text = f"Projected: {format_money(summary.projected)}"
+        self.ids.spent_label.text = f"Spent: {format_money(summary.spent)}"
+        self.ids.remaining_label.text = f"Remaining: {format_money(summary.remaining)}"
 
 class VisualizationsScreen(Screen):
     pass
 
+def fetch_expense_distribution(start_date, end_date):
+    """Projected and actual expense totals per category for the pie charts (runs on the DB worker)"""
+    excluded = ("System", "Transfer To", "Transfer From")
+    conn = get_connection()
+    budget_data = category_totals(conn, start_date, end_date, projected=1, exclude_categories=excluded)
+    actual_data = category_totals(conn, start_date, end_date, projected=0, exclude_categories=excluded)
+    return budget_data, actual_data
+
 class ExpenseDistributionScreen(Screen):
     start_date = StringProperty("")
     end_date = StringProperty("")
+    _task = None
+    _built = False
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.build_ui()
+    def on_pre_enter(self):
+        if not self._built:     # Build the widget tree on the first visit only
+            self.build_ui()
+            self._built = True
 
     def build_ui(self):
         layout = BoxLayout(orientation="vertical", spacing=10, padding=10)
@@ -1772,10 +1056,10 @@ class ExpenseDistributionScreen(Screen):
         self.end_input = TextInput(text=self.end_date, hint_text="YYYY-MM-DD", multiline=False)
 
         start_cal_btn = Button(text="Pick Date")
-        start_cal_btn.bind(on_release=lambda x: CalendarPopup(self.start_input).open())
+        start_cal_btn.bind(on_release=lambda x: pick_date(self.start_input))
 
         end_cal_btn = Button(text="Pick Date")
-        end_cal_btn.bind(on_release=lambda x: CalendarPopup(self.end_input).open())
+        end_cal_btn.bind(on_release=lambda x: pick_date(self.end_input))
 
         date_layout.add_widget(Label(text="From:"))
         date_layout.add_widget(self.start_input)
@@ -1786,6 +1070,10 @@ class ExpenseDistributionScreen(Screen):
 
         # --- Charts area ---
         self.chart_layout = BoxLayout(spacing=10)
+        self.budget_chart = PieChart(title="Allocated Budget", empty_text="No Budget Data")
+        self.actual_chart = PieChart(title="Actual Spending", empty_text="No Actual Data")
+        self.chart_layout.add_widget(self.budget_chart)
+        self.chart_layout.add_widget(self.actual_chart)
         layout.add_widget(date_layout)
         layout.add_widget(self.chart_layout)
 
@@ -1803,88 +1091,40 @@ class ExpenseDistributionScreen(Screen):
 
     def update_charts(self):
         """Draw side-by-side pie charts from real DB data."""
-        self.chart_layout.clear_widgets()
         start_input = self.start_input.text
         end_input = self.end_input.text
 
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-
-            # --- Allocated budgets per category ---
-            c.execute("""
-                SELECT c.name, SUM(t.amount)
-                FROM transactions t
-                JOIN categories c ON t.category_id = c.id
-                WHERE t.date BETWEEN ? AND ?
-                AND c.type = 'Expense'   -- 👈 Only expenses
-                AND c.name != 'System'
-                AND c.name != 'Transfer To'
-                AND c.name != 'Transfer From'
-                AND t.projected = 1
-                GROUP BY c.name
-            """, (start_input, end_input))
-            budget_data = c.fetchall()
-
-            # --- Actual spending per category ---
-            c.execute("""
-                SELECT c.name, SUM(t.amount)
-                FROM transactions t
-                JOIN categories c ON t.category_id = c.id
-                WHERE t.projected = 0
-                AND t.date BETWEEN ? AND ?
-                AND c.type = 'Expense'   -- 👈 Only expenses
-                AND c.name != 'System'
-                AND c.name != 'Transfer To'
-                AND c.name != 'Transfer From'
-                AND t.projected = 0
-                GROUP BY c.name
-            """, (start_input, end_input))
-            actual_data = c.fetchall()
-
-        # --- Split results into labels + values ---
-        categories_proj = [row[0] for row in budget_data]
-        projected = [row[1] for row in budget_data]
-
-        categories_actual = [row[0] for row in actual_data]
-        actual = [abs(row[1]) for row in actual_data]  # ensure positive values
-
-
-        # --- Build pie charts ---
-        fig, axs = plt.subplots(1, 2, figsize=(8, 4))
-
-        if projected:
-            axs[0].pie(projected, labels=categories_proj, autopct='%1.1f%%', startangle=90)
-            axs[0].set_title("Allocated Budget")
-        else:
-            axs[0].set_title("No Budget Data")
-
-        if actual:
-            axs[1].pie(actual, labels=categories_actual, autopct='%1.1f%%', startangle=90)
-            axs[1].set_title("Actual Spending")
-        else:
-            axs[1].set_title("No Actual Data")
+        self._task = replace_task(
+            self._task,
+            run_in_background(fetch_expense_distribution, start_input, end_input, on_result=self.draw_charts)
+        )
 
-        plt.tight_layout()
-
-        # --- Convert matplotlib figure to Kivy Image ---
-        buf = io.BytesIO()
-        fig.savefig(buf, format="png")
-        buf.seek(0)
-        plt.close(fig)
-
-        img = CoreImage(buf, ext="png")
-        self.chart_layout.add_widget(Image(texture=img.texture))
+    def draw_charts(self, data):
+        """Move both pies to the new totals"""
+        budget_data, actual_data = data
+        self.budget_chart.set_data(series(budget_data))
+        self.actual_chart.set_data(series(actual_data, absolute=True))
 
     def go_back(self, instance):
         self.manager.current = "dashboard"
 
+def fetch_budget_vs_spending(start_date, end_date):
+    """Projected and actual non-transfer expense totals per category for the bar chart (runs on the DB worker)"""
+    conn = get_connection()
+    proj_data = category_totals(conn, start_date, end_date, projected=1, include_transfers=False)
+    actual_data = category_totals(conn, start_date, end_date, projected=0, include_transfers=False)
+    return proj_data, actual_data
+
 class BudgetVsSpendingScreen(Screen):
     start_date = StringProperty("")
     end_date = StringProperty("")
+    _task = None
+    _built = False
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.build_ui()
+    def on_pre_enter(self):
+        if not self._built:     # Build the widget tree on the first visit only
+            self.build_ui()
+            self._built = True
 
     def build_ui(self):
         layout = BoxLayout(orientation="vertical", spacing=10, padding=10)
@@ -1895,10 +1135,10 @@ class BudgetVsSpendingScreen(Screen):
         self.end_input = TextInput(text=self.end_date, hint_text="YYYY-MM-DD", multiline=False)
 
         start_cal_btn = Button(text="Pick Date")
-        start_cal_btn.bind(on_release=lambda x: CalendarPopup(self.start_input).open())
+        start_cal_btn.bind(on_release=lambda x: pick_date(self.start_input))
 
         end_cal_btn = Button(text="Pick Date")
-        end_cal_btn.bind(on_release=lambda x: CalendarPopup(self.end_input).open())
+        end_cal_btn.bind(on_release=lambda x: pick_date(self.end_input))
 
         date_layout.add_widget(Label(text="From:"))
         date_layout.add_widget(self.start_input)
@@ -1909,6 +1149,8 @@ class BudgetVsSpendingScreen(Screen):
 
         # --- Chart area ---
         self.chart_layout = BoxLayout(spacing=10)
+        self.chart = BarChart(title="Budget vs. Spending", series_names=["Projected", "Actual"])
+        self.chart_layout.add_widget(self.chart)
         layout.add_widget(date_layout)
         layout.add_widget(self.chart_layout)
 
@@ -1926,75 +1168,21 @@ class BudgetVsSpendingScreen(Screen):
 
     def update_chart(self):
         """Draw a bar chart comparing projected vs actual spending by category + totals."""
-        self.chart_layout.clear_widgets()
         start_input = self.start_input.text
         end_input = self.end_input.text
 
-        with sqlite3.connect(DB_NAME) as conn:
-            c = conn.cursor()
-
-            # --- Projected (budgeted) spending ---
-            c.execute("""
-                SELECT c.name, SUM(t.amount)
-                FROM transactions t
-                JOIN categories c ON t.category_id = c.id
-                WHERE t.date BETWEEN ? AND ?
-                AND c.type = 'Expense'
-                AND c.name != 'System'
-                AND t.projected = 1
-                AND t.is_transfer = 0
-                GROUP BY c.name
-            """, (start_input, end_input))
-            proj_data = c.fetchall()
-
-            # --- Actual spending ---
-            c.execute("""
-                SELECT c.name, SUM(t.amount)
-                FROM transactions t
-                JOIN categories c ON t.category_id = c.id
-                WHERE t.date BETWEEN ? AND ?
-                AND c.type = 'Expense'
-                AND c.name != 'System'
-                AND t.projected = 0
-                AND t.is_transfer = 0
-                GROUP BY c.name
-            """, (start_input, end_input))
-            actual_data = c.fetchall()
-
-        # --- Organize into dicts for easy lookup ---
-        proj_dict = {row[0]: row[1] for row in proj_data}
-        actual_dict = {row[0]: row[1] for row in actual_data}
-
-        # --- Union of categories from both sets ---
-        categories = sorted(set(proj_dict.keys()) | set(actual_dict.keys()))
-
-        projected = [proj_dict.get(cat, 0) for cat in categories]
-        actual = [abs(actual_dict.get(cat, 0)) for cat in categories]
-
-        # --- Build bar chart ---
-        x = range(len(categories))
-        width = 0.35
-
-        fig, ax = plt.subplots(figsize=(10, 5))
-        ax.bar([i - width/2 for i in x], projected, width, label="Projected")
-        ax.bar([i + width/2 for i in x], actual, width, label="Actual")
-
-        ax.set_ylabel("Amount")
-        ax.set_title("Budget vs. Spending")
-        ax.set_xticks(x)
-        ax.set_xticklabels(categories, rotation=45, ha="right")
-        ax.legend()
-
-        plt.tight_layout()
-
-        # --- Convert matplotlib figure to Kivy Image ---
-        buf = io.BytesIO()
-        fig.savefig(buf, format="png")
-        buf.seek(0)
-        plt.close(fig)
-
-        img = CoreImage(buf, ext="png")
-        self.chart_layout.add_widget(Image(texture=img.texture))
+        self._task = replace_task(
+            self._task,
+            run_in_background(fetch_budget_vs_spending, start_input, end_input, on_result=self.draw_chart)
+        )
+
+    def draw_chart(self, data):
+        """Move the bars to the new totals, categories sorted by name"""
+        proj_data, actual_data = data
+        projected, actual = series(proj_data), series(actual_data, absolute=True)
+        labels = sorted(set(projected) | set(actual))
+        self.chart.set_data({label: projected.get(label, 0) for label in labels},
+                            {label: actual.get(label, 0) for label in labels})
 
     def go_back(self, instance):
         self.manager.current = "dashboard"
@@ -2002,30 +1190,80 @@ class BudgetVsSpendingScreen(Screen):
 # -----------------------------
 # App entry point
 # -----------------------------
+class LazyScreenManager(ScreenManager):
+    """
+    ScreenManager that keeps a registry of screen classes and only
+    instantiates a screen the first time it is looked up or navigated to.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._factories = {}
+
+    def register(self, name, factory):
+        self._factories[name] = factory
+
+    def get_screen(self, name):
+        factory = self._factories.pop(name, None)
+        if factory is not None:
+            screen = factory(name=name)
+            # Opt-in diagnostics: SQL scopes and frame-time spans per enter
+            watch(screen, "on_pre_enter", "on_enter")
+            profile_methods(screen, "on_pre_enter")
+            self.add_widget(screen)
+        return super().get_screen(name)
+
+    def has_screen(self, name):
+        return name in self._factories or super().has_screen(name)
+
+    def build_all(self):
+        """Instantiate every registered screen now (used to compare with eager startup)"""
+        for name in list(self._factories):
+            self.get_screen(name)
+
 class BudgetBeeApp(App):
+    EXTERNAL_POLL_SECONDS = 2   # How often to look for commits from other processes
+
     def build(self):
         init_db()   # Ensure database exists
-        sm = ScreenManager()
-
-        # Add all screens
-        sm.add_widget(DashboardScreen(name="dashboard"))
-        sm.add_widget(AccountsScreen(name="accounts"))
-        sm.add_widget(AddAccountScreen(name="add_account"))
-        sm.add_widget(EditAccountScreen(name="edit_account"))
-        sm.add_widget(CategoriesScreen(name="categories"))
-        sm.add_widget(AddCategoryScreen(name="add_category"))
-        sm.add_widget(EditCategoryScreen(name="edit_category"))
-        sm.add_widget(TransactionsScreen(name="transactions"))
-        sm.add_widget(AddTransactionScreen(name="add_transaction"))
-        sm.add_widget(EditTransactionScreen(name="edit_transaction"))
-        sm.add_widget(BudgetsScreen(name="budgets"))
-        sm.add_widget(BudgetSummaryScreen(name="budget_summary"))
-        sm.add_widget(AddBudgetScreen(name="add_budget"))
-        sm.add_widget(VisualizationsScreen(name="visualizations"))
-        sm.add_widget(ExpenseDistributionScreen(name="expense_distribution"))
-        sm.add_widget(BudgetVsSpendingScreen(name="budget_vs_spending"))
+        sm = LazyScreenManager()
+
+        # Register all screens; each is built the first time it is shown
+        sm.register("dashboard", DashboardScreen)
+        sm.register("accounts", AccountsScreen)
+        sm.register("add_account", AddAccountScreen)
+        sm.register("edit_account", EditAccountScreen)
+        sm.register("categories", CategoriesScreen)
+        sm.register("add_category", AddCategoryScreen)
+        sm.register("edit_category", EditCategoryScreen)
+        sm.register("transactions", TransactionsScreen)
+        sm.register("add_transaction", AddTransactionScreen)
+        sm.register("edit_transaction", EditTransactionScreen)
+        sm.register("budgets", BudgetsScreen)
+        sm.register("budget_summary", BudgetSummaryScreen)
+        sm.register("add_budget", AddBudgetScreen)
+        sm.register("visualizations", VisualizationsScreen)
+        sm.register("expense_distribution", ExpenseDistributionScreen)
+        sm.register("budget_vs_spending", BudgetVsSpendingScreen)
+        sm.current = "dashboard"
+
+        Clock.schedule_interval(self.check_external_changes, self.EXTERNAL_POLL_SECONDS)
+        install_overlay()   # Only with BUDGETBEE_SQL_TRACE set
+        install_profiler()  # Only with BUDGETBEE_PROFILE set
         return sm
 
+    def check_external_changes(self, _dt):
+        """Reload the visible list screen if another process wrote to the database"""
+        if poll_external_changes():
+            screen = self.root.current_screen
+            if getattr(screen, "_watch", None) is not None:
+                screen.on_pre_enter()
+
+    def on_stop(self):
+        save_profile()
+        shutdown_db_worker()
+        close_connections()
+
 
 if __name__ == "__main__":
     BudgetBeeApp().run()
\ No newline at end of file
@@ -0,0 +1,294 @@
+import sqlite3
+
+from database import create_balance_triggers
+from rollups import create_rollups
+from search import create_search_index
+
+# -----------------------------
+# Schema migrations
+# -----------------------------
+# Each migration moves the database schema forward by one version. The current
+# version is stored in PRAGMA user_version, so a database that is already up to
+# date is recognized with a single pragma read and nothing else runs.
+#
+# To change the schema, append a new function to MIGRATIONS. Never edit or
+# reorder a migration that has already shipped.
+
+def get_schema_version(conn):
+    """Return the schema version stored in the database file"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def column_exists(conn, table, column):
+    """Check whether a table already has a column"""
+    rows = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    return any(row[1] == column for row in rows)
+
+def add_column(conn, table, column, definition):
+    """Add a column to an existing table unless it is already there"""
+    if not column_exists(conn, table, column):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+def migration_001_base_schema(conn):
+    """Tables for accounts, categories, transactions and budgets, plus built-in categories"""
+    c = conn.cursor()
+
+    # Accounts table
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS accounts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT DEFAULT 'Checking',
+            owner TEXT NOT NULL,
+            name TEXT NOT NULL UNIQUE,
+            balance REAL NOT NULL,
+            starting_balance REAL NOT NULL,
+            is_active INTEGER DEFAULT 1
+        )
+    """)
+
+    # Categories table
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            type TEXT,
+            is_active INTEGER DEFAULT 1
+        )
+    """)
+
+    # Ensure the System category exists (used for internal/account transactions)
+    c.execute("SELECT id FROM categories WHERE name=?", ("System",))
+    if not c.fetchone():
+        c.execute("INSERT INTO categories (name, type) VALUES (?, ?)", ("System", "system"))
+
+    # Transactions table
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            account_id INTEGER,
+            category_id INTEGER NOT NULL,
+            amount REAL NOT NULL,
+            date TEXT NOT NULL,
+            description TEXT,
+            projected INTEGER DEFAULT 0,
+            fulfilled INTEGER DEFAULT 0,
+            status TEXT DEFAULT "Pending",
+            is_transfer INTEGER DEFAULT 0,
+            FOREIGN KEY(account_id) REFERENCES accounts(id),
+            FOREIGN KEY(category_id) REFERENCES categories(id)
+        )
+    """)
+
+    # Check if "Transfer To" exists
+    c.execute("SELECT id FROM categories WHERE name=?", ("Transfer To",))
+    if not c.fetchone():
+        c.execute("""
+            INSERT INTO categories (name, type, is_active)
+            VALUES (?, ?, 1)
+        """, ("Transfer To", "Expense"))
+    
+    # Check if "Transfer From" exists
+    c.execute("SELECT id FROM categories WHERE name=?", ("Transfer From",))
+    if not c.fetchone():
+        c.execute("""
+            INSERT INTO categories (name, type, is_active)
+            VALUES (?, ?, 1)
+        """, ("Transfer From", "Income"))
+
+    # Budgets table
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS budgets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            start_date TEXT NOT NULL UNIQUE,
+            end_date TEXT UNIQUE
+        )
+    """)
+
+    # Budgeted categories table
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS budgeted_categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            budget_id INTEGER NOT NULL,
+            category_id INTEGER NOT NULL,
+            allocated_amount REAL NOT NULL,
+            alloc_desc TEXT,
+            FOREIGN KEY(budget_id) REFERENCES budgets(id),
+            FOREIGN KEY(category_id) REFERENCES categories(id)
+        )
+    """)
+
+    # Budget transactions table
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS budget_transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            budget_id INTEGER NOT NULL,
+            transaction_id INTEGER NOT NULL,
+            FOREIGN KEY(budget_id) REFERENCES budgets(id),
+            FOREIGN KEY(transaction_id) REFERENCES transactions(id)
+        )
+    """)
+
+# The index set as migration 002 created it. Frozen: later index changes go
+# in a new migration, not in this list or in database.INDEXES alone.
+INDEXES_002 = (
+    "CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date)",
+    "CREATE INDEX IF NOT EXISTS idx_transactions_account_date ON transactions(account_id, date)",
+    "CREATE INDEX IF NOT EXISTS idx_transactions_category_date ON transactions(category_id, date)",
+    "CREATE INDEX IF NOT EXISTS idx_transactions_projected_status ON transactions(projected, status)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_budget_transactions_budget_txn ON budget_transactions(budget_id, transaction_id)",
+)
+
+def create_indexes_002(conn):
+    """Create the INDEXES_002 indexes, dropping duplicate budget links that would block the unique one"""
+    c = conn.cursor()
+    c.execute("""
+        DELETE FROM budget_transactions
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM budget_transactions
+            GROUP BY budget_id, transaction_id
+        )
+    """)
+    for sql in INDEXES_002:
+        c.execute(sql)
+
+def migration_002_indexes(conn):
+    """Secondary indexes for the date-range and budget lookups"""
+    create_indexes_002(conn)
+
+def rebuild_table(conn, table, create_sql, copy_columns, select_columns):
+    """
+    Recreate a table with a new definition and copy its rows across.
+    SQLite cannot change a column type in place, so this is the standard
+    create/copy/drop/rename dance. Indexes on the table must be recreated.
+    """
+    c = conn.cursor()
+
+    c.execute("SELECT seq FROM sqlite_sequence WHERE name=?", (table,))
+    row = c.fetchone()
+    old_seq = row[0] if row else 0
+
+    c.execute(create_sql.format(table=f"{table}_new"))
+    c.execute(f"""
+        INSERT INTO {table}_new ({copy_columns})
+        SELECT {select_columns} FROM {table}
+    """)
+    c.execute(f"DROP TABLE {table}")
+    c.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+    # Keep AUTOINCREMENT from reusing ids of rows deleted before the rebuild
+    c.execute("SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name=?", (table,))
+    new_seq = max(old_seq, c.fetchone()[0])
+    c.execute("DELETE FROM sqlite_sequence WHERE name=?", (table,))
+    c.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, new_seq))
+
+def migration_003_integer_cents(conn):
+    """Store every money column as INTEGER cents instead of REAL dollars"""
+    rebuild_table(conn, "accounts", """
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT DEFAULT 'Checking',
+            owner TEXT NOT NULL,
+            name TEXT NOT NULL UNIQUE,
+            balance INTEGER NOT NULL,
+            starting_balance INTEGER NOT NULL,
+            is_active INTEGER DEFAULT 1
+        )
+    """,
+        "id, type, owner, name, balance, starting_balance, is_active",
+        """id, type, owner, name,
+           CAST(ROUND(balance * 100) AS INTEGER),
+           CAST(ROUND(starting_balance * 100) AS INTEGER),
+           is_active""",
+    )
+
+    rebuild_table(conn, "transactions", """
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            account_id INTEGER,
+            category_id INTEGER NOT NULL,
+            amount INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            description TEXT,
+            projected INTEGER DEFAULT 0,
+            fulfilled INTEGER DEFAULT 0,
+            status TEXT DEFAULT "Pending",
+            is_transfer INTEGER DEFAULT 0,
+            FOREIGN KEY(account_id) REFERENCES accounts(id),
+            FOREIGN KEY(category_id) REFERENCES categories(id)
+        )
+    """,
+        "id, account_id, category_id, amount, date, description, projected, fulfilled, status, is_transfer",
+        """id, account_id, category_id,
+           CAST(ROUND(amount * 100) AS INTEGER),
+           date, description, projected, fulfilled, status, is_transfer""",
+    )
+
+    rebuild_table(conn, "budgeted_categories", """
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            budget_id INTEGER NOT NULL,
+            category_id INTEGER NOT NULL,
+            allocated_amount INTEGER NOT NULL,
+            alloc_desc TEXT,
+            FOREIGN KEY(budget_id) REFERENCES budgets(id),
+            FOREIGN KEY(category_id) REFERENCES categories(id)
+        )
+    """,
+        "id, budget_id, category_id, allocated_amount, alloc_desc",
+        """id, budget_id, category_id,
+           CAST(ROUND(allocated_amount * 100) AS INTEGER),
+           alloc_desc""",
+    )
+
+    # Dropping the old transactions table dropped its indexes too
+    create_indexes_002(conn)
+
+def migration_004_balance_triggers(conn):
+    """Keep accounts.balance in step with the ledger from inside SQLite"""
+    create_balance_triggers(conn)
+
+def migration_005_rollups(conn):
+    """Daily and monthly transaction rollups, maintained by triggers"""
+    create_rollups(conn)
+
+def migration_006_search_index(conn):
+    """FTS5 index over transaction descriptions, maintained by triggers"""
+    create_search_index(conn)
+
+MIGRATIONS = [
+    migration_001_base_schema,
+    migration_002_indexes,
+    migration_003_integer_cents,
+    migration_004_balance_triggers,
+    migration_005_rollups,
+    migration_006_search_index,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def migrate(conn):
+    """
+    Apply every pending migration in order.
+    Returns the number of migrations applied (0 on the fast path).
+    """
+    version = get_schema_version(conn)
+    if version >= SCHEMA_VERSION:
+        return 0
+
+    # Each migration runs in its own explicit transaction
+    if conn.in_transaction:
+        conn.commit()
+
+    for number in range(version + 1, SCHEMA_VERSION + 1):
+        migration = MIGRATIONS[number - 1]
+        conn.execute("BEGIN")
+        try:
+            migration(conn)
+            # PRAGMA does not accept bound parameters
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+
+    return SCHEMA_VERSION - version
@@ -0,0 +1,42 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+# -----------------------------
+# Money helpers
+# -----------------------------
+# All amounts are stored and computed as integer cents. Conversion to and from
+# text only happens at the edges: parsing user input and formatting for display.
+
+CENT = Decimal("0.01")
+
+def parse_money(value):
+    """
+    Convert user input ("12", "12.5", "-3.456", 12.5) to integer cents.
+    Raises ValueError for input that is not a number, like float() does.
+    """
+    if isinstance(value, int):
+        return value * 100
+    try:
+        amount = Decimal(str(value).strip().replace(",", "").replace("$", ""))
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {value!r}")
+    if not amount.is_finite():
+        raise ValueError(f"Invalid amount: {value!r}")
+    return int((amount * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def cents_to_text(cents):
+    """Plain decimal text for input fields and totals: 1234 -> "12.34", -5 -> "-0.05" """
+    cents = int(cents or 0)
+    sign = "-" if cents < 0 else ""
+    whole, frac = divmod(abs(cents), 100)
+    return f"{sign}{whole}.{frac:02d}"
+
+def format_money(cents):
+    """Display form with currency sign: 1234 -> "$12.34", -1234 -> "-$12.34" """
+    cents = int(cents or 0)
+    if cents >= 0:
+        return f"${cents_to_text(cents)}"
+    return f"-${cents_to_text(-cents)}"
+
+def cents_to_float(cents):
+    """Dollar value as a float, for charting only (never for stored arithmetic)"""
+    return (cents or 0) / 100
@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+# -----------------------------
+# UI frame-time profiler (opt-in)
+# -----------------------------
+# Run with BUDGETBEE_PROFILE=trace.json (or =1 for budgetbee-trace.json) and:
+#
+#   - every screen's on_pre_enter, and each method decorated with @profiled
+#     (list builds, the calendar), is recorded as a span with its duration and
+#     the number of widgets created while it ran
+#   - every frame longer than FRAME_BUDGET_MS is recorded as a long frame
+#
+# On exit the spans and long frames are written in Chrome trace format (open
+# in chrome://tracing or https://ui.perfetto.dev) and a summary is printed.
+#
+# Profiler itself has no Kivy dependency, so the benchmark harness can record
+# spans headlessly (see benchmarks/suite.py --trace). With the variable unset
+# the decorators return their functions unchanged.
+
+_setting = os.environ.get("BUDGETBEE_PROFILE", "")
+ENABLED = _setting not in ("", "0")
+TRACE_FILE = "budgetbee-trace.json" if _setting in ("", "0", "1") else _setting
+
+FRAME_BUDGET_MS = 1000 / 60
+
+class SpanStats:
+    __slots__ = ("count", "total_ms", "max_ms", "widgets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.widgets = 0
+
+class Profiler:
+    """Collects spans and frame times as Chrome trace events"""
+
+    def __init__(self, frame_budget_ms=FRAME_BUDGET_MS):
+        self.frame_budget_ms = frame_budget_ms
+        self.events = []
+        self.stats = defaultdict(SpanStats)
+        self.widgets_created = 0    # Bumped by the Widget hook (see install)
+        self.frames = 0
+        self.long_frames = 0
+        self.worst_frame_ms = 0.0
+        self._origin = time.perf_counter()
+        self._last_frame = None
+        self._lock = threading.Lock()
+
+    def _us(self, t):
+        return (t - self._origin) * 1_000_000
+
+    def _event(self, name, cat, start, end, args=None):
+        event = {
+            "name": name, "cat": cat, "ph": "X",
+            "ts": round(self._us(start), 1), "dur": round((end - start) * 1_000_000, 1),
+            "pid": os.getpid(), "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+
+    def span(self, name, cat="ui"):
+        """Context manager timing a block (and counting the widgets it creates)"""
+        return _Span(self, name, cat)
+
+    def record_span(self, name, cat, start, end, widgets):
+        ms = (end - start) * 1000
+        with self._lock:
+            stats = self.stats[name]
+            stats.count += 1
+            stats.total_ms += ms
+            stats.max_ms = max(stats.max_ms, ms)
+            stats.widgets += widgets
+        self._event(name, cat, start, end, {"widgets": widgets} if widgets else None)
+
+    def tick(self, now=None):
+        """Call once per frame; frames over budget become 'long frame' events"""
+        now = time.perf_counter() if now is None else now
+        last, self._last_frame = self._last_frame, now
+        if last is None:
+            return
+        ms = (now - last) * 1000
+        self.frames += 1
+        self.worst_frame_ms = max(self.worst_frame_ms, ms)
+        if ms > self.frame_budget_ms:
+            self.long_frames += 1
+            self._event("long frame", "frame", last, now, {"ms": round(ms, 2)})
+
+    def summary(self):
+        """{'frames': ..., 'spans': {name: {...}}} sorted by total time"""
+        spans = sorted(self.stats.items(), key=lambda item: item[1].total_ms, reverse=True)
+        return {
+            "frames": self.frames,
+            "long_frames": self.long_frames,
+            "worst_frame_ms": round(self.worst_frame_ms, 2),
+            "spans": {
+                name: {
+                    "count": stats.count,
+                    "total_ms": round(stats.total_ms, 3),
+                    "max_ms": round(stats.max_ms, 3),
+                    "widgets": stats.widgets,
+                }
+                for name, stats in spans
+            },
+        }
+
+    def export(self, path):
+        """Write the events as a Chrome trace file"""
+        threads = {event["tid"] for event in self.events}
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+             "args": {"name": names.get(tid, str(tid))}}
+            for tid in threads
+        ]
+        with open(path, "w") as f:
+            json.dump({
+                "traceEvents": metadata + self.events,
+                "displayTimeUnit": "ms",
+                "otherData": self.summary(),
+            }, f)
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f"{summary['frames']} frames, {summary['long_frames']} over "
+              f"{self.frame_budget_ms:.1f} ms (worst {summary['worst_frame_ms']} ms)")
+        for name, stats in summary["spans"].items():
+            print(f"  {name:45} x{stats['count']:<4} total {stats['total_ms']:9.2f} ms  "
+                  f"max {stats['max_ms']:8.2f} ms  widgets {stats['widgets']}")
+
+class _Span:
+    __slots__ = ("profiler", "name", "cat", "start", "widgets")
+
+    def __init__(self, profiler, name, cat):
+        self.profiler = profiler
+        self.name = name
+        self.cat = cat
+
+    def __enter__(self):
+        self.widgets = self.profiler.widgets_created
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.profiler.record_span(self.name, self.cat, self.start, end,
+                                  self.profiler.widgets_created - self.widgets)
+        return False
+
+# -----------------------------
+# App hooks
+# -----------------------------
+profiler = Profiler() if ENABLED else None
+
+def _spanned(fn, name):
+    def wrapper(*args, **kwargs):
+        with profiler.span(name):
+            return fn(*args, **kwargs)
+    wrapper.__wrapped__ = fn
+    wrapper.__name__ = fn.__name__
+    return wrapper
+
+def profiled(fn):
+    """Decorator: record each call as a span named after the function (no-op when disabled)"""
+    if profiler is None:
+        return fn
+    return _spanned(fn, fn.__qualname__)
+
+def profile_methods(obj, *method_names):
+    """Record the named methods of one object as spans called Class.method (no-op when disabled)"""
+    if profiler is None:
+        return obj
+    for name in method_names:
+        method = getattr(obj, name, None)
+        if method is not None:
+            setattr(obj, name, _spanned(method, f"{type(obj).__name__}.{name}"))
+    return obj
+
+def install():
+    """Count widget construction and time every frame (call from App.build)"""
+    if profiler is None:
+        return
+    from kivy.clock import Clock
+    from kivy.uix.widget import Widget
+
+    widget_init = Widget.__init__
+
+    def counting_init(self, **kwargs):
+        profiler.widgets_created += 1
+        widget_init(self, **kwargs)
+
+    Widget.__init__ = counting_init
+    Clock.schedule_interval(lambda _dt: profiler.tick(), 0)
+
+def save():
+    """Write TRACE_FILE and print the summary (call from App.on_stop)"""
+    if profiler is None:
+        return
+    profiler.export(TRACE_FILE)
+    profiler.print_summary()
+    print(f"Trace written to {TRACE_FILE}")
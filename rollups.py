@@ -0,0 +1,246 @@
+from calendar import monthrange
+from datetime import date, timedelta
+
+from database import DB_NAME, get_connection
+
+# -----------------------------
+# Daily and monthly rollups
+# -----------------------------
+# rollup_daily and rollup_monthly hold per-period totals of the transactions
+# table, one row per (period, category, account, projected, is_transfer):
+#
+#   total  SUM(amount)
+#   debit  SUM(amount) of the negative amounts only (money out)
+#   count  number of transactions
+#
+# Transactions without an account are stored under account_id 0. The tables
+# are kept current by triggers on transactions, so reports can add up a few
+# rows per day or month instead of scanning every transaction in the range.
+
+ROLLUP_PERIODS = {
+    # table: expression giving the period key of a transaction date
+    "rollup_daily": ("day", "{row}.date"),
+    "rollup_monthly": ("month", "substr({row}.date, 1, 7)"),
+}
+
+ROLLUP_KEY = "category_id, account_id, projected, is_transfer"
+
+def _table_sql(table, period):
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            {period} TEXT NOT NULL,
+            category_id INTEGER NOT NULL,
+            account_id INTEGER NOT NULL,
+            projected INTEGER NOT NULL,
+            is_transfer INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            debit INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY ({period}, {ROLLUP_KEY})
+        ) WITHOUT ROWID
+    """
+
+def _add_sql(table, period, key, row):
+    """Statement that adds one transaction (NEW or OLD) to a rollup"""
+    return f"""
+            INSERT INTO {table} ({period}, {ROLLUP_KEY}, total, debit, count)
+            VALUES ({key.format(row=row)}, {row}.category_id, COALESCE({row}.account_id, 0),
+                    COALESCE({row}.projected, 0), COALESCE({row}.is_transfer, 0),
+                    {row}.amount, MIN({row}.amount, 0), 1)
+            ON CONFLICT ({period}, {ROLLUP_KEY}) DO UPDATE SET
+                total = total + excluded.total,
+                debit = debit + excluded.debit,
+                count = count + 1;"""
+
+def _remove_sql(table, period, key, row):
+    """Statements that take one transaction (OLD) back out of a rollup"""
+    match = f"""{period} = {key.format(row=row)} AND category_id = {row}.category_id
+              AND account_id = COALESCE({row}.account_id, 0)
+              AND projected = COALESCE({row}.projected, 0)
+              AND is_transfer = COALESCE({row}.is_transfer, 0)"""
+    return f"""
+            UPDATE {table}
+            SET total = total - {row}.amount, debit = debit - MIN({row}.amount, 0), count = count - 1
+            WHERE {match};
+            DELETE FROM {table} WHERE {match} AND count = 0;"""
+
+def _trigger_sql():
+    add_new = "".join(_add_sql(t, p, k, "NEW") for t, (p, k) in ROLLUP_PERIODS.items())
+    remove_old = "".join(_remove_sql(t, p, k, "OLD") for t, (p, k) in ROLLUP_PERIODS.items())
+    return {
+        "trg_transactions_rollup_insert": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_insert
+        AFTER INSERT ON transactions
+        BEGIN{add_new}
+        END
+    """,
+        "trg_transactions_rollup_delete": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_delete
+        AFTER DELETE ON transactions
+        BEGIN{remove_old}
+        END
+    """,
+        "trg_transactions_rollup_update": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_update
+        AFTER UPDATE OF date, category_id, account_id, amount, projected, is_transfer ON transactions
+        BEGIN{remove_old}{add_new}
+        END
+    """,
+    }
+
+ROLLUP_TABLES = {table: _table_sql(table, period) for table, (period, _) in ROLLUP_PERIODS.items()}
+ROLLUP_TRIGGERS = _trigger_sql()
+
+def create_rollups(conn):
+    """Create the rollup tables and triggers and fill them from transactions. The caller commits."""
+    c = conn.cursor()
+    for sql in ROLLUP_TABLES.values():
+        c.execute(sql)
+    for sql in ROLLUP_TRIGGERS.values():
+        c.execute(sql)
+    rebuild_rollups(conn)
+
+def _aggregate_sql(key, where=""):
+    return f"""
+        SELECT {key.format(row="t")}, t.category_id, COALESCE(t.account_id, 0),
+               COALESCE(t.projected, 0), COALESCE(t.is_transfer, 0),
+               SUM(t.amount), SUM(MIN(t.amount, 0)), COUNT(*)
+        FROM transactions t
+        {where}
+        GROUP BY 1, 2, 3, 4, 5
+    """
+
+def rebuild_rollups(conn):
+    """Recompute both rollups from scratch. The caller commits."""
+    c = conn.cursor()
+    for table, (period, key) in ROLLUP_PERIODS.items():
+        c.execute(f"DELETE FROM {table}")
+        c.execute(f"""
+            INSERT INTO {table} ({period}, {ROLLUP_KEY}, total, debit, count)
+            {_aggregate_sql(key)}
+        """)
+
+def add_new_transactions_to_rollups(conn, last_id):
+    """
+    Add every transaction with id > last_id to both rollups, for bulk loads
+    made without the insert trigger. The caller commits.
+    """
+    c = conn.cursor()
+    for table, (period, key) in ROLLUP_PERIODS.items():
+        c.execute(f"""
+            INSERT INTO {table} ({period}, {ROLLUP_KEY}, total, debit, count)
+            {_aggregate_sql(key, "WHERE t.id > ?")}
+            ON CONFLICT ({period}, {ROLLUP_KEY}) DO UPDATE SET
+                total = total + excluded.total,
+                debit = debit + excluded.debit,
+                count = count + excluded.count
+        """, (last_id,))
+
+def verify_rollups(conn):
+    """Return the tables whose contents differ from a fresh aggregate of transactions"""
+    c = conn.cursor()
+    stale = []
+    for table, (period, key) in ROLLUP_PERIODS.items():
+        c.execute(f"""
+            SELECT COUNT(*) FROM (
+                SELECT {period}, {ROLLUP_KEY}, total, debit, count FROM {table}
+                EXCEPT
+                {_aggregate_sql(key)}
+            )
+        """)
+        extra = c.fetchone()[0]
+        c.execute(f"""
+            SELECT COUNT(*) FROM (
+                {_aggregate_sql(key)}
+                EXCEPT
+                SELECT {period}, {ROLLUP_KEY}, total, debit, count FROM {table}
+            )
+        """)
+        missing = c.fetchone()[0]
+        if extra or missing:
+            stale.append(table)
+    return stale
+
+# -----------------------------
+# Reading rollups
+# -----------------------------
+NO_RANGE = ("1", "0")   # A BETWEEN range that matches nothing
+
+def split_range(start_date, end_date):
+    """
+    Split an inclusive date range into whole months plus leftover days.
+    Returns (months, head_days, tail_days), each a (first, last) pair for
+    BETWEEN. Ranges that are not ISO dates are left to the daily rollup as-is.
+    """
+    try:
+        start = date.fromisoformat(start_date)
+        end = date.fromisoformat(end_date)
+    except (TypeError, ValueError):
+        return NO_RANGE, (start_date, end_date), NO_RANGE
+
+    first_month = start if start.day == 1 else (start.replace(day=1) + timedelta(days=31)).replace(day=1)
+    last_day = monthrange(end.year, end.month)[1]
+    last_month = end.replace(day=1) if end.day == last_day else (end.replace(day=1) - timedelta(days=1)).replace(day=1)
+
+    if first_month > last_month:
+        return NO_RANGE, (start_date, end_date), NO_RANGE
+
+    after_last = last_month.replace(day=monthrange(last_month.year, last_month.month)[1]) + timedelta(days=1)
+    months = (first_month.isoformat()[:7], last_month.isoformat()[:7])
+    head = (start_date, (first_month - timedelta(days=1)).isoformat()) if start < first_month else NO_RANGE
+    tail = (after_last.isoformat(), end_date) if after_last <= end else NO_RANGE
+    return months, head, tail
+
+def category_totals(conn, start_date, end_date, projected, category_type="Expense",
+                    exclude_categories=("System",), include_transfers=True):
+    """
+    [(category_name, total)] for one category type over an inclusive date
+    range, read from the monthly rollup for whole months and the daily rollup
+    for the days at either end.
+    """
+    months, head, tail = split_range(start_date, end_date)
+    transfer_filter = "" if include_transfers else "AND is_transfer = 0"
+    category_filter = ""
+    if exclude_categories:
+        category_filter = f"AND c.name NOT IN ({', '.join('?' for _ in exclude_categories)})"
+
+    c = conn.cursor()
+    c.execute(f"""
+        SELECT c.name, SUM(r.total)
+        FROM (
+            SELECT category_id, total FROM rollup_monthly
+            WHERE month BETWEEN ? AND ? AND projected = ? {transfer_filter}
+            UNION ALL
+            SELECT category_id, total FROM rollup_daily
+            WHERE day BETWEEN ? AND ? AND projected = ? {transfer_filter}
+            UNION ALL
+            SELECT category_id, total FROM rollup_daily
+            WHERE day BETWEEN ? AND ? AND projected = ? {transfer_filter}
+        ) r
+        JOIN categories c ON r.category_id = c.id
+        WHERE c.type = ?
+        {category_filter}
+        GROUP BY c.name
+    """, (*months, projected, *head, projected, *tail, projected, category_type, *exclude_categories))
+    return c.fetchall()
+
+if __name__ == "__main__":
+    # Usage: python rollups.py {rebuild,check} [db_file]
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ("rebuild", "check"):
+        sys.exit("usage: python rollups.py {rebuild,check} [db_file]")
+
+    from migrations import migrate
+
+    conn = get_connection(sys.argv[2] if len(sys.argv) > 2 else DB_NAME)
+    migrate(conn)
+    if sys.argv[1] == "rebuild":
+        with conn:
+            rebuild_rollups(conn)
+        print("Rollups rebuilt")
+    else:
+        stale = verify_rollups(conn)
+        for table in stale:
+            print(f"{table} is out of date (run: python rollups.py rebuild)")
+        sys.exit(1 if stale else 0)
@@ -0,0 +1,170 @@
+import re
+import sqlite3
+from typing import NamedTuple, Optional
+
+# -----------------------------
+# Transaction search
+# -----------------------------
+# transactions_fts is an FTS5 index over transactions.description. It is an
+# external-content table: it stores only the index and reads descriptions
+# from transactions, and triggers keep it in step with every write.
+#
+# A search combines free text with facets (account, category, amount range,
+# date range) and pages through results newest first with the same (date, id)
+# keyset as the plain transaction list:
+#
+#   - with text, the FTS index drives the query and the facets filter its
+#     matches, so the cost follows the number of matching rows
+#   - without text, the facets pick the account/category/date indexes and
+#     the scan stops once a page is full
+
+SEARCH_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+        description,
+        content='transactions',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+"""
+
+SEARCH_TRIGGERS = {
+    "trg_transactions_fts_insert": """
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_insert
+        AFTER INSERT ON transactions
+        BEGIN
+            INSERT INTO transactions_fts (rowid, description) VALUES (NEW.id, NEW.description);
+        END
+    """,
+    "trg_transactions_fts_delete": """
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_delete
+        AFTER DELETE ON transactions
+        BEGIN
+            INSERT INTO transactions_fts (transactions_fts, rowid, description)
+            VALUES ('delete', OLD.id, OLD.description);
+        END
+    """,
+    "trg_transactions_fts_update": """
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_update
+        AFTER UPDATE OF description ON transactions
+        BEGIN
+            INSERT INTO transactions_fts (transactions_fts, rowid, description)
+            VALUES ('delete', OLD.id, OLD.description);
+            INSERT INTO transactions_fts (rowid, description) VALUES (NEW.id, NEW.description);
+        END
+    """,
+}
+
+def create_search_index(conn):
+    """Create the FTS table and its triggers and index every transaction. The caller commits."""
+    c = conn.cursor()
+    c.execute(SEARCH_TABLE)
+    for sql in SEARCH_TRIGGERS.values():
+        c.execute(sql)
+    rebuild_search_index(conn)
+
+def rebuild_search_index(conn):
+    """Re-index every description from scratch. The caller commits."""
+    conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+
+def index_new_transactions(conn, last_id):
+    """Index every transaction with id > last_id, for bulk loads made without the insert trigger"""
+    conn.execute("""
+        INSERT INTO transactions_fts (rowid, description)
+        SELECT id, description FROM transactions WHERE id > ?
+    """, (last_id,))
+
+def search_index_ok(conn):
+    """True if the FTS index matches the descriptions in transactions"""
+    try:
+        conn.execute("INSERT INTO transactions_fts (transactions_fts, rank) VALUES ('integrity-check', 1)")
+    except sqlite3.DatabaseError:
+        return False
+    return True
+
+# -----------------------------
+# Queries
+# -----------------------------
+class TransactionSearch(NamedTuple):
+    """What to look for; every field is optional and they all must match"""
+    text: str = ""
+    account_id: Optional[int] = None
+    category_id: Optional[int] = None
+    min_amount: Optional[int] = None    # cents, compared with the absolute amount
+    max_amount: Optional[int] = None
+    start_date: Optional[str] = None    # inclusive, YYYY-MM-DD
+    end_date: Optional[str] = None
+
+def match_expression(text):
+    """
+    Turn what the user typed into an FTS5 query: every word must appear, the
+    last one possibly still half-typed. Returns "" when there are no words.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return ""
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+def search_query(search=None, after=None, limit=100):
+    """Build the SQL and parameters for one page of results (see ledger.search_transactions)"""
+    search = search or TransactionSearch()
+    source = "transactions t"
+    where = ["+t.projected = 0", "c.name != 'System'"]
+    params = []
+
+    match = match_expression(search.text)
+    if match:
+        # The FTS index goes first; everything else filters its matches
+        source = "transactions_fts CROSS JOIN transactions t ON t.id = transactions_fts.rowid"
+        where.append("transactions_fts MATCH ?")
+        params.append(match)
+
+    for condition, value in (
+        ("t.account_id = ?", search.account_id),
+        ("t.category_id = ?", search.category_id),
+        ("t.date >= ?", search.start_date),
+        ("t.date <= ?", search.end_date),
+        ("ABS(t.amount) >= ?", search.min_amount),
+        ("ABS(t.amount) <= ?", search.max_amount),
+    ):
+        if value is not None and value != "":
+            where.append(condition)
+            params.append(value)
+
+    if after:
+        where.append("(t.date, t.id) < (?, ?)")
+        params.extend(after)
+
+    sql = f"""
+        SELECT t.id, a.name, c.name, t.amount, t.date, t.description
+        FROM {source}
+        JOIN accounts a ON t.account_id = a.id
+        JOIN categories c ON t.category_id = c.id
+        WHERE {" AND ".join(where)}
+        ORDER BY t.date DESC, t.id DESC
+        LIMIT ?
+    """
+    return sql, (*params, limit)
+
+if __name__ == "__main__":
+    # Usage: python search.py {rebuild,check} [db_file]
+    import sys
+
+    from database import DB_NAME, get_connection
+    from migrations import migrate
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ("rebuild", "check"):
+        sys.exit("usage: python search.py {rebuild,check} [db_file]")
+
+    conn = get_connection(sys.argv[2] if len(sys.argv) > 2 else DB_NAME)
+    migrate(conn)
+    if sys.argv[1] == "rebuild":
+        with conn:
+            rebuild_search_index(conn)
+        print("Search index rebuilt")
+    elif search_index_ok(conn):
+        print("Search index is up to date")
+    else:
+        sys.exit("Search index is out of date (run: python search.py rebuild)")
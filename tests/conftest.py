@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from database import close_connections, get_connection
+from generate import SCALES, generate
+from migrations import migrate
+
+@pytest.fixture
+def conn(tmp_path):
+    """The pooled connection to a new, fully migrated database"""
+    connection = get_connection(str(tmp_path / "budgetbee.db"))
+    migrate(connection)
+    yield connection
+    close_connections()
+
+@pytest.fixture
+def generated(conn):
+    """conn, filled by the benchmark generator with a few thousand transactions"""
+    generate(conn, SCALES["small"]._replace(transactions=3_000), seed=1)
+    return conn
@@ -0,0 +1,86 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import ledger
+from database import repair_balances, verify_balances
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def accounts(conn):
+    ledger.add_account(conn, "Sam", "Checking", 10_000)
+    ledger.add_account(conn, "Sam", "Savings", 5_000, "Savings")
+    ledger.add_category(conn, "Groceries", "Expense")
+    return conn
+
+def balances(conn):
+    return {account.name: account.balance for account in ledger.list_active_accounts(conn)}
+
+def test_ledger_writes_keep_balances_current(accounts):
+    conn = accounts
+    txn_id = ledger.add_transaction(conn, "Checking", "Groceries", 1_250, "2024-01-05")
+    assert balances(conn) == {"Checking": 8_750, "Savings": 5_000}
+    assert verify_balances(conn) == []
+
+    # New amount, then a move to the other account
+    ledger.update_transaction(conn, txn_id, "Checking", "Groceries", 2_000, "2024-01-05", "")
+    assert balances(conn) == {"Checking": 8_000, "Savings": 5_000}
+    ledger.update_transaction(conn, txn_id, "Savings", "Groceries", 2_000, "2024-01-05", "")
+    assert balances(conn) == {"Checking": 10_000, "Savings": 3_000}
+    assert verify_balances(conn) == []
+
+    ledger.delete_transaction(conn, txn_id)
+    assert balances(conn) == {"Checking": 10_000, "Savings": 5_000}
+    assert verify_balances(conn) == []
+
+def test_account_edits_keep_balances_current(accounts):
+    conn = accounts
+    checking = ledger.reference_data(conn).account("Checking").id
+    ledger.update_account(conn, checking, "Checking", "Sam", "Checking", 12_345)
+    assert balances(conn)["Checking"] == 12_345
+    ledger.delete_account(conn, checking)
+    ledger.add_account(conn, "Sam", "Checking", 700)
+    assert balances(conn)["Checking"] == 700
+    assert verify_balances(conn) == []
+
+def test_projected_transactions_do_not_move_balances(accounts):
+    conn = accounts
+    conn.execute("""
+        INSERT INTO transactions (account_id, category_id, amount, date, projected)
+        SELECT id, 1, -999, '2024-01-05', 1 FROM accounts WHERE name = 'Checking'
+    """)
+    assert balances(conn)["Checking"] == 10_000
+    # Realizing it moves the balance; un-realizing it moves it back
+    conn.execute("UPDATE transactions SET projected = 0 WHERE amount = -999")
+    assert balances(conn)["Checking"] == 9_001
+    conn.execute("UPDATE transactions SET projected = 1 WHERE amount = -999")
+    assert balances(conn)["Checking"] == 10_000
+    assert verify_balances(conn) == []
+
+def test_drift_is_found_and_repaired(accounts):
+    conn = accounts
+    with conn:
+        conn.execute("UPDATE accounts SET balance = balance + 1 WHERE name = 'Savings'")
+    drifted = verify_balances(conn)
+    assert [(name, balance, ledger_sum) for _, name, balance, ledger_sum in drifted] == [("Savings", 5_001, 5_000)]
+    assert repair_balances(conn) == drifted
+    assert verify_balances(conn) == []
+    assert balances(conn)["Savings"] == 5_000
+
+def test_command_line_repair(accounts):
+    db = accounts.execute("PRAGMA database_list").fetchone()[2]
+    with accounts:
+        accounts.execute("UPDATE accounts SET balance = 0")
+
+    def run(*args):
+        return subprocess.run([sys.executable, "database.py", *args, db], cwd=ROOT, capture_output=True, text=True)
+
+    check = run()
+    assert check.returncode == 1
+    assert "--repair" in check.stdout
+    assert run("--repair").returncode == 0
+    assert run().returncode == 0
+    assert verify_balances(accounts) == []
@@ -0,0 +1,64 @@
+import pytest
+
+import ledger
+from budget_index import find_budget, get_budget_index, invalidate_budget_index
+from database import get_connection, open_connection
+from migrations import migrate
+
+@pytest.fixture
+def periods(conn):
+    """Three monthly budgets; the last one is still open. Returns their ids."""
+    return [ledger.add_budget(conn, name, start)
+            for name, start in (("Jan", "2024-01-01"), ("Feb", "2024-02-01"), ("Mar", "2024-03-01"))]
+
+@pytest.mark.parametrize("day, expected", [
+    ("2023-12-31", None),      # Before the first budget
+    ("2024-01-01", 0),         # First day of a period
+    ("2024-01-31", 0),         # Last day of a period
+    ("2024-02-01", 1),
+    ("2024-02-29", 1),
+    ("2024-03-01", 2),
+    ("2030-06-15", 2),         # The open "Current" period has no end
+])
+def test_bisect_boundaries(conn, periods, day, expected):
+    assert find_budget(conn, day) == (None if expected is None else periods[expected])
+
+def test_cached_until_budgets_change(conn, periods):
+    assert get_budget_index(conn) is get_budget_index(conn)
+    index = get_budget_index(conn)
+
+    april = ledger.add_budget(conn, "Apr", "2024-04-01")
+    assert get_budget_index(conn) is not index
+    assert find_budget(conn, "2024-04-02") == april
+    assert find_budget(conn, "2024-03-31") == periods[2]
+
+    ledger.delete_budget(conn, april)
+    assert find_budget(conn, "2024-04-02") == periods[2]
+
+    index = get_budget_index(conn)
+    invalidate_budget_index()
+    assert get_budget_index(conn) is not index
+
+def test_unpooled_connections_are_not_cached(conn, periods, tmp_path):
+    other = open_connection(str(tmp_path / "budgetbee.db"))
+    try:
+        assert get_budget_index(other) is not get_budget_index(other)
+        assert find_budget(other, "2024-02-10") == periods[1]
+    finally:
+        other.close()
+
+def test_databases_do_not_share_an_index(conn, tmp_path):
+    ledger.add_budget(conn, "A-Jan", "2024-01-01")
+    assert find_budget(conn, "2024-01-07") == 1
+
+    other = get_connection(str(tmp_path / "other.db"))
+    migrate(other)
+    ledger.add_account(other, "Sam", "Checking")
+    ledger.add_category(other, "Food", "Expense")
+    ledger.add_budget(other, "B-Dec", "2023-12-01")
+    january = ledger.add_budget(other, "B-Jan", "2024-01-01")
+
+    txn_id = ledger.add_transaction(other, "Checking", "Food", 500, "2024-01-07")
+    linked = other.execute("SELECT budget_id FROM budget_transactions WHERE transaction_id = ?", (txn_id,))
+    assert linked.fetchall() == [(january,)]
+    assert find_budget(conn, "2024-01-07") == 1
@@ -0,0 +1,47 @@
+from datetime import date, timedelta
+
+import pytest
+
+import ledger
+
+def ranges(conn):
+    return conn.execute("SELECT name, start_date, end_date FROM budgets ORDER BY start_date, id").fetchall()
+
+def expected_ranges(starts):
+    """Each budget ends the day before the next starts; the last is Current"""
+    ordered = sorted(starts.items(), key=lambda item: item[1])
+    result = []
+    for (name, start), following in zip(ordered, ordered[1:] + [None]):
+        end = "Current" if following is None else (date.fromisoformat(following[1]) - timedelta(days=1)).isoformat()
+        result.append((name, start, end))
+    return result
+
+@pytest.fixture
+def budgets(conn):
+    starts = {"Jan": "2024-01-01", "Feb": "2024-02-01", "Mar": "2024-03-01", "Apr": "2024-04-01"}
+    ids = {name: ledger.add_budget(conn, name, start) for name, start in starts.items()}
+    assert ranges(conn) == expected_ranges(starts)
+    return starts, ids
+
+@pytest.mark.parametrize("name, new_start", [
+    ("Jan", "2024-03-15"),     # Past two neighbours
+    ("Jan", "2024-05-01"),     # To the end: becomes Current
+    ("Apr", "2023-12-01"),     # From the end to the front
+    ("Feb", "2024-03-02"),     # Swap with its neighbour by one day
+    ("Mar", "2024-02-15"),     # Split a neighbour's period
+])
+def test_moving_a_budget_refits_every_range(conn, budgets, name, new_start):
+    starts, ids = budgets
+    ledger.update_budget(conn, ids[name], name, new_start)
+    starts[name] = new_start
+    assert ranges(conn) == expected_ranges(starts)
+
+def test_adding_and_deleting_refits_neighbours(conn, budgets):
+    starts, ids = budgets
+    ledger.add_budget(conn, "Mid-Feb", "2024-02-15")
+    starts["Mid-Feb"] = "2024-02-15"
+    assert ranges(conn) == expected_ranges(starts)
+
+    ledger.delete_budget(conn, ids["Apr"])
+    del starts["Apr"]
+    assert ranges(conn) == expected_ranges(starts)
@@ -0,0 +1,74 @@
+import pytest
+
+import ledger
+from budget_summary import BudgetSummary, summarize_budget, summarize_budgets
+
+@pytest.fixture
+def budgets(conn):
+    """Two monthly budgets with allocations, spending and projected items; returns (january, february)"""
+    ledger.add_account(conn, "Sam", "Checking", 100_000)
+    ledger.add_account(conn, "Sam", "Savings", 0, "Savings")
+    ledger.add_category(conn, "Groceries", "Expense")
+    ledger.add_category(conn, "Rent", "Expense")
+    ledger.add_category(conn, "Salary", "Income")
+
+    january = ledger.add_budget(conn, "January", "2024-01-01")
+    february = ledger.add_budget(conn, "February", "2024-02-01")
+    ledger.add_allocation(conn, january, "Groceries", 40_000)
+    ledger.add_allocation(conn, january, "Rent", 100_000)
+    ledger.add_allocation(conn, february, "Groceries", 30_000)
+
+    ledger.add_transaction(conn, "Checking", "Groceries", 12_345, "2024-01-05")
+    ledger.add_transaction(conn, "Checking", "Rent", 100_000, "2024-01-31")
+    # Income and transfers are not spending
+    ledger.add_transaction(conn, "Checking", "Salary", 300_000, "2024-01-15")
+    ledger.add_transaction(conn, "Checking", "Transfer To", 50_000, "2024-01-20")
+    ledger.add_transaction(conn, "Savings", "Transfer From", 50_000, "2024-01-20")
+    ledger.add_transaction(conn, "Checking", "Groceries", 5_000, "2024-02-10")
+
+    ledger.add_projected_transaction(conn, january, "Rent", 100_000, "February rent", "2024-01-31")
+    # Only pending items count as projected
+    done = ledger.add_projected_transaction(conn, january, "Groceries", 2_000, "Milk", "2024-01-10")
+    ledger.set_projected_status(conn, done, "completed")
+    return january, february
+
+def test_summaries_by_hand(conn, budgets):
+    january, february = budgets
+    assert summarize_budget(conn, january) == BudgetSummary(
+        january, "January", "2024-01-01", "2024-01-31", 140_000, 112_345, 100_000, -72_345)
+    assert summarize_budget(conn, february) == BudgetSummary(
+        february, "February", "2024-02-01", "Current", 30_000, 5_000, 0, 25_000)
+
+def test_list_is_newest_first_and_matches_single_lookups(conn, budgets):
+    summaries = ledger.list_budget_summaries(conn)
+    assert [s.budget_id for s in summaries] == list(reversed(budgets))
+    assert summaries == [ledger.get_budget_summary(conn, s.budget_id) for s in summaries]
+    assert list(summarize_budgets(conn, newest_first=False)) == summaries[::-1]
+
+def test_start_date_filters(conn, budgets):
+    january, february = budgets
+    assert [s.budget_id for s in summarize_budgets(conn, start_date="2024-02-01")] == [february]
+    assert [s.budget_id for s in summarize_budgets(conn, end_date="2024-01-31")] == [january]
+
+def test_unknown_budget_is_all_zeros(conn):
+    assert summarize_budget(conn, 999) == BudgetSummary(999, None, None, None, 0, 0, 0, 0)
+
+def test_summaries_follow_writes(conn, budgets):
+    january, _ = budgets
+    txn_id = ledger.add_transaction(conn, "Checking", "Groceries", 655, "2024-01-06")
+    assert summarize_budget(conn, january).spent == 113_000
+    ledger.delete_transaction(conn, txn_id)
+    assert summarize_budget(conn, january).spent == 112_345
+
+def test_generated_summaries_match_transactions(generated):
+    conn = generated
+    for summary in summarize_budgets(conn):
+        end = "9999-12-31" if summary.end_date in (None, "Current") else summary.end_date
+        spent = conn.execute("""
+            SELECT COALESCE(-SUM(amount), 0) FROM transactions
+            WHERE amount < 0 AND projected = 0 AND is_transfer = 0 AND date BETWEEN ? AND ?
+        """, (summary.start_date, end)).fetchone()[0]
+        allocated = conn.execute("SELECT COALESCE(SUM(allocated_amount), 0) FROM budgeted_categories WHERE budget_id = ?",
+                                 (summary.budget_id,)).fetchone()[0]
+        assert (summary.allocated, summary.spent) == (allocated, spent)
+        assert summary == summarize_budget(conn, summary.budget_id)
@@ -0,0 +1,102 @@
+import pytest
+
+import events
+from database import open_connection
+from events import (
+    TABLES, DataWatcher, poll_external_changes, publish, subscribe, table_versions, unsubscribe,
+)
+
+class Recorder(list):
+    """A subscriber callback that records the tables it was called with"""
+
+    def callback(self, changed):
+        self.append(set(changed))
+
+@pytest.fixture
+def calls():
+    recorder = Recorder()
+    yield recorder
+    unsubscribe(recorder.callback)
+
+def test_publish_bumps_versions_and_notifies(calls):
+    subscribe(("categories",), calls.callback)
+    before = table_versions(("categories", "budgets"))
+    publish("categories")
+    assert calls == [{"categories"}]
+    assert table_versions(("categories", "budgets")) == (before[0] + 1, before[1])
+
+    publish("budgets")
+    assert calls == [{"categories"}]
+
+def test_implied_tables(calls):
+    subscribe(("accounts",), calls.callback)
+    before = table_versions(("accounts",))
+    # Balance triggers: a transaction write changes accounts too
+    publish("transactions")
+    assert calls == [{"transactions", "accounts"}]
+    assert table_versions(("accounts",)) == (before[0] + 1,)
+
+def test_explicit_only_subscribers_ignore_implied_changes(calls):
+    subscribe(("accounts",), calls.callback, implied=False)
+    publish("transactions")
+    assert calls == []
+    publish("accounts", "transactions")
+    assert calls == [{"accounts", "transactions"}]
+
+def test_one_call_per_publish(calls):
+    subscribe(("accounts", "transactions"), calls.callback)
+    subscribe(("accounts",), calls.callback)   # Subscribing twice changes nothing
+    publish("transactions", "accounts")
+    assert len(calls) == 1
+
+def test_unsubscribe(calls):
+    subscribe(("budgets",), calls.callback, implied=False)
+    unsubscribe(calls.callback)
+    publish("budgets")
+    assert calls == []
+
+    # A later subscription starts fresh, implied changes included
+    subscribe(("accounts",), calls.callback)
+    publish("transactions")
+    assert calls == [{"transactions", "accounts"}]
+
+@pytest.fixture
+def watched(conn, monkeypatch):
+    """Point change polling at the test database and forget earlier polls"""
+    monkeypatch.setattr(events, "get_connection", lambda: conn)
+    monkeypatch.setattr(events, "_last_data_version", None)
+    return conn
+
+def test_commits_from_another_connection_publish_every_table(watched, calls, tmp_path):
+    subscribe(TABLES, calls.callback)
+    assert not poll_external_changes(watched)     # The first poll only records the version
+
+    # Our own commits do not move data_version
+    with watched:
+        watched.execute("INSERT INTO categories (name, type) VALUES ('Ours', 'Expense')")
+    assert not poll_external_changes(watched)
+
+    other = open_connection(watched.execute("PRAGMA database_list").fetchone()[2])
+    try:
+        with other:
+            other.execute("INSERT INTO categories (name, type) VALUES ('Theirs', 'Expense')")
+    finally:
+        other.close()
+    assert poll_external_changes(watched)
+    assert calls == [set(TABLES)]
+    assert not poll_external_changes(watched)
+
+def test_data_watcher(watched):
+    watcher = DataWatcher("budgets", "budgeted_categories")
+    assert watcher.changed()        # First load
+    assert not watcher.changed()
+    publish("accounts")
+    assert not watcher.changed()
+    publish("budgeted_categories")
+    assert watcher.changed()
+
+    publish("budgets")
+    watcher.mark_current()          # The screen updated itself
+    assert not watcher.changed()
+    watcher.invalidate()
+    assert watcher.changed()
@@ -0,0 +1,76 @@
+import csv
+import gzip
+import os
+import subprocess
+import sys
+
+import pytest
+
+import ledger
+from exporter import export_csv, iter_transactions
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def ledger_data(conn):
+    ledger.add_account(conn, "Sam", "Checking", 10_000)
+    ledger.add_account(conn, "Sam", "Savings", 0, "Savings")
+    ledger.add_category(conn, "Groceries", "Expense")
+    budget = ledger.add_budget(conn, "January", "2024-01-01")
+    ledger.add_allocation(conn, budget, "Groceries", 40_000, "Food")
+    ledger.add_transaction(conn, "Checking", "Groceries", 1_250, "2024-01-05", "Market")
+    ledger.add_transaction(conn, "Savings", "Groceries", 99, "2024-01-20", "Gum")
+    ledger.add_transaction(conn, "Checking", "Groceries", 500, "2024-02-03", "Cafe")
+    ledger.add_projected_transaction(conn, budget, "Groceries", 3_000, "Party", "2024-01-25")
+    return conn
+
+def read(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+def test_transactions_filtered_by_date_and_account(ledger_data, tmp_path):
+    path = str(tmp_path / "out.csv")
+    assert export_csv(ledger_data, "transactions", path, "2024-01-01", "2024-01-31", "Checking") == 1
+    header, row = read(path)
+    assert header[:6] == ["id", "date", "account", "category", "category_type", "amount"]
+    assert row[1:7] == ["2024-01-05", "Checking", "Groceries", "Expense", "-12.50", "Market"]
+
+def test_projected_only_on_request(ledger_data):
+    january = {"start_date": "2024-01-01", "end_date": "2024-01-31"}
+    assert [row[6] for row in iter_transactions(ledger_data, **january)][1:] == ["Market", "Gum"]
+    assert [row[6] for row in iter_transactions(ledger_data, include_projected=True, **january)][1:] == \
+        ["Market", "Gum", "Party"]
+
+def test_budgets_and_summaries(ledger_data, tmp_path):
+    path = str(tmp_path / "budgets.csv.gz")
+    assert export_csv(ledger_data, "budgets", path) == 1
+    assert read(path)[1] == ["1", "January", "2024-01-01", "Current", "Groceries", "400.00", "Food"]
+
+    path = str(tmp_path / "summaries.csv")
+    assert export_csv(ledger_data, "summaries", path) == 1
+    assert read(path)[1][4:] == ["400.00", "18.49", "30.00", "351.51"]
+
+def test_unknown_account_leaves_the_output_alone(ledger_data, tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_text("keep me")
+    with pytest.raises(ValueError):
+        export_csv(ledger_data, "transactions", str(path), account_name="Nope")
+    assert path.read_text() == "keep me"
+
+@pytest.mark.parametrize("kind", ["budgets", "summaries"])
+def test_account_filter_is_rejected_where_it_does_not_apply(ledger_data, tmp_path, kind):
+    with pytest.raises(ValueError):
+        export_csv(ledger_data, kind, str(tmp_path / "out.csv"), account_name="Checking")
+    assert not (tmp_path / "out.csv").exists()
+
+def test_command_line_reports_errors(ledger_data, tmp_path):
+    db = ledger_data.execute("PRAGMA database_list").fetchone()[2]
+    out = tmp_path / "out.csv"
+    out.write_text("keep me")
+    for args in (["transactions", str(out), "--account", "Nope"], ["budgets", str(out), "--account", "Checking"]):
+        result = subprocess.run([sys.executable, "exporter.py", *args, "--db", db],
+                                cwd=ROOT, capture_output=True, text=True)
+        assert result.returncode == 2
+        assert "Traceback" not in result.stderr
+    assert out.read_text() == "keep me"
@@ -0,0 +1,144 @@
+import pytest
+
+import ledger
+from database import verify_balances
+from importer import BULK_TRIGGERS, import_file, import_transactions, normalize_date, read_csv, read_ofx
+from rollups import verify_rollups
+from search import search_index_ok
+
+OFX = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240105120000[-5:EST]
+<TRNAMT>-12.50
+<NAME>CORNER MARKET
+<MEMO>Card 1234
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20240131
+<TRNAMT>2500.00
+<NAME>PAYROLL
+<MEMO>PAYROLL
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+def write(tmp_path, name, text, encoding="utf-8"):
+    path = tmp_path / name
+    path.write_text(text, encoding=encoding)
+    return str(path)
+
+@pytest.mark.parametrize("text, expected", [
+    ("2024-01-05", "2024-01-05"),
+    ("01/05/2024", "2024-01-05"),
+    ("1/5/24", "2024-01-05"),
+    ("05.01.2024", "2024-01-05"),
+    ("20240105", "2024-01-05"),
+    ("20240105120000.000[-5:EST]", "2024-01-05"),
+])
+def test_normalize_date(text, expected):
+    assert normalize_date(text) == expected
+
+def test_normalize_date_rejects_garbage():
+    with pytest.raises(ValueError):
+        normalize_date("yesterday")
+
+def test_csv_header_names_are_matched_loosely(tmp_path):
+    # Byte order mark, other header names, mixed case and padding
+    path = write(tmp_path, "s.csv", " Posting Date ,PAYEE,Value,Account Name,Category\n"
+                                    "01/05/2024,Market,-12.50,Checking,Groceries\n", "utf-8-sig")
+    assert list(read_csv(path)) == [{
+        "date": "2024-01-05", "description": "Market", "amount": -1250,
+        "account": "Checking", "category": "Groceries",
+    }]
+
+def test_csv_debit_and_credit_columns(tmp_path):
+    path = write(tmp_path, "s.csv", "Date,Memo,Withdrawal,Deposit\n"
+                                    "2024-01-05,Market,12.50,\n"
+                                    "2024-01-06,Refund,,3.00\n"
+                                    "2024-01-07,Fee,-1.00,\n")
+    assert [row["amount"] for row in read_csv(path)] == [-1250, 300, -100]
+    assert [row["account"] for row in read_csv(path)] == [None, None, None]
+
+def test_csv_without_amount_columns_is_rejected(tmp_path):
+    path = write(tmp_path, "s.csv", "Date,Description\n2024-01-05,Market\n")
+    with pytest.raises(ValueError):
+        list(read_csv(path))
+
+def test_ofx(tmp_path):
+    rows = list(read_ofx(write(tmp_path, "s.ofx", OFX)))
+    assert [(row["date"], row["description"], row["amount"]) for row in rows] == [
+        ("2024-01-05", "CORNER MARKET - Card 1234", -1250),
+        ("2024-01-31", "PAYROLL", 250_000),
+    ]
+
+@pytest.fixture
+def accounts(conn):
+    ledger.add_account(conn, "Sam", "Checking", 10_000)
+    ledger.add_account(conn, "Sam", "Savings", 0, "Savings")
+    ledger.add_category(conn, "Groceries", "Expense")
+    return conn
+
+def test_unresolved_rows_are_skipped(accounts):
+    rows = [
+        {"date": "2024-01-05", "amount": -100},
+        {"date": "2024-01-06", "amount": -200, "account": "Savings"},
+        {"date": "2024-01-07", "amount": -300, "account": "Nope"},
+        {"date": "2024-01-08", "amount": -400, "category": "Nope"},
+        {"date": "2024-01-09", "amount": 700, "category": "Transfer From"},
+    ]
+    assert import_transactions(accounts, rows, "Checking", "Groceries") == (3, 2)
+    assert import_transactions(accounts, rows) == (0, 5)   # No defaults: nothing resolves
+
+    imported = accounts.execute("""
+        SELECT a.name, t.amount, t.description, t.is_transfer FROM transactions t
+        JOIN accounts a ON t.account_id = a.id WHERE t.date LIKE '2024-%' ORDER BY t.id
+    """).fetchall()
+    assert imported == [("Checking", -100, "No description", 0), ("Savings", -200, "No description", 0),
+                        ("Checking", 700, "No description", 1)]
+
+def test_derived_data_is_current_after_an_import(accounts):
+    rows = [{"date": f"2024-01-{day:02d}", "amount": -day * 100, "description": f"market {day}"}
+            for day in range(1, 29)]
+    import_transactions(accounts, rows, "Checking", "Groceries")
+    assert verify_balances(accounts) == []
+    assert verify_rollups(accounts) == []
+    assert search_index_ok(accounts)
+    assert [row.balance for row in ledger.list_active_accounts(accounts) if row.name == "Checking"] == [10_000 - 40_600]
+
+    # The insert triggers are back for ordinary writes
+    triggers = {name for name, in accounts.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    assert set(BULK_TRIGGERS) <= triggers
+    ledger.add_transaction(accounts, "Checking", "Groceries", 100, "2024-02-01", "cafe")
+    assert verify_balances(accounts) == [] and verify_rollups(accounts) == [] and search_index_ok(accounts)
+
+def test_a_failed_import_leaves_nothing_behind(accounts):
+    def rows():
+        yield {"date": "2024-01-05", "amount": -100}
+        raise ValueError("bad row")
+
+    before = accounts.execute("SELECT COUNT(*) FROM transactions").fetchone()
+    with pytest.raises(ValueError):
+        import_transactions(accounts, rows(), "Checking", "Groceries")
+    assert accounts.execute("SELECT COUNT(*) FROM transactions").fetchone() == before
+    triggers = {name for name, in accounts.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    assert set(BULK_TRIGGERS) <= triggers
+
+def test_imported_rows_are_linked_to_their_budgets(accounts, tmp_path):
+    january = ledger.add_budget(accounts, "January", "2024-01-01")
+    february = ledger.add_budget(accounts, "February", "2024-02-01")
+    path = write(tmp_path, "s.csv", "Date,Description,Amount\n"
+                                    "2023-12-31,Before,-1.00\n"
+                                    "2024-01-31,January,-2.00\n"
+                                    "2024-02-01,February,-3.00\n"
+                                    "2030-06-01,Still February,-4.00\n")
+    assert import_file(accounts, path, "Checking", "Groceries") == (4, 0)
+    links = accounts.execute("""
+        SELECT t.description, bt.budget_id FROM transactions t
+        LEFT JOIN budget_transactions bt ON bt.transaction_id = t.id
+        WHERE t.description != 'Added Checking' AND t.description != 'Added Savings'
+        ORDER BY t.id
+    """).fetchall()
+    assert links == [("Before", None), ("January", january), ("February", february), ("Still February", february)]
@@ -0,0 +1,79 @@
+import sqlite3
+
+import pytest
+
+from database import INDEXES, get_connection
+from migrations import MIGRATIONS, SCHEMA_VERSION, get_schema_version, migrate
+
+def schema_names(conn, kind):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type=?", (kind,))}
+
+def migrate_to(conn, version):
+    """Apply the first `version` migrations, as an older release would have"""
+    for number in range(1, version + 1):
+        MIGRATIONS[number - 1](conn)
+        conn.execute(f"PRAGMA user_version = {number}")
+    conn.commit()
+
+def test_new_database_is_fully_migrated(conn):
+    assert get_schema_version(conn) == SCHEMA_VERSION
+    assert migrate(conn) == 0
+
+def test_migrated_database_has_every_index(conn):
+    assert set(INDEXES) <= schema_names(conn, "index")
+
+def test_migrations_do_not_follow_live_index_list(tmp_path, monkeypatch):
+    # Shipped migrations carry their own DDL, so editing INDEXES cannot change them
+    monkeypatch.setattr("database.INDEXES", {})
+    conn = get_connection(str(tmp_path / "frozen.db"))
+    migrate(conn)
+    assert {
+        "idx_transactions_date",
+        "idx_transactions_account_date",
+        "idx_transactions_category_date",
+        "idx_transactions_projected_status",
+        "idx_budget_transactions_budget_txn",
+    } <= schema_names(conn, "index")
+
+def test_upgrade_from_dollars_to_cents(tmp_path):
+    conn = get_connection(str(tmp_path / "old.db"))
+    migrate_to(conn, 1)
+    c = conn.cursor()
+    c.execute("INSERT INTO accounts (owner, name, balance, starting_balance) VALUES ('Ann', 'Checking', 110.1, 100.1)")
+    c.execute("SELECT id FROM categories WHERE name='System'")
+    system_id = c.fetchone()[0]
+    c.execute("INSERT INTO transactions (account_id, category_id, amount, date) VALUES (1, ?, 100.1, '2024-01-01')",
+              (system_id,))
+    c.execute("INSERT INTO transactions (account_id, category_id, amount, date) VALUES (1, ?, 10.0, '2024-01-02')",
+              (system_id,))
+    c.execute("INSERT INTO budgets (name, start_date, end_date) VALUES ('January', '2024-01-01', 'Current')")
+    c.execute("INSERT INTO budgeted_categories (budget_id, category_id, allocated_amount) VALUES (1, ?, 19.99)",
+              (system_id,))
+    # A duplicate link, which older versions could write
+    c.executemany("INSERT INTO budget_transactions (budget_id, transaction_id) VALUES (1, 1)", [(), ()])
+    conn.commit()
+
+    assert migrate(conn) == SCHEMA_VERSION - 1
+    assert c.execute("SELECT balance, starting_balance FROM accounts").fetchone() == (11010, 10010)
+    assert [row[0] for row in c.execute("SELECT amount FROM transactions ORDER BY id")] == [10010, 1000]
+    assert c.execute("SELECT allocated_amount FROM budgeted_categories").fetchone() == (1999,)
+    assert c.execute("SELECT COUNT(*) FROM budget_transactions").fetchone() == (1,)
+
+    # Ids keep counting from where they were
+    c.execute("INSERT INTO transactions (account_id, category_id, amount, date) VALUES (1, ?, 5, '2024-01-03')",
+              (system_id,))
+    assert c.lastrowid == 3
+
+def test_failed_migration_is_rolled_back(tmp_path, monkeypatch):
+    conn = get_connection(str(tmp_path / "broken.db"))
+
+    def broken(conn):
+        conn.execute("CREATE TABLE half_done (id INTEGER)")
+        conn.execute("SELECT * FROM no_such_table")
+
+    monkeypatch.setattr("migrations.MIGRATIONS", [MIGRATIONS[0], broken])
+    monkeypatch.setattr("migrations.SCHEMA_VERSION", 2)
+    with pytest.raises(sqlite3.OperationalError):
+        migrate(conn)
+    assert get_schema_version(conn) == 1
+    assert "half_done" not in schema_names(conn, "table")
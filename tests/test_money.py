@@ -0,0 +1,44 @@
+import pytest
+
+from money import cents_to_float, cents_to_text, format_money, parse_money
+
+@pytest.mark.parametrize("value, cents", [
+    ("12", 1200),
+    ("12.5", 1250),
+    ("0.1", 10),
+    ("-3.456", -346),
+    ("1,234.565", 123457),
+    ("$3", 300),
+    (" 7.05 ", 705),
+    (12, 1200),
+    (12.5, 1250),
+    (0.1 + 0.2, 30),
+    (-0.005, -1),
+])
+def test_parse_money(value, cents):
+    assert parse_money(value) == cents
+
+@pytest.mark.parametrize("value", ["", "abc", "1.2.3", "nan", "inf"])
+def test_parse_money_rejects(value):
+    with pytest.raises(ValueError):
+        parse_money(value)
+
+@pytest.mark.parametrize("cents, text, display", [
+    (0, "0.00", "$0.00"),
+    (5, "0.05", "$0.05"),
+    (1234, "12.34", "$12.34"),
+    (-5, "-0.05", "-$0.05"),
+    (-123456, "-1234.56", "-$1234.56"),
+    (None, "0.00", "$0.00"),
+])
+def test_formatting(cents, text, display):
+    assert cents_to_text(cents) == text
+    assert format_money(cents) == display
+
+def test_round_trip():
+    for cents in range(-1_000, 1_000, 7):
+        assert parse_money(cents_to_text(cents)) == cents
+
+def test_cents_to_float():
+    assert cents_to_float(1250) == 12.5
+    assert cents_to_float(None) == 0
@@ -0,0 +1,15 @@
+import pytest
+
+from database import PLAN_EXPECTATIONS, check_query_plans, explain_query_plan
+
+def test_every_hot_query_uses_its_index(conn):
+    assert check_query_plans(conn) == []
+
+@pytest.mark.parametrize("name, sql, params, index", PLAN_EXPECTATIONS, ids=[e[0] for e in PLAN_EXPECTATIONS])
+def test_query_plan(conn, name, sql, params, index):
+    plan = explain_query_plan(conn, sql, params)
+    assert any(index in detail for detail in plan), plan
+
+def test_plans_hold_with_statistics(generated):
+    # Generated databases are ANALYZEd, like one the app has run PRAGMA optimize on
+    assert check_query_plans(generated) == []
@@ -0,0 +1,67 @@
+import ledger
+from database import open_connection
+from ledger import reference
+from ledger.reference import invalidate_reference_data, reference_data
+
+def test_cached_per_connection(conn):
+    data = reference_data(conn)
+    assert reference_data(conn) is data
+    invalidate_reference_data()
+    assert reference_data(conn) is not data
+
+def test_load_overtaken_by_a_write_is_not_kept(conn, monkeypatch):
+    class Overtaken(reference.ReferenceData):
+        def __init__(self, conn):
+            super().__init__(conn)
+            invalidate_reference_data()     # A write published while this was loading
+
+    monkeypatch.setattr(reference, "ReferenceData", Overtaken)
+    data = reference_data(conn)
+    monkeypatch.undo()
+    assert reference_data(conn) is not data
+
+def test_account_writes_refresh_the_cache(conn):
+    data = reference_data(conn)
+    assert data.account("Checking") is None
+
+    account_id = ledger.add_account(conn, "Sam", "Checking", 1_000)
+    assert reference_data(conn).account("Checking").id == account_id
+
+    ledger.update_account(conn, account_id, "Savings", "Sam", "Rainy Day", 1_000)
+    data = reference_data(conn)
+    assert data.account("Checking") is None
+    assert data.account("Rainy Day") == (account_id, "Rainy Day", "Savings", "Sam", True)
+
+    ledger.delete_account(conn, account_id)
+    assert reference_data(conn).active_accounts() == []
+
+def test_category_writes_refresh_the_cache(conn):
+    category_id = ledger.add_category(conn, "Groceries", "Expense")
+    assert [c.name for c in reference_data(conn).active_categories("Expense")] == ["Groceries", "Transfer To"]
+
+    ledger.update_category(conn, category_id, "Food", "Expense")
+    assert reference_data(conn).category("Food").id == category_id
+    assert reference_data(conn).category("Groceries") is None
+
+    ledger.deactivate_category(conn, category_id)
+    assert not reference_data(conn).category("Food").active
+
+def test_transaction_writes_keep_the_cache(conn):
+    ledger.add_account(conn, "Sam", "Checking", 1_000)
+    ledger.add_category(conn, "Groceries", "Expense")
+    data = reference_data(conn)
+    # Balances move, but no names or types do
+    ledger.add_transaction(conn, "Checking", "Groceries", 250, "2024-01-05")
+    assert reference_data(conn) is data
+
+def test_writes_from_another_connection_are_seen_after_publish(conn):
+    data = reference_data(conn)
+    other = open_connection(conn.execute("PRAGMA database_list").fetchone()[2])
+    try:
+        # Unpooled connections are never cached
+        assert reference_data(other) is not reference_data(other)
+        ledger.add_category(other, "Rent", "Expense")
+    finally:
+        other.close()
+    assert reference_data(conn) is not data
+    assert reference_data(conn).category("Rent") is not None
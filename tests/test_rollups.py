@@ -0,0 +1,68 @@
+import pytest
+
+import ledger
+from rollups import NO_RANGE, category_totals, rebuild_rollups, split_range, verify_rollups
+
+@pytest.mark.parametrize("start, end, expected", [
+    # Whole months only
+    ("2024-01-01", "2024-03-31", (("2024-01", "2024-03"), NO_RANGE, NO_RANGE)),
+    # Ragged ends on both sides
+    ("2024-01-10", "2024-03-20",
+     (("2024-02", "2024-02"), ("2024-01-10", "2024-01-31"), ("2024-03-01", "2024-03-20"))),
+    # Leap-year February counts as whole
+    ("2024-02-01", "2024-02-29", (("2024-02", "2024-02"), NO_RANGE, NO_RANGE)),
+    # No whole month inside: all daily
+    ("2024-01-10", "2024-02-20", (NO_RANGE, ("2024-01-10", "2024-02-20"), NO_RANGE)),
+    # Not dates: left to the daily rollup as typed
+    ("", "2024-02-20", (NO_RANGE, ("", "2024-02-20"), NO_RANGE)),
+])
+def test_split_range(start, end, expected):
+    assert split_range(start, end) == expected
+
+def expected_totals(conn, start, end, projected, include_transfers=True):
+    """category_totals the slow way, straight from transactions"""
+    transfer_filter = "" if include_transfers else "AND t.is_transfer = 0"
+    rows = conn.execute(f"""
+        SELECT c.name, SUM(t.amount)
+        FROM transactions t JOIN categories c ON t.category_id = c.id
+        WHERE t.date BETWEEN ? AND ? AND t.projected = ? AND c.type = 'Expense'
+        AND c.name != 'System' {transfer_filter}
+        GROUP BY c.name
+    """, (start, end, projected)).fetchall()
+    return dict(rows)
+
+@pytest.mark.parametrize("start, end", [
+    ("2020-03-01", "2020-08-31"),
+    ("2020-03-17", "2020-09-04"),
+    ("2020-05-05", "2020-05-25"),
+    ("2019-01-01", "2030-12-31"),
+])
+@pytest.mark.parametrize("projected", [0, 1])
+def test_category_totals_match_transactions(generated, start, end, projected):
+    assert dict(category_totals(generated, start, end, projected)) == expected_totals(generated, start, end, projected)
+    assert dict(category_totals(generated, start, end, projected, include_transfers=False)) == \
+        expected_totals(generated, start, end, projected, include_transfers=False)
+
+def test_generated_rollups_are_current(generated):
+    assert verify_rollups(generated) == []
+
+def test_triggers_follow_every_write(generated):
+    conn = generated
+    account = ledger.list_active_accounts(conn)[0]
+    txn_id = ledger.add_transaction(conn, account.name, "Groceries", 1_234, "2020-04-15", "test")
+    assert verify_rollups(conn) == []
+
+    # Move it to another month, account and category
+    other = ledger.list_active_accounts(conn)[1]
+    ledger.update_transaction(conn, txn_id, other.name, "Salary", 99_00, "2020-06-30", "moved")
+    assert verify_rollups(conn) == []
+
+    ledger.delete_transaction(conn, txn_id)
+    assert verify_rollups(conn) == []
+
+def test_rebuild_repairs_drift(generated):
+    generated.execute("UPDATE rollup_monthly SET total = total + 1")
+    generated.execute("DELETE FROM rollup_daily WHERE day = (SELECT MIN(day) FROM rollup_daily)")
+    assert verify_rollups(generated) == ["rollup_daily", "rollup_monthly"]
+    rebuild_rollups(generated)
+    assert verify_rollups(generated) == []
@@ -0,0 +1,104 @@
+import re
+
+import pytest
+
+import ledger
+from search import TransactionSearch, match_expression, search_index_ok
+
+@pytest.mark.parametrize("text, expected", [
+    ("market", '"market"*'),
+    ("  Market  caf ", '"Market" "caf"*'),
+    # Punctuation and FTS syntax are not passed through
+    ('cafe" OR NEAR(x', '"cafe" "OR" "NEAR" "x"*'),
+    ("", ""),
+    ("-- !", ""),
+    (None, ""),
+])
+def test_match_expression(text, expected):
+    assert match_expression(text) == expected
+
+def reference_search(conn, search):
+    """Search results the slow way: every real transaction, filtered in Python"""
+    rows = conn.execute("""
+        SELECT t.id, a.name, c.name, t.amount, t.date, t.description, t.account_id, t.category_id
+        FROM transactions t
+        JOIN accounts a ON t.account_id = a.id
+        JOIN categories c ON t.category_id = c.id
+        WHERE t.projected = 0 AND c.name != 'System'
+        ORDER BY t.date DESC, t.id DESC
+    """).fetchall()
+    words = [word.lower() for word in re.findall(r"\w+", search.text)]
+
+    def matches(row):
+        _, _, _, amount, day, description, account_id, category_id = row
+        described = re.findall(r"\w+", (description or "").lower())
+        return all((
+            all(word in described for word in words[:-1]),
+            not words or any(w.startswith(words[-1]) for w in described),
+            search.account_id is None or account_id == search.account_id,
+            search.category_id is None or category_id == search.category_id,
+            search.start_date is None or day >= search.start_date,
+            search.end_date is None or day <= search.end_date,
+            search.min_amount is None or abs(amount) >= search.min_amount,
+            search.max_amount is None or abs(amount) <= search.max_amount,
+        ))
+    return [row[:6] for row in rows if matches(row)]
+
+def all_pages(conn, search, limit):
+    """Every result of a search, fetched page by page"""
+    results, after = [], None
+    while True:
+        page = ledger.search_transactions(conn, search, after, limit)
+        results += page
+        if len(page) < limit:
+            return results
+        after = (page[-1].date, page[-1].id)
+
+def searches(conn):
+    account_id = conn.execute("SELECT MIN(id) FROM accounts").fetchone()[0]
+    category_id = conn.execute("SELECT id FROM categories WHERE name = 'Groceries'").fetchone()[0]
+    return [
+        TransactionSearch(),
+        TransactionSearch(text="market"),
+        TransactionSearch(text="city ca"),
+        TransactionSearch(text="Online", account_id=account_id),
+        TransactionSearch(category_id=category_id),
+        TransactionSearch(account_id=account_id, start_date="2020-03-01", end_date="2020-05-31"),
+        TransactionSearch(text="shop", min_amount=5_000, max_amount=20_000),
+        TransactionSearch(text="nothing matches this"),
+    ]
+
+def test_searches_match_reference(generated):
+    for search in searches(generated):
+        expected = reference_search(generated, search)
+        assert [tuple(row) for row in ledger.search_transactions(generated, search, limit=10**6)] == expected, search
+
+def test_paging_covers_every_result_once(generated):
+    for search in searches(generated):
+        assert [tuple(row) for row in all_pages(generated, search, limit=37)] == reference_search(generated, search)
+
+def test_transaction_page_is_an_empty_search(generated):
+    assert ledger.transaction_page(generated, limit=50) == ledger.search_transactions(generated, limit=50)
+
+def test_index_follows_writes(generated):
+    conn = generated
+    account = ledger.list_active_accounts(conn)[0]
+    text = TransactionSearch(text="zeppelin")
+    assert ledger.search_transactions(conn, text) == []
+
+    txn_id = ledger.add_transaction(conn, account.name, "Groceries", 500, "2020-02-02", "Zeppelin snacks")
+    assert [row.id for row in ledger.search_transactions(conn, text)] == [txn_id]
+
+    ledger.update_transaction(conn, txn_id, account.name, "Groceries", 500, "2020-02-02", "Blimp snacks")
+    assert ledger.search_transactions(conn, text) == []
+    assert [row.id for row in ledger.search_transactions(conn, TransactionSearch(text="blimp"))] == [txn_id]
+
+    ledger.delete_transaction(conn, txn_id)
+    assert ledger.search_transactions(conn, TransactionSearch(text="blimp")) == []
+    assert search_index_ok(conn)
+
+def test_stale_index_is_detected(generated):
+    # Bypass the triggers
+    generated.execute("DROP TRIGGER trg_transactions_fts_update")
+    generated.execute("UPDATE transactions SET description = 'changed' WHERE id = (SELECT MAX(id) FROM transactions)")
+    assert not search_index_ok(generated)